@@ -1,5 +1,6 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from pydantic_settings import BaseSettings
 from typing import List, Union
 import os
@@ -24,6 +25,39 @@ class Settings(BaseSettings):
     ALLOWED_ORIGINS: Union[str, List[str]] = "http://localhost:4200,http://127.0.0.1:4200,https://zavier-gewgawed-kayla.ngrok-free.dev"
     BACKEND_PORT: int = 8081
 
+    # Pool de conexiones a BD
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30  # segundos esperando una conexión libre
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # Consultas de los handlers (async); 0 = sin límite
+
+    # Historial particionado por mes (test_results, prompts)
+    RESULTS_RETENTION_MONTHS: int = 12  # 0 = conservar todo
+    PARTITIONS_MONTHS_AHEAD: int = 3
+    ARCHIVE_DIR: str = "/tmp/archive"
+
+    # Ventana de últimas ejecuciones para el puntaje de inestabilidad (máx. 255)
+    FLAKY_WINDOW_SIZE: int = 20
+
+    # Detección de regresiones de duración por caso
+    DURATION_MIN_RUNS: int = 5                # Ejecuciones antes de calcular z-scores
+    DURATION_ZSCORE_THRESHOLD: float = 3.0    # Marca ejecuciones más lentas que media + z·σ
+    DURATION_PERCENTILE_THRESHOLD: float = 0  # Ej: 0.99 (aprox. normal); 0 = desactivado
+    DURATION_EWMA_ALPHA: float = 0.2          # Peso de cada ejecución en la media reciente
+
+    # Importación de casos en segundo plano
+    UPLOAD_DIR: str = "/tmp/uploads"  # Archivos recibidos, hasta que se importan
+    IMPORT_WORKERS: int = 1
+    IMPORT_PROCESSES: int = 0         # Procesos para parsear hojas Excel en paralelo (0 = uno por CPU)
+    IMPORT_MAX_ERRORS: int = 1000     # Errores por fila guardados en el reporte
+    IMPORT_POLL_SECONDS: float = 2    # Cada cuánto buscan trabajos los workers sin cola
+    IMPORT_HEARTBEAT_SECONDS: int = 15
+    IMPORT_STALE_SECONDS: int = 120   # Sin latido por este tiempo, un trabajo `running` se retoma
+
+    # Pre-generación de código con Manus para casos nuevos/modificados al subirlos
+    PREGENERATE_CODE: bool = False    # Valor por defecto de `pregenerate` en /api/cases/upload
+    PREGENERATE_CONCURRENCY: int = 2  # Tareas de Manus simultáneas como máximo
+
     @property
     def origins_list(self) -> List[str]:
         if isinstance(self.ALLOWED_ORIGINS, str):
@@ -42,21 +76,42 @@ settings = Settings()
 # Configurar SQLAlchemy ENGINE
 # ------------------------------
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False
-)
+def _engine_options(statement_timeout: bool = False) -> dict:
+    """
+    Opciones de pool para el engine síncrono y el asíncrono.
+
+    `statement_timeout` solo aplica a las consultas de los handlers: el
+    engine síncrono corre DDL, backfills, rebuilds y archivado, que en una
+    BD grande tardan más que el límite.
+    """
+    options = {
+        "pool_pre_ping": True,
+        "pool_recycle": 3600,
+        "echo": False,
+    }
+    if settings.DATABASE_URL.startswith("postgresql"):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        if statement_timeout and settings.DB_STATEMENT_TIMEOUT_MS > 0:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+# Engine síncrono: arranque (create_all, particiones) y mantenimiento, sin statement_timeout
+engine = create_engine(settings.DATABASE_URL, **_engine_options())
+
+# Engine asíncrono (psycopg async): usado por los handlers de FastAPI
+async_engine = create_async_engine(settings.DATABASE_URL, **_engine_options(statement_timeout=True))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 
-# Dependencia para obtener sesión de BD
-def get_db():
-    db = SessionLocal()
-    try:
+# Dependencia para obtener sesión asíncrona de BD
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,30 +1,105 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.config import settings, Base, engine
+from fastapi.middleware.gzip import GZipMiddleware
+from app.config import settings, Base, engine, async_engine
 from app.utils.logger import setup_logger
+from app.utils.schema import sync_schema
+from app.services.partition_service import PartitionService
+from app.services.import_service import import_service
+from app.services.codegen_service import codegen_service
 
 # Importar TODOS los modelos ANTES de crear las tablas
-from app.models.case_model import TestCase
-from app.models.result_model import TestResult
+from app.models.artifact_model import Artifact, ensure_external_storage
+from app.models.case_model import TestCase, backfill_content_hashes
+from app.models.result_model import TestResult, backfill_durations
 from app.models.prompt_model import Prompt
+from app.models.rollup_model import ResultDailyRollup, rebuild_daily_rollups
+from app.models.flakiness_model import TestCaseFlakiness, rebuild_flakiness
+from app.models.duration_model import TestCaseDurationStats, rebuild_duration_stats
+from app.models.case_stats_model import TestCaseStats, rebuild_case_stats
+from app.models.import_job_model import ImportJob
 
 # Importar rutas
-from app.routes import cases, execute, dashboard
+from app.routes import cases, execute, dashboard, prompts, assets
 
 
-# Crear tablas si no existen
-try:
-    print("[DB] Conectando a base de datos...")
-    Base.metadata.create_all(bind=engine)
-    print("[DB] Tablas creadas exitosamente")
-except Exception as e:
-    print(f"[ERROR] Error al crear tablas: {e}")
+partition_service = PartitionService(engine)
+
+
+def init_database() -> None:
+    """
+    Crea/actualiza tablas, particiones y tablas derivadas.
+
+    Se ejecuta en el arranque de la app (lifespan), no al importar el
+    módulo: importar `app.main` no abre conexiones a la BD.
+    """
+    try:
+        print("[DB] Conectando a base de datos...")
+        Base.metadata.create_all(bind=engine)
+        for change in sync_schema(engine):
+            print(f"[DB] Esquema actualizado: {change}")
+        print(f"[DB] Particiones: {partition_service.prepare()}")
+        if ensure_external_storage(engine):
+            print("[DB] artifacts.data sin compresión TOAST (lecturas por rango)")
+        rebuilt = backfill_content_hashes(engine)
+        if rebuilt:
+            print(f"[DB] Hash de contenido calculado para {rebuilt} casos")
+        # Antes de los rebuilds: las estadísticas se calculan sobre duration_seconds
+        backfilled = backfill_durations(engine)
+        if backfilled:
+            print(f"[DB] Duración en segundos calculada para {backfilled} resultados")
+        rebuilt = rebuild_daily_rollups(engine)
+        if rebuilt:
+            print(f"[DB] Rollups diarios reconstruidos: {rebuilt} filas")
+        rebuilt = rebuild_flakiness(engine)
+        if rebuilt:
+            print(f"[DB] Inestabilidad reconstruida para {rebuilt} casos")
+        rebuilt = rebuild_duration_stats(engine)
+        if rebuilt:
+            print(f"[DB] Estadísticas de duración reconstruidas para {rebuilt} casos")
+        rebuilt = rebuild_case_stats(engine, force=bool(backfilled))
+        if rebuilt:
+            print(f"[DB] Totales por caso reconstruidos para {rebuilt} casos")
+        print("[DB] Tablas creadas exitosamente")
+    except Exception as e:
+        print(f"[ERROR] Error al crear tablas: {e}")
+
+
+# Intervalo del mantenimiento de particiones y retención
+MAINTENANCE_INTERVAL_SECONDS = 24 * 60 * 60
+
+
+async def partition_maintenance_loop():
+    """Crea particiones futuras y archiva las vencidas una vez al día."""
+    while True:
+        await asyncio.sleep(MAINTENANCE_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(partition_service.run_maintenance)
+        except Exception as e:
+            print(f"[ERROR] Mantenimiento de particiones: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(init_database)
+    maintenance_task = asyncio.create_task(partition_maintenance_loop())
+    await codegen_service.start()
+    await import_service.start()
+    yield
+    await import_service.stop()
+    await codegen_service.stop()
+    maintenance_task.cancel()
+    await async_engine.dispose()
+
 
 # Configurar aplicación FastAPI
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
-    description="Backend de automatización QA con Selenium + IA (Manus)"
+    description="Backend de automatización QA con Selenium + IA (Manus)",
+    lifespan=lifespan
 )
 
 # Configurar CORS
@@ -34,8 +109,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Comprimir respuestas JSON grandes (los assets estáticos ya van pre-comprimidos)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # Configurar logger
 logger = setup_logger("main")
 logger.info("[INICIO] Servidor QA Automation Backend")
@@ -46,6 +125,8 @@ logger.info(f"[EXECUTOR] URL: {settings.AGENT_EXECUTOR_URL}")
 app.include_router(cases.router, prefix="/api/cases", tags=["Casos de prueba"])
 app.include_router(execute.router, prefix="/api/execute", tags=["Ejecución de pruebas"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
+app.include_router(prompts.router, prefix="/api/prompts", tags=["Prompts"])
+app.include_router(assets.router)
 
 # Endpoint raíz
 @app.get("/")
@@ -1,7 +1,13 @@
 # Importar todos los modelos para que SQLAlchemy los registre
+from app.models.artifact_model import Artifact
 from app.models.case_model import TestCase
 from app.models.result_model import TestResult
 from app.models.prompt_model import Prompt
+from app.models.rollup_model import ResultDailyRollup
+from app.models.flakiness_model import TestCaseFlakiness
+from app.models.duration_model import TestCaseDurationStats
+from app.models.case_stats_model import TestCaseStats
+from app.models.import_job_model import ImportJob
 
 # Exportar los modelos
-__all__ = ["TestCase", "TestResult", "Prompt"]
+__all__ = ["Artifact", "TestCase", "TestResult", "Prompt", "ResultDailyRollup", "TestCaseFlakiness", "TestCaseDurationStats", "TestCaseStats", "ImportJob"]
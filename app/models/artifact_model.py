@@ -0,0 +1,174 @@
+# app/models/artifact_model.py
+import gzip
+import hashlib
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, JSON, DDL, event, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, deferred, object_session
+from sqlalchemy.sql import func
+from app.config import Base  # Importar desde config, NO desde __init__
+
+# Bytes (sin comprimir) por miembro gzip: permite leer un rango sin descomprimir todo
+ARTIFACT_CHUNK_SIZE = 64 * 1024
+
+
+class Artifact(Base):
+    """
+    Contenido grande (logs, prompts, código generado) guardado comprimido
+    fuera de las tablas principales y direccionado por su hash SHA-256.
+
+    `data` es una concatenación de miembros gzip independientes de
+    `chunk_size` bytes cada uno; `chunk_offsets` guarda dónde empieza cada
+    miembro (más el largo total) para leer solo los que cubren un rango.
+    Los artefactos antiguos (un único miembro) no tienen índice.
+    """
+    __tablename__ = "artifacts"
+
+    hash = Column(String(64), primary_key=True)
+    encoding = Column(String(10), nullable=False, default="gzip")
+    size = Column(Integer, nullable=False)  # Tamaño original en bytes (UTF-8)
+    data = deferred(Column(LargeBinary, nullable=False))
+    chunk_size = Column(Integer, nullable=True)
+    chunk_offsets = Column(JSON, nullable=True)
+    created_at = Column(DateTime, default=func.now())
+
+    @staticmethod
+    def pack(text: str) -> dict:
+        """Comprime un texto por bloques y calcula su hash de contenido."""
+        raw = text.encode("utf-8")
+        members, offsets, position = [], [], 0
+        for start in range(0, max(len(raw), 1), ARTIFACT_CHUNK_SIZE):
+            member = gzip.compress(raw[start:start + ARTIFACT_CHUNK_SIZE], compresslevel=6, mtime=0)
+            offsets.append(position)
+            members.append(member)
+            position += len(member)
+        offsets.append(position)
+
+        return {
+            "hash": hashlib.sha256(raw).hexdigest(),
+            "encoding": "gzip",
+            "size": len(raw),
+            "data": b"".join(members),
+            "chunk_size": ARTIFACT_CHUNK_SIZE,
+            "chunk_offsets": offsets,
+        }
+
+    def read_text(self) -> str:
+        """Descomprime el contenido del artefacto (gzip admite miembros concatenados)."""
+        return gzip.decompress(self.data).decode("utf-8")
+
+
+# Los datos ya van comprimidos: sin TOAST comprimido, substring() lee solo el tramo pedido
+event.listen(
+    Artifact.__table__, "after_create",
+    DDL("ALTER TABLE artifacts ALTER COLUMN data SET STORAGE EXTERNAL").execute_if(dialect="postgresql")
+)
+
+
+def ensure_external_storage(engine: Engine) -> bool:
+    """Aplica STORAGE EXTERNAL a `artifacts.data` en tablas creadas antes del cambio."""
+    if engine.dialect.name != "postgresql":
+        return False
+    with engine.begin() as conn:
+        storage = conn.execute(text(
+            "SELECT attstorage FROM pg_attribute WHERE attrelid = 'artifacts'::regclass AND attname = 'data'"
+        )).scalar()
+        if storage == "e":
+            return False
+        conn.execute(text("ALTER TABLE artifacts ALTER COLUMN data SET STORAGE EXTERNAL"))
+    return True
+
+
+def make_preview(text: str, length: int) -> str:
+    """Vista previa corta que se guarda en su propia columna."""
+    if text is None:
+        return None
+    return text[:length] + "..." if len(text) > length else text
+
+
+def artifact_text(legacy_attr: str, hash_attr: str, preview_attr: str = None, preview_length: int = 200):
+    """
+    Propiedad de texto respaldada por la tabla `artifacts`.
+
+    - Al asignar: calcula hash y preview; el artefacto comprimido se inserta
+      en el siguiente flush (ver `_store_pending_artifacts`).
+    - Al leer: carga y descomprime el artefacto solo en ese momento.
+      Las filas antiguas sin hash leen la columna legacy (diferida).
+    """
+    def getter(self):
+        pending = getattr(self, "_pending_artifacts", {})
+        digest = getattr(self, hash_attr)
+        if digest is None:
+            return getattr(self, legacy_attr)
+        if digest in pending:
+            return pending[digest]["text"]
+
+        session = object_session(self)
+        artifact = session.get(Artifact, digest) if session else None
+        return artifact.read_text() if artifact else None
+
+    def setter(self, value):
+        if preview_attr:
+            setattr(self, preview_attr, make_preview(value, preview_length))
+        if value is None:
+            setattr(self, hash_attr, None)
+            return
+
+        packed = Artifact.pack(value)
+        packed["text"] = value
+        if not hasattr(self, "_pending_artifacts"):
+            self._pending_artifacts = {}
+        self._pending_artifacts[packed["hash"]] = packed
+        setattr(self, hash_attr, packed["hash"])
+
+    return property(getter, setter)
+
+
+async def load_text(db, obj, attr: str):
+    """
+    Lee una propiedad respaldada por `artifacts` desde una AsyncSession.
+
+    La carga diferida hace IO síncrono; `run_sync` la ejecuta dentro del
+    contexto asíncrono de la sesión sin bloquear el event loop.
+    """
+    return await db.run_sync(lambda session: getattr(obj, attr))
+
+
+@event.listens_for(Session, "before_flush")
+def _store_pending_artifacts(session, flush_context, instances):
+    """
+    Inserta los artefactos pendientes antes de guardar las filas que los
+    referencian, con ON CONFLICT sobre el hash: dos transacciones que guardan
+    el mismo contenido a la vez (ej: dos ejecuciones del mismo caso) no
+    chocan en la clave primaria.
+
+    En PostgreSQL el conflicto hace un UPDATE sin cambios para bloquear la
+    fila hasta el commit: la limpieza de huérfanos no puede borrar un
+    artefacto reutilizado antes de que exista la fila que lo referencia.
+    """
+    pending = {}
+    for obj in list(session.new) + list(session.dirty):
+        artifacts = obj.__dict__.pop("_pending_artifacts", None)
+        if artifacts:
+            pending.update(artifacts)
+
+    if not pending:
+        return
+
+    connection = session.connection()
+    if connection.dialect.name == "postgresql":
+        stmt = postgresql.insert(Artifact)
+        stmt = stmt.on_conflict_do_update(index_elements=[Artifact.hash], set_={"hash": stmt.excluded.hash})
+    else:
+        stmt = sqlite.insert(Artifact).on_conflict_do_nothing(index_elements=[Artifact.hash])
+    connection.execute(stmt, [
+        {
+            "hash": digest,
+            "encoding": packed["encoding"],
+            "size": packed["size"],
+            "data": packed["data"],
+            "chunk_size": packed["chunk_size"],
+            "chunk_offsets": packed["chunk_offsets"],
+        }
+        for digest, packed in sorted(pending.items())  # Mismo orden de bloqueo en todas las transacciones
+    ])
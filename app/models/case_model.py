@@ -1,5 +1,9 @@
 # app/models/case_model.py
-from sqlalchemy import Column, Integer, String, Text, DateTime
+import hashlib
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Text, DateTime, event, select, update, bindparam
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from app.config import Base  # Importar desde config, NO desde __init__
 
@@ -7,10 +11,54 @@ class TestCase(Base):
     __tablename__ = "test_cases"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False)
+    name = Column(String(255), nullable=False, index=True)  # Clave natural al re-subir archivos
     description = Column(Text, nullable=True)
     steps = Column(Text, nullable=False)
     expected_result = Column(Text, nullable=False)
     url = Column(String(500), nullable=True)
+    # SHA-256 de name + steps + expected_result + url (ver `content_hash`)
+    content_hash = Column(String(64), nullable=True, unique=True, index=True)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+def content_hash(name: str, steps: str, expected_result: str, url: Optional[str] = None) -> str:
+    """Hash del contenido de un caso: igual hash = mismo caso sin cambios."""
+    payload = "\x1f".join((name or "", steps or "", expected_result or "", url or ""))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@event.listens_for(Session, "before_flush")
+def _set_content_hash(session, flush_context, instances):
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, TestCase):
+            obj.content_hash = content_hash(obj.name, obj.steps, obj.expected_result, obj.url)
+
+
+def backfill_content_hashes(engine: Engine, batch_size: int = 1000) -> int:
+    """
+    Calcula `content_hash` de los casos que no lo tienen (filas previas a la
+    columna). Si hay duplicados exactos, solo el de menor id recibe el hash
+    (el índice es único); los demás quedan sin hash y no se borran.
+    Devuelve los casos actualizados.
+    """
+    table = TestCase.__table__
+    with engine.begin() as conn:
+        taken = set(conn.scalars(select(table.c.content_hash).where(table.c.content_hash.is_not(None))))
+        rows = conn.execute(
+            select(table.c.id, table.c.name, table.c.steps, table.c.expected_result, table.c.url)
+            .where(table.c.content_hash.is_(None))
+            .order_by(table.c.id)
+        ).all()
+
+        updates = []
+        for row in rows:
+            digest = content_hash(row.name, row.steps, row.expected_result, row.url)
+            if digest not in taken:
+                taken.add(digest)
+                updates.append({"case_id": row.id, "digest": digest})
+
+        stmt = update(table).where(table.c.id == bindparam("case_id")).values(content_hash=bindparam("digest"))
+        for start in range(0, len(updates), batch_size):
+            conn.execute(stmt, updates[start:start + batch_size])
+        return len(updates)
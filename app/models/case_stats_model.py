@@ -0,0 +1,150 @@
+# app/models/case_stats_model.py
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, event, func, select, insert, delete, case
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config import Base  # Importar desde config, NO desde __init__
+from app.models.result_model import TestResult
+
+
+class TestCaseStats(Base):
+    """
+    Totales por caso de prueba, acumulados al insertar cada resultado.
+
+    Las columnas de orden (tasa de éxito, ejecuciones, último fallo, duración
+    media) están indexadas: el "top K" se resuelve recorriendo el índice sin
+    agrupar el historial. Sobrevive al archivado de particiones.
+    """
+    __tablename__ = "test_case_stats"
+    __table_args__ = (
+        # (columna, id) para paginar por keyset en cualquier orden
+        Index("ix_test_case_stats_success_rate", "success_rate", "test_case_id"),
+        Index("ix_test_case_stats_executions", "executions", "test_case_id"),
+        Index("ix_test_case_stats_last_failure_at", "last_failure_at", "test_case_id"),
+        Index("ix_test_case_stats_avg_duration", "avg_duration", "test_case_id"),
+    )
+
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), primary_key=True)
+    executions = Column(Integer, nullable=False, default=0)
+    passed = Column(Integer, nullable=False, default=0)
+    failed = Column(Integer, nullable=False, default=0)
+    error = Column(Integer, nullable=False, default=0)
+    success_rate = Column(Float, nullable=False, default=0.0)  # Porcentaje 0-100
+    duration_sum = Column(Float, nullable=False, default=0.0)
+    duration_count = Column(Integer, nullable=False, default=0)
+    avg_duration = Column(Float, nullable=True)  # Segundos
+    last_execution_at = Column(DateTime, nullable=True)
+    last_failure_at = Column(DateTime, nullable=True)
+
+
+def _latest(old, new):
+    """El mayor de dos instantes ignorando NULL (SQLite no tiene GREATEST)."""
+    return case((new.is_(None), old), (old > new, old), else_=new)
+
+
+def _upsert_statement(dialect_name: str, rows: list):
+    """INSERT ... ON CONFLICT: suma los contadores y recalcula tasa y media en la misma sentencia."""
+    module = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = module.insert(TestCaseStats).values(rows)
+    new, old = stmt.excluded, TestCaseStats
+
+    executions = old.executions + new.executions
+    passed = old.passed + new.passed
+    duration_sum = old.duration_sum + new.duration_sum
+    duration_count = old.duration_count + new.duration_count
+
+    return stmt.on_conflict_do_update(
+        index_elements=[TestCaseStats.test_case_id],
+        set_={
+            "executions": executions,
+            "passed": passed,
+            "failed": old.failed + new.failed,
+            "error": old.error + new.error,
+            "success_rate": passed * 100.0 / executions,
+            "duration_sum": duration_sum,
+            "duration_count": duration_count,
+            "avg_duration": case((duration_count > 0, duration_sum / duration_count), else_=None),
+            "last_execution_at": _latest(old.last_execution_at, new.last_execution_at),
+            "last_failure_at": _latest(old.last_failure_at, new.last_failure_at),
+        }
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _update_case_stats(session, flush_context):
+    totals = defaultdict(lambda: {
+        "executions": 0, "passed": 0, "failed": 0, "error": 0,
+        "duration_sum": 0.0, "duration_count": 0, "last_execution_at": None, "last_failure_at": None
+    })
+    for obj in session.new:
+        if not isinstance(obj, TestResult):
+            continue
+        row = totals[obj.test_case_id]
+        executed_at = obj.created_at or datetime.now()
+        row["executions"] += 1
+        if obj.status in ("passed", "failed", "error"):
+            row[obj.status] += 1
+        if obj.duration_seconds is not None and obj.status != "error":
+            row["duration_sum"] += obj.duration_seconds
+            row["duration_count"] += 1
+        row["last_execution_at"] = max(filter(None, (row["last_execution_at"], executed_at)))
+        if obj.status != "passed":
+            row["last_failure_at"] = max(filter(None, (row["last_failure_at"], executed_at)))
+
+    if not totals:
+        return
+
+    rows = []
+    for case_id, row in sorted(totals.items()):
+        rows.append({
+            "test_case_id": case_id,
+            **row,
+            "success_rate": row["passed"] * 100.0 / row["executions"],
+            "avg_duration": row["duration_sum"] / row["duration_count"] if row["duration_count"] else None,
+        })
+
+    connection = session.connection()
+    connection.execute(_upsert_statement(connection.dialect.name, rows))
+
+
+def rebuild_case_stats(engine: Engine, force: bool = False) -> int:
+    """
+    Reconstruye los totales desde `test_results` (una agregación) cuando la
+    tabla está vacía, o siempre con `force`. Las duraciones salen de
+    `duration_seconds`: correr antes `backfill_durations` y forzar el rebuild
+    si completó resultados viejos. Devuelve los casos procesados.
+    """
+    with engine.begin() as conn:
+        if force:
+            conn.execute(delete(TestCaseStats))
+        elif conn.scalar(select(func.count()).select_from(TestCaseStats)):
+            return 0
+
+        def count_status(*statuses):
+            return func.sum(case((TestResult.status.in_(statuses), 1), else_=0))
+
+        tracked = TestResult.status != "error"
+        duration_sum = func.coalesce(func.sum(case((tracked, TestResult.duration_seconds), else_=None)), 0.0)
+        duration_count = func.count(case((tracked, TestResult.duration_seconds), else_=None))
+
+        source = select(
+            TestResult.test_case_id,
+            func.count(),
+            count_status("passed"),
+            count_status("failed"),
+            count_status("error"),
+            count_status("passed") * 100.0 / func.count(),
+            duration_sum,
+            duration_count,
+            duration_sum / func.nullif(duration_count, 0),
+            func.max(TestResult.created_at),
+            func.max(case((TestResult.status != "passed", TestResult.created_at), else_=None)),
+        ).group_by(TestResult.test_case_id)
+
+        conn.execute(insert(TestCaseStats).from_select([
+            "test_case_id", "executions", "passed", "failed", "error", "success_rate",
+            "duration_sum", "duration_count", "avg_duration", "last_execution_at", "last_failure_at"
+        ], source))
+        return conn.scalar(select(func.count()).select_from(TestCaseStats))
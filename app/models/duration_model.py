@@ -0,0 +1,168 @@
+# app/models/duration_model.py
+import math
+from collections import defaultdict
+from datetime import datetime
+from statistics import NormalDist
+from typing import Optional
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index, event, func, select, update, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config import Base, settings  # Importar desde config, NO desde __init__
+from app.models.result_model import TestResult, parse_duration
+
+STATE_FIELDS = ("runs", "mean", "m2", "recent_mean", "last_duration", "last_zscore", "flagged_runs", "last_flagged_at", "drift")
+
+
+class TestCaseDurationStats(Base):
+    """
+    Media y varianza de la duración de cada caso, actualizadas en línea
+    (algoritmo de Welford) al guardar cada resultado.
+
+    `recent_mean` es una media exponencial (EWMA) de las últimas ejecuciones;
+    `drift` mide cuántas desviaciones estándar de esa EWMA está por encima de
+    la media histórica (como en un gráfico de control EWMA).
+    """
+    __tablename__ = "test_case_duration_stats"
+    __table_args__ = (Index("ix_test_case_duration_stats_drift", "drift"),)
+
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), primary_key=True)
+    runs = Column(Integer, nullable=False, default=0)
+    mean = Column(Float, nullable=False, default=0.0)
+    m2 = Column(Float, nullable=False, default=0.0)  # Suma de cuadrados de desvíos (Welford)
+    recent_mean = Column(Float, nullable=True)
+    last_duration = Column(Float, nullable=True)
+    last_zscore = Column(Float, nullable=True)
+    flagged_runs = Column(Integer, nullable=False, default=0)
+    last_flagged_at = Column(DateTime, nullable=True)
+    drift = Column(Float, nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+def zscore_threshold() -> float:
+    """
+    Umbral efectivo de z-score. Un umbral por percentil (ej: 0.99) se
+    convierte a z suponiendo distribución normal; se usa el más estricto.
+    """
+    threshold = settings.DURATION_ZSCORE_THRESHOLD
+    percentile = settings.DURATION_PERCENTILE_THRESHOLD
+    if 0 < percentile < 1:
+        threshold = min(threshold, NormalDist().inv_cdf(percentile))
+    return threshold
+
+
+def stddev(state: dict) -> Optional[float]:
+    if state["runs"] < 2:
+        return None
+    return math.sqrt(state["m2"] / (state["runs"] - 1))
+
+
+def add_duration(state: dict, duration: float, executed_at: datetime) -> Optional[float]:
+    """
+    Incorpora una duración al estado (in place) y devuelve su z-score
+    respecto de las ejecuciones anteriores (None si aún no hay base suficiente).
+    """
+    zscore = None
+    deviation = stddev(state)
+    if state["runs"] >= settings.DURATION_MIN_RUNS and deviation:
+        zscore = round((duration - state["mean"]) / deviation, 4)
+        if zscore > zscore_threshold():
+            state["flagged_runs"] += 1
+            state["last_flagged_at"] = executed_at
+
+    # Welford
+    state["runs"] += 1
+    delta = duration - state["mean"]
+    state["mean"] += delta / state["runs"]
+    state["m2"] += delta * (duration - state["mean"])
+
+    alpha = settings.DURATION_EWMA_ALPHA
+    recent = state["recent_mean"]
+    state["recent_mean"] = duration if recent is None else alpha * duration + (1 - alpha) * recent
+    state["last_duration"] = duration
+    state["last_zscore"] = zscore
+
+    deviation = stddev(state)
+    if state["runs"] >= settings.DURATION_MIN_RUNS and deviation:
+        ewma_deviation = deviation * math.sqrt(alpha / (2 - alpha))
+        state["drift"] = round((state["recent_mean"] - state["mean"]) / ewma_deviation, 4)
+    else:
+        state["drift"] = None
+    return zscore
+
+
+def _tracked(result: TestResult) -> bool:
+    # Los errores de infraestructura (ej: "0s" sin ejecutar) no representan la duración del caso
+    return result.test_case_id is not None and result.duration_seconds is not None and result.status != "error"
+
+
+@event.listens_for(Session, "before_flush")
+def _update_duration_stats(session, flush_context, instances):
+    pending = defaultdict(list)
+    for obj in session.new:
+        if isinstance(obj, TestResult) and _tracked(obj):
+            pending[obj.test_case_id].append(obj)
+    if not pending:
+        return
+
+    connection = session.connection()
+    module = postgresql if connection.dialect.name == "postgresql" else sqlite
+    table = TestCaseDurationStats.__table__
+
+    # Asegurar la fila y bloquearla para que inserciones concurrentes no pierdan muestras
+    connection.execute(
+        module.insert(table).values([{"test_case_id": case_id} for case_id in sorted(pending)])
+        .on_conflict_do_nothing(index_elements=[table.c.test_case_id])
+    )
+    current = connection.execute(
+        select(table).where(table.c.test_case_id.in_(pending)).with_for_update()
+    ).mappings().all()
+
+    updates = []
+    for row in current:
+        state = {name: row[name] for name in STATE_FIELDS}
+        results = sorted(pending[row["test_case_id"]], key=lambda r: r.created_at or datetime.now())
+        for result in results:
+            # El z-score queda guardado en la misma fila del resultado
+            result.duration_zscore = add_duration(state, result.duration_seconds, result.created_at or datetime.now())
+        updates.append({"case_id": row["test_case_id"], **state})
+
+    connection.execute(
+        update(table).where(table.c.test_case_id == bindparam("case_id")).values(
+            {name: bindparam(name) for name in STATE_FIELDS}
+        ),
+        updates
+    )
+
+
+def rebuild_duration_stats(engine: Engine, chunk_size: int = 5000) -> int:
+    """
+    Reconstruye las estadísticas recorriendo `test_results` una sola vez
+    (en bloques) cuando la tabla está vacía. Devuelve los casos procesados.
+    """
+    with engine.begin() as conn:
+        if conn.scalar(select(func.count()).select_from(TestCaseDurationStats)):
+            return 0
+
+        rows = conn.execute(
+            select(TestResult.test_case_id, TestResult.status, TestResult.execution_time, TestResult.created_at)
+            .where(TestResult.status != "error", TestResult.execution_time.is_not(None))
+            .order_by(TestResult.created_at, TestResult.id)
+            .execution_options(stream_results=True, yield_per=chunk_size)
+        )
+        states = {}
+        for row in rows:
+            duration = parse_duration(row.execution_time)
+            if duration is None:
+                continue
+            state = states.setdefault(row.test_case_id, {
+                "runs": 0, "mean": 0.0, "m2": 0.0, "recent_mean": None, "last_duration": None,
+                "last_zscore": None, "flagged_runs": 0, "last_flagged_at": None, "drift": None
+            })
+            add_duration(state, duration, row.created_at)
+
+        if states:
+            conn.execute(TestCaseDurationStats.__table__.insert(), [
+                {"test_case_id": case_id, **state} for case_id, state in states.items()
+            ])
+        return len(states)
@@ -0,0 +1,135 @@
+# app/models/flakiness_model.py
+from collections import defaultdict
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Index, event, func, select, update, bindparam
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config import Base, settings  # Importar desde config, NO desde __init__
+from app.models.result_model import TestResult
+
+# Un carácter por ejecución en el historial de la ventana
+STATUS_CODES = {"passed": "P", "failed": "F", "error": "E"}
+
+
+class TestCaseFlakiness(Base):
+    """
+    Estado de inestabilidad por caso de prueba sobre sus últimas ejecuciones.
+
+    Se actualiza al insertar cada resultado (sin recorrer el historial), así
+    el ranking de casos inestables se responde leyendo solo esta tabla.
+    """
+    __tablename__ = "test_case_flakiness"
+    __table_args__ = (Index("ix_test_case_flakiness_score", "score"),)
+
+    test_case_id = Column(Integer, ForeignKey("test_cases.id", ondelete="CASCADE"), primary_key=True)
+    history = Column(String(255), nullable=False, default="")  # Ej: "PPFPFP" (más antigua → más reciente)
+    runs = Column(Integer, nullable=False, default=0)          # Ejecuciones dentro de la ventana
+    flips = Column(Integer, nullable=False, default=0)         # Cambios pasó ↔ falló en la ventana
+    failures = Column(Integer, nullable=False, default=0)      # Ejecuciones no exitosas en la ventana
+    score = Column(Float, nullable=False, default=0.0)         # flips / (runs - 1)
+    total_runs = Column(Integer, nullable=False, default=0)
+    last_status = Column(String(50), nullable=True)
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+
+
+def flakiness_state(history: str) -> dict:
+    """Recorta el historial a la ventana configurada y calcula su puntaje."""
+    history = history[-settings.FLAKY_WINDOW_SIZE:]
+    passed = [code == "P" for code in history]
+    flips = sum(1 for previous, current in zip(passed, passed[1:]) if previous != current)
+    return {
+        "history": history,
+        "runs": len(history),
+        "flips": flips,
+        "failures": passed.count(False),
+        "score": round(flips / (len(history) - 1), 4) if len(history) > 1 else 0.0,
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _update_flakiness(session, flush_context):
+    appended = defaultdict(list)
+    results = sorted(
+        (obj for obj in session.new if isinstance(obj, TestResult)),
+        key=lambda result: result.id or 0
+    )
+    for result in results:
+        appended[result.test_case_id].append(result.status)
+    if not appended:
+        return
+
+    connection = session.connection()
+    module = postgresql if connection.dialect.name == "postgresql" else sqlite
+    table = TestCaseFlakiness.__table__
+
+    # Asegurar la fila y bloquearla: inserciones concurrentes del mismo caso se serializan
+    connection.execute(
+        module.insert(table).values([{"test_case_id": case_id} for case_id in sorted(appended)])
+        .on_conflict_do_nothing(index_elements=[table.c.test_case_id])
+    )
+    current = connection.execute(
+        select(table.c.test_case_id, table.c.history, table.c.total_runs)
+        .where(table.c.test_case_id.in_(appended))
+        .with_for_update()
+    ).all()
+
+    updates = []
+    for row in current:
+        statuses = appended[row.test_case_id]
+        codes = "".join(STATUS_CODES.get(status, "E") for status in statuses)
+        updates.append({
+            "case_id": row.test_case_id,
+            **flakiness_state((row.history or "") + codes),
+            "total_runs": (row.total_runs or 0) + len(statuses),
+            "last_status": statuses[-1],
+        })
+
+    connection.execute(
+        update(table).where(table.c.test_case_id == bindparam("case_id")).values(
+            {name: bindparam(name) for name in ("history", "runs", "flips", "failures", "score", "total_runs", "last_status")}
+        ),
+        updates
+    )
+
+
+def rebuild_flakiness(engine: Engine) -> int:
+    """
+    Reconstruye el estado desde `test_results` cuando la tabla está vacía.
+    Solo lee las últimas ejecuciones de cada caso. Devuelve los casos procesados.
+    """
+    with engine.begin() as conn:
+        if conn.scalar(select(func.count()).select_from(TestCaseFlakiness)):
+            return 0
+
+        ranked = select(
+            TestResult.test_case_id,
+            TestResult.status,
+            func.row_number().over(
+                partition_by=TestResult.test_case_id,
+                order_by=(TestResult.created_at.desc(), TestResult.id.desc())
+            ).label("position"),
+            func.count().over(partition_by=TestResult.test_case_id).label("total_runs"),
+        ).subquery()
+        rows = conn.execute(
+            select(ranked)
+            .where(ranked.c.position <= settings.FLAKY_WINDOW_SIZE)
+            .order_by(ranked.c.test_case_id, ranked.c.position.desc())
+        ).all()
+
+        cases = {}
+        for row in rows:
+            case = cases.setdefault(row.test_case_id, {"codes": "", "total_runs": row.total_runs})
+            case["codes"] += STATUS_CODES.get(row.status, "E")
+            case["last_status"] = row.status
+
+        if cases:
+            conn.execute(TestCaseFlakiness.__table__.insert(), [
+                {
+                    "test_case_id": case_id,
+                    **flakiness_state(case["codes"]),
+                    "total_runs": case["total_runs"],
+                    "last_status": case["last_status"],
+                }
+                for case_id, case in cases.items()
+            ])
+        return len(cases)
@@ -0,0 +1,38 @@
+# app/models/import_job_model.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, JSON, Boolean
+from sqlalchemy.sql import func
+from app.config import Base  # Importar desde config, NO desde __init__
+
+# Estados de un trabajo de importación
+IMPORT_STATUSES = ("queued", "running", "completed", "failed")
+
+
+class ImportJob(Base):
+    """
+    Carga de un archivo de casos procesada en segundo plano.
+
+    El archivo se guarda en disco (`file_path`) al recibirlo y un worker lo
+    importa por bloques; los contadores se actualizan en la misma
+    transacción que cada bloque, así el progreso refleja lo ya guardado.
+    """
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String(255), nullable=False)
+    file_path = Column(String(500), nullable=True)  # None al terminar (archivo borrado)
+    status = Column(String(20), nullable=False, default="queued", index=True)
+    claimed_by = Column(String(100), nullable=True)  # Proceso que lo importa (ver import_service.WORKER_ID)
+    heartbeat_at = Column(DateTime, nullable=True)   # Último latido del dueño mientras está en `running`
+    rows_done = Column(Integer, nullable=False, default=0)    # Filas importadas sin error
+    rows_failed = Column(Integer, nullable=False, default=0)
+    inserted = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    unchanged = Column(Integer, nullable=False, default=0)
+    duplicates = Column(Integer, nullable=False, default=0)  # Nombre repetido dentro del mismo bloque
+    pregenerate = Column(Boolean, nullable=False, default=False)  # Pre-generar código de casos nuevos/modificados
+    sheets = Column(JSON, nullable=True)  # Totales por hoja en Excel: [{"sheet", "rows_done", ...}]
+    errors = Column(JSON, nullable=True, default=list)  # [{"row": n, "error": "..."}] (hasta IMPORT_MAX_ERRORS)
+    message = Column(Text, nullable=True)  # Error que detuvo la importación
+    created_at = Column(DateTime, default=func.now())
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
@@ -1,13 +1,38 @@
 # app/models/prompt_model.py
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import deferred
 from sqlalchemy.sql import func
 from app.config import Base  # Importar desde config, NO desde __init__
+from app.models.artifact_model import artifact_text
 
 class Prompt(Base):
     __tablename__ = "prompts"
 
-    id = Column(Integer, primary_key=True, index=True)
-    test_case_id = Column(Integer, ForeignKey("test_cases.id"), nullable=False)
-    prompt_text = Column(Text, nullable=False)
-    generated_code = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=func.now())
+    # Particionada por mes en PostgreSQL: la PK debe incluir created_at
+    __table_args__ = (
+        Index("ix_prompts_case_created", "test_case_id", "created_at"),  # Último prompt de un caso
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id"), nullable=False, index=True)
+    created_at = Column(DateTime, primary_key=True, default=func.now())
+
+    # Prompt y código comprimidos en `artifacts`; aquí solo hash y vista previa
+    prompt_hash = Column(String(64), ForeignKey("artifacts.hash"), nullable=True)
+    prompt_preview = Column(String(503), nullable=True)
+    code_hash = Column(String(64), ForeignKey("artifacts.hash"), nullable=True)
+    code_preview = Column(String(503), nullable=True)
+
+    # Código listo para ejecutar: `content_hash` del caso para el que se generó
+    # (pre-generación al subir casos). None en los prompts de cada ejecución.
+    case_hash = Column(String(64), nullable=True)
+
+    # Legacy: filas anteriores guardaban el texto completo en la tabla
+    _prompt_text = deferred(Column("prompt_text", Text, nullable=True))
+    _generated_code = deferred(Column("generated_code", Text, nullable=True))
+
+    prompt_text = artifact_text("_prompt_text", "prompt_hash", "prompt_preview", preview_length=500)
+    generated_code = artifact_text("_generated_code", "code_hash", "code_preview", preview_length=500)
+
+    __mapper_args__ = {"primary_key": [id]}  # Identidad ORM solo por id
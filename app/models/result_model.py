@@ -1,16 +1,96 @@
 # app/models/result_model.py
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
+import re
+from typing import Optional
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, Float, ForeignKey, Index, select, update, bindparam
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import deferred, validates
 from sqlalchemy.sql import func
 from app.config import Base  # Importar desde config, NO desde __init__
+from app.models.artifact_model import artifact_text
+
+_DURATION_PART_RE = re.compile(r"(\d+(?:[.,]\d+)?)\s*(ms|h|m|s)?", re.IGNORECASE)
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Convierte `execution_time` ("12s", "1.5s", "2m 3s", "250ms") a segundos.
+    Sin unidad se asume segundos. Devuelve None si no se reconoce.
+    """
+    if not value:
+        return None
+    parts = _DURATION_PART_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(number.replace(",", ".")) * _DURATION_UNITS[(unit or "s").lower()] for number, unit in parts)
+
 
 class TestResult(Base):
     __tablename__ = "test_results"
 
-    id = Column(Integer, primary_key=True, index=True)
-    test_case_id = Column(Integer, ForeignKey("test_cases.id"), nullable=False)
+    # Particionada por mes en PostgreSQL: la PK debe incluir created_at
+    __table_args__ = (
+        Index("ix_test_results_created_at", "created_at"),  # Rangos de fechas y exportación ordenada
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    test_case_id = Column(Integer, ForeignKey("test_cases.id"), nullable=False, index=True)
     status = Column(String(50), nullable=False)  # 'passed', 'failed', 'error'
-    logs = Column(Text, nullable=True)
     screenshot_path = Column(String(500), nullable=True)
     execution_time = Column(String(50), nullable=True)
+    duration_seconds = Column(Float, nullable=True)  # execution_time en segundos
+    duration_zscore = Column(Float, nullable=True)   # Desvío vs. la media del caso al guardarse
     executed_by_agent = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=func.now())
+    created_at = Column(DateTime, primary_key=True, default=func.now())
+
+    # Logs comprimidos en `artifacts`; aquí solo el hash y una vista previa
+    logs_hash = Column(String(64), ForeignKey("artifacts.hash"), nullable=True)
+    logs_preview = Column(String(203), nullable=True)
+    _logs = deferred(Column("logs", Text, nullable=True))  # Legacy: filas anteriores
+    logs = artifact_text("_logs", "logs_hash", "logs_preview", preview_length=200)
+
+    __mapper_args__ = {"primary_key": [id]}  # Identidad ORM solo por id
+
+    @validates("execution_time")
+    def _sync_duration(self, key, value):
+        self.duration_seconds = parse_duration(value)
+        return value
+
+
+def backfill_durations(engine: Engine, batch_size: int = 5000) -> int:
+    """
+    Calcula `duration_seconds` de los resultados guardados antes de la
+    columna (solo se completa al asignar `execution_time`). Recorre por id
+    en bloques, cada uno en su transacción. Devuelve las filas actualizadas.
+    """
+    table = TestResult.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("result_id"), table.c.created_at == bindparam("result_created_at"))
+        .values(duration_seconds=bindparam("duration"))
+    )
+    last_id, updated = 0, 0
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(table.c.id, table.c.created_at, table.c.execution_time)
+                .where(
+                    table.c.id > last_id,
+                    table.c.duration_seconds.is_(None),
+                    table.c.execution_time.is_not(None)
+                )
+                .order_by(table.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return updated
+            last_id = rows[-1].id
+            updates = [
+                {"result_id": row.id, "result_created_at": row.created_at, "duration": duration}
+                for row in rows
+                if (duration := parse_duration(row.execution_time)) is not None
+            ]
+            if updates:
+                conn.execute(stmt, updates)
+                updated += len(updates)
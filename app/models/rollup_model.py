@@ -0,0 +1,61 @@
+# app/models/rollup_model.py
+from collections import Counter
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Date, event, func, select, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from app.config import Base  # Importar desde config, NO desde __init__
+from app.models.result_model import TestResult
+
+
+class ResultDailyRollup(Base):
+    """
+    Conteo de ejecuciones por día y estado, mantenido al insertar cada resultado.
+    Permite graficar rangos largos sin recorrer el historial crudo y sobrevive
+    al archivado de particiones antiguas.
+    """
+    __tablename__ = "result_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    status = Column(String(50), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+def _increment_statement(dialect_name: str, rows: list):
+    """INSERT ... ON CONFLICT DO UPDATE SET count = count + excluded.count"""
+    module = postgresql if dialect_name == "postgresql" else sqlite
+    stmt = module.insert(ResultDailyRollup).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[ResultDailyRollup.day, ResultDailyRollup.status],
+        set_={"count": ResultDailyRollup.count + stmt.excluded["count"]}
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _update_daily_rollups(session, flush_context):
+    counts = Counter(
+        ((obj.created_at or datetime.now()).date(), obj.status)
+        for obj in session.new if isinstance(obj, TestResult)
+    )
+    if not counts:
+        return
+
+    connection = session.connection()
+    rows = [{"day": day, "status": status, "count": n} for (day, status), n in sorted(counts.items())]
+    connection.execute(_increment_statement(connection.dialect.name, rows))
+
+
+def rebuild_daily_rollups(engine: Engine) -> int:
+    """
+    Reconstruye los rollups desde `test_results` cuando la tabla está vacía
+    (primera ejecución tras agregar la tabla). Devuelve las filas generadas.
+    """
+    with engine.begin() as conn:
+        if conn.scalar(select(func.count()).select_from(ResultDailyRollup)):
+            return 0
+
+        day = func.date(TestResult.created_at)
+        source = select(day, TestResult.status, func.count()).group_by(day, TestResult.status)
+        conn.execute(insert(ResultDailyRollup).from_select(["day", "status", "count"], source))
+        return conn.scalar(select(func.count()).select_from(ResultDailyRollup))
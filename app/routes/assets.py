@@ -0,0 +1,16 @@
+from fastapi import APIRouter, HTTPException, Request
+from app.utils.static_assets import static_assets
+
+router = APIRouter()
+
+@router.get("/static/{name:path}", include_in_schema=False)
+async def get_static_asset(name: str, request: Request):
+    """
+    Archivos estáticos del dashboard (JS, CSS, librerías propias).
+    Los nombres con hash de contenido se cachean como inmutables.
+    """
+    found = static_assets.find(name)
+    if not found:
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+    asset, immutable = found
+    return static_assets.respond(request, asset, immutable=immutable)
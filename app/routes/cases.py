@@ -1,73 +1,105 @@
 # app/routes/cases.py
 
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-from app.config import get_db
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.config import get_db, settings
 from app.models.case_model import TestCase
-from app.schemas.case_schema import TestCaseCreate, TestCaseResponse
-from app.utils.file_loader import load_excel_cases
+from app.models.import_job_model import ImportJob
+from app.schemas.case_schema import TestCaseCreate, TestCaseResponse, TestCaseListItem, ImportJobResponse
+from app.services.import_service import import_service
+from app.utils.pagination import apply_keyset, paginate_rows, parse_fields
 
 
 router = APIRouter()
 
-@router.post("/upload", response_model=List[TestCaseResponse])
-async def upload_cases(file: UploadFile = File(...), db: Session = Depends(get_db)):
+@router.post("/upload", response_model=ImportJobResponse, status_code=202)
+async def upload_cases(
+    file: UploadFile = File(...),
+    pregenerate: Optional[bool] = Query(None, description="Pre-generar el código de los casos nuevos o modificados (por defecto PREGENERATE_CODE)"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Sube un archivo Excel con casos de prueba y los guarda en BD.
+    Recibe un archivo de casos de prueba y lo importa en segundo plano.
+
+    Formatos: Excel (.xlsx), CSV, JSONL (.jsonl/.ndjson) y Parquet. Se
+    detectan por extensión o, si no es conocida, por el contenido. Todos
+    tienen las mismas columnas y validaciones.
+
+    El archivo se guarda en disco y la respuesta (202) trae el trabajo de
+    importación; el progreso se consulta en `GET /upload/{job_id}`. Volver
+    a subir el mismo archivo no duplica casos: los que no cambiaron se
+    omiten y los modificados se actualizan.
+
+    Con `pregenerate=true`, el código de los casos nuevos o modificados se
+    pide a Manus en segundo plano; al ejecutarlos solo queda el executor.
     """
-    if not file.filename.endswith(('.xlsx', '.xls')):
-        raise HTTPException(status_code=400, detail="El archivo debe ser un Excel (.xlsx o .xls)")
-    
+    if pregenerate is None:
+        pregenerate = settings.PREGENERATE_CODE
     try:
-        cases_data = load_excel_cases(file.file)
-        
-        case_objects = []
-        for case_dict in cases_data:
-            test_case = TestCase(**case_dict)
-            db.add(test_case)
-            case_objects.append(test_case)
-        
-        db.commit()
-        
-        for case in case_objects:
-            db.refresh(case)
-        
-        return case_objects
-        
-    except ValueError as ve:
-        raise HTTPException(status_code=400, detail=str(ve))
+        return await import_service.submit(db, file.file, file.filename, pregenerate)
     except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=500, detail=f"Error al procesar el archivo: {str(e)}")
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error al recibir el archivo: {str(e)}")
+
+
+@router.get("/upload/{job_id}", response_model=ImportJobResponse)
+async def get_upload_status(job_id: int, db: AsyncSession = Depends(get_db)):
+    """
+    Progreso de una importación: filas importadas y con error, resumen
+    (insertados, actualizados, sin cambios) y reporte de errores por fila.
+    """
+    job = await db.get(ImportJob, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return job
 
-@router.get("/", response_model=List[TestCaseResponse])
-async def get_all_cases(db: Session = Depends(get_db)):
+@router.get("/", response_model=List[TestCaseListItem], response_model_exclude_unset=True)
+async def get_all_cases(
+    response: Response,
+    cursor: Optional[int] = Query(None, description="ID del último caso de la página anterior"),
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = Query(None, description="Campos a devolver, ej: id,name,url"),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Obtiene todos los casos de prueba de la base de datos.
+    Obtiene los casos de prueba paginados por cursor (keyset sobre `id`).
+
+    El cursor de la siguiente página se devuelve en el header `X-Next-Cursor`.
+    Con `fields=` solo se consultan las columnas pedidas, así los listados
+    no arrastran `steps` ni `expected_result`.
     """
-    cases = db.query(TestCase).all()
-    return cases
+    try:
+        selected = parse_fields(fields, list(TestCaseListItem.model_fields.keys()))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+    columns = [getattr(TestCase, field) for field in selected]
+    query = apply_keyset(select(*columns), TestCase.id, cursor, limit)
+    rows = [dict(row._mapping) for row in (await db.execute(query)).all()]
+
+    return paginate_rows(rows, limit, response)
 
 @router.get("/{case_id}", response_model=TestCaseResponse)
-async def get_case_by_id(case_id: int, db: Session = Depends(get_db)):
+async def get_case_by_id(case_id: int, db: AsyncSession = Depends(get_db)):
     """
     Obtiene un caso de prueba específico por su ID.
     """
-    case = db.query(TestCase).filter(TestCase.id == case_id).first()
+    case = await db.get(TestCase, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Caso de prueba no encontrado")
     return case
 
 @router.delete("/{case_id}")
-async def delete_case(case_id: int, db: Session = Depends(get_db)):
+async def delete_case(case_id: int, db: AsyncSession = Depends(get_db)):
     """
     Elimina un caso de prueba por su ID.
     """
-    case = db.query(TestCase).filter(TestCase.id == case_id).first()
+    case = await db.get(TestCase, case_id)
     if not case:
         raise HTTPException(status_code=404, detail="Caso de prueba no encontrado")
     
-    db.delete(case)
-    db.commit()
+    await db.delete(case)
+    await db.commit()
     return {"message": "Caso de prueba eliminado exitosamente"}
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, Query, Request
-from fastapi.responses import HTMLResponse
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import HTMLResponse, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.dashboard_service import DashboardService
 from app.config import get_db
-from typing import Optional
+from app.utils.pagination import paginate_rows, NEXT_CURSOR_HEADER
+from app.utils.cache import dashboard_cache
+from app.utils.static_assets import static_assets
+from app.services.live_events import live_events
+from app.services.log_reader import LogReader
+from app.services.export_service import ResultExportService, EXPORT_FORMATS, parquet_available
+from app.config import AsyncSessionLocal
+from datetime import datetime
+import asyncio
+import re
+from typing import List, Optional
 
 # ✅ QUITAR el prefix aquí porque ya se agrega en main.py
 router = APIRouter(tags=["Dashboard"])
@@ -12,415 +22,332 @@ router = APIRouter(tags=["Dashboard"])
 async def dashboard_html(request: Request):
     """
     🖥️ Dashboard HTML interactivo con gráficos en tiempo real.
+
+    La página y sus assets (JS, CSS, gráficos) se sirven desde `app/static`,
+    pre-comprimidos y sin depender de CDNs externos.
     """
-    html_content = """
-<!DOCTYPE html>
-<html lang="es">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>QA Fast Web - Dashboard</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.min.js"></script>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: #333;
-            padding: 20px;
-        }
-        
-        .container {
-            max-width: 1400px;
-            margin: 0 auto;
-        }
-        
-        header {
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            margin-bottom: 30px;
-            text-align: center;
-        }
-        
-        h1 {
-            color: #667eea;
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }
-        
-        .subtitle {
-            color: #666;
-            font-size: 1.1em;
-        }
-        
-        .metrics-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(250px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .metric-card {
-            background: white;
-            padding: 25px;
-            border-radius: 15px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            text-align: center;
-            transition: transform 0.3s;
-        }
-        
-        .metric-card:hover {
-            transform: translateY(-5px);
-            box-shadow: 0 10px 25px rgba(0,0,0,0.15);
-        }
-        
-        .metric-value {
-            font-size: 3em;
-            font-weight: bold;
-            margin: 10px 0;
-        }
-        
-        .metric-label {
-            color: #666;
-            font-size: 1em;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }
-        
-        .metric-card.success .metric-value { color: #10b981; }
-        .metric-card.warning .metric-value { color: #f59e0b; }
-        .metric-card.danger .metric-value { color: #ef4444; }
-        .metric-card.info .metric-value { color: #3b82f6; }
-        
-        .charts-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(500px, 1fr));
-            gap: 20px;
-            margin-bottom: 30px;
-        }
-        
-        .chart-card {
-            background: white;
-            padding: 25px;
-            border-radius: 15px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-        }
-        
-        .chart-card h2 {
-            color: #667eea;
-            margin-bottom: 20px;
-            font-size: 1.5em;
-        }
-        
-        .executions-table {
-            background: white;
-            padding: 25px;
-            border-radius: 15px;
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
-            overflow-x: auto;
-        }
-        
-        table {
-            width: 100%;
-            border-collapse: collapse;
-        }
-        
-        th, td {
-            padding: 15px;
-            text-align: left;
-            border-bottom: 1px solid #e5e7eb;
-        }
-        
-        th {
-            background: #f3f4f6;
-            color: #667eea;
-            font-weight: 600;
-            text-transform: uppercase;
-            font-size: 0.85em;
-            letter-spacing: 1px;
-        }
-        
-        tr:hover {
-            background: #f9fafb;
-        }
-        
-        .status-badge {
-            padding: 5px 15px;
-            border-radius: 20px;
-            font-size: 0.85em;
-            font-weight: 600;
-            display: inline-block;
-        }
-        
-        .status-passed { background: #d1fae5; color: #065f46; }
-        .status-failed { background: #fee2e2; color: #991b1b; }
-        .status-error { background: #fef3c7; color: #92400e; }
-        
-        .refresh-btn {
-            position: fixed;
-            bottom: 30px;
-            right: 30px;
-            background: #667eea;
-            color: white;
-            border: none;
-            padding: 15px 30px;
-            border-radius: 50px;
-            font-size: 1em;
-            font-weight: 600;
-            cursor: pointer;
-            box-shadow: 0 5px 15px rgba(102, 126, 234, 0.4);
-            transition: all 0.3s;
-        }
-        
-        .refresh-btn:hover {
-            background: #764ba2;
-            transform: scale(1.05);
-        }
-        
-        .auto-refresh {
-            color: white;
-            text-align: center;
-            margin-top: 20px;
-            font-size: 0.9em;
-        }
-        
-        @keyframes pulse {
-            0%, 100% { opacity: 1; }
-            50% { opacity: 0.5; }
-        }
-        
-        .loading {
-            animation: pulse 1.5s ease-in-out infinite;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <header>
-            <h1>🚀 QA Fast Web Dashboard</h1>
-            <p class="subtitle">Sistema de Automatización con Manus IA + Selenium</p>
-        </header>
-
-        <!-- Métricas Principales -->
-        <div class="metrics-grid" id="metrics"></div>
-
-        <!-- Gráficos -->
-        <div class="charts-grid">
-            <div class="chart-card">
-                <h2>📊 Distribución de Estados</h2>
-                <canvas id="statusChart"></canvas>
-            </div>
-            <div class="chart-card">
-                <h2>📈 Tendencia de Ejecuciones (7 días)</h2>
-                <canvas id="timelineChart"></canvas>
-            </div>
-        </div>
-
-        <!-- Tabla de Ejecuciones Recientes -->
-        <div class="executions-table">
-            <h2 style="color: #667eea; margin-bottom: 20px;">📋 Últimas Ejecuciones</h2>
-            <table id="executionsTable">
-                <thead>
-                    <tr>
-                        <th>ID</th>
-                        <th>Test</th>
-                        <th>Estado</th>
-                        <th>Tiempo</th>
-                        <th>Fecha</th>
-                    </tr>
-                </thead>
-                <tbody></tbody>
-            </table>
-        </div>
-
-        <button class="refresh-btn" onclick="loadDashboard()">🔄 Actualizar</button>
-        <div class="auto-refresh">Actualización automática cada 30 segundos</div>
-    </div>
-
-    <script>
-        let statusChart, timelineChart;
-        
-        async function loadDashboard() {
-            try {
-                // Cargar métricas
-                const metricsRes = await fetch('/api/dashboard/metrics');
-                const metrics = await metricsRes.json();
-                renderMetrics(metrics);
-                
-                // Cargar gráfico de estados
-                renderStatusChart(metrics.status_breakdown);
-                
-                // Cargar timeline
-                const timelineRes = await fetch('/api/dashboard/timeline?days=7');
-                const timeline = await timelineRes.json();
-                renderTimelineChart(timeline);
-                
-                // Cargar tabla de ejecuciones
-                const executionsRes = await fetch('/api/dashboard/recent?limit=10');
-                const executions = await executionsRes.json();
-                renderExecutionsTable(executions);
-                
-            } catch (error) {
-                console.error('Error cargando dashboard:', error);
-            }
-        }
-        
-        function renderMetrics(metrics) {
-            const metricsHtml = `
-                <div class="metric-card info">
-                    <div class="metric-label">Total Tests</div>
-                    <div class="metric-value">${metrics.summary.total_cases}</div>
-                </div>
-                <div class="metric-card success">
-                    <div class="metric-label">Ejecuciones</div>
-                    <div class="metric-value">${metrics.summary.total_executions}</div>
-                </div>
-                <div class="metric-card warning">
-                    <div class="metric-label">Tasa de Éxito</div>
-                    <div class="metric-value">${metrics.status_breakdown.success_rate}%</div>
-                </div>
-                <div class="metric-card danger">
-                    <div class="metric-label">Últimas 24h</div>
-                    <div class="metric-value">${metrics.summary.executions_24h}</div>
-                </div>
-            `;
-            document.getElementById('metrics').innerHTML = metricsHtml;
-        }
-        
-        function renderStatusChart(breakdown) {
-            const ctx = document.getElementById('statusChart').getContext('2d');
-            
-            if (statusChart) statusChart.destroy();
-            
-            statusChart = new Chart(ctx, {
-                type: 'doughnut',
-                data: {
-                    labels: ['Passed', 'Failed', 'Error'],
-                    datasets: [{
-                        data: [breakdown.passed, breakdown.failed, breakdown.error],
-                        backgroundColor: ['#10b981', '#ef4444', '#f59e0b'],
-                        borderWidth: 0
-                    }]
-                },
-                options: {
-                    responsive: true,
-                    plugins: {
-                        legend: { position: 'bottom' }
-                    }
-                }
-            });
-        }
-        
-        function renderTimelineChart(timeline) {
-            const ctx = document.getElementById('timelineChart').getContext('2d');
-            
-            if (timelineChart) timelineChart.destroy();
-            
-            timelineChart = new Chart(ctx, {
-                type: 'line',
-                data: {
-                    labels: timeline.map(d => d.date),
-                    datasets: [
-                        {
-                            label: 'Passed',
-                            data: timeline.map(d => d.passed),
-                            borderColor: '#10b981',
-                            backgroundColor: 'rgba(16, 185, 129, 0.1)',
-                            tension: 0.4
-                        },
-                        {
-                            label: 'Failed',
-                            data: timeline.map(d => d.failed),
-                            borderColor: '#ef4444',
-                            backgroundColor: 'rgba(239, 68, 68, 0.1)',
-                            tension: 0.4
-                        }
-                    ]
-                },
-                options: {
-                    responsive: true,
-                    plugins: {
-                        legend: { position: 'bottom' }
-                    }
-                }
-            });
-        }
-        
-        function renderExecutionsTable(executions) {
-            const tbody = document.querySelector('#executionsTable tbody');
-            tbody.innerHTML = executions.map(ex => `
-                <tr>
-                    <td>#${ex.id}</td>
-                    <td>${ex.test_name}</td>
-                    <td><span class="status-badge status-${ex.status}">${ex.status.toUpperCase()}</span></td>
-                    <td>${ex.execution_time}</td>
-                    <td>${ex.created_at}</td>
-                </tr>
-            `).join('');
-        }
-        
-        // Cargar al inicio
-        loadDashboard();
-        
-        // Auto-refresh cada 30 segundos
-        setInterval(loadDashboard, 30000);
-    </script>
-</body>
-</html>
-    """
-    return HTMLResponse(content=html_content)
+    asset, _ = static_assets.find("dashboard/index.html")
+    return static_assets.respond(request, asset)
+
+# TTL (segundos) de la caché de cada endpoint; las escrituras la invalidan antes
+CACHE_TTLS = {
+    "snapshot": 15,
+    "metrics": 30,
+    "recent": 15,
+    "timeline": 120,
+    "test-stats": 120,
+    "flaky": 30,
+    "duration-drift": 30,
+}
 
 # Mantener los endpoints JSON para el dashboard HTML
+@router.get("/snapshot")
+async def get_dashboard_snapshot(
+    request: Request,
+    days: int = Query(7, ge=1, le=30),
+    limit: int = Query(10, ge=1, le=50),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    📸 Todos los paneles del dashboard en una sola respuesta y una sola lectura consistente.
+    """
+    dashboard = DashboardService(db)
+    return await dashboard_cache.respond(
+        request, "snapshot", CACHE_TTLS["snapshot"],
+        lambda response: dashboard.get_snapshot(days=days, limit=limit)
+    )
+
 @router.get("/metrics")
-async def get_metrics(db: Session = Depends(get_db)):
+async def get_metrics(request: Request, db: AsyncSession = Depends(get_db)):
     dashboard = DashboardService(db)
-    return dashboard.get_metrics()
+    return await dashboard_cache.respond(
+        request, "metrics", CACHE_TTLS["metrics"],
+        lambda response: dashboard.get_metrics()
+    )
 
 @router.get("/recent")
-async def get_recent_executions(limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+async def get_recent_executions(
+    request: Request,
+    limit: int = Query(10, ge=1, le=50),
+    cursor: Optional[int] = Query(None, description="ID de la última ejecución de la página anterior"),
+    db: AsyncSession = Depends(get_db)
+):
     dashboard = DashboardService(db)
-    return dashboard.get_recent_executions(limit=limit)
+
+    async def compute(response: Response):
+        rows = await dashboard.get_recent_executions(limit=limit, cursor=cursor)
+        return paginate_rows(rows, limit, response)
+
+    return await dashboard_cache.respond(request, "recent", CACHE_TTLS["recent"], compute)
 
 @router.get("/timeline")
-async def get_execution_timeline(days: int = Query(7, ge=1, le=30), db: Session = Depends(get_db)):
+async def get_execution_timeline(
+    request: Request,
+    days: int = Query(7, ge=1, le=365),
+    granularity: str = Query("day", pattern="^(hour|day|week|month)$"),
+    source: str = Query("auto", pattern="^(auto|raw|rollup)$"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    📈 Línea temporal de ejecuciones con buckets rellenados en SQL.
+
+    `source=rollup` (o `auto` para rangos largos) lee los conteos diarios
+    pre-agregados en lugar del historial crudo.
+    """
+    if granularity == "hour" and days > 31:
+        raise HTTPException(status_code=400, detail="La granularidad por hora admite como máximo 31 días")
+
     dashboard = DashboardService(db)
-    return dashboard.get_execution_timeline(days=days)
+    return await dashboard_cache.respond(
+        request, "timeline", CACHE_TTLS["timeline"],
+        lambda response: dashboard.get_execution_timeline(days=days, granularity=granularity, source=source)
+    )
 
 @router.get("/test-stats")
-async def get_test_case_stats(db: Session = Depends(get_db)):
+async def get_test_case_stats(
+    request: Request,
+    sort: str = Query("executions", pattern="^(success_rate|executions|last_failure|avg_duration)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    min_executions: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Valor de X-Next-Cursor de la página anterior"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    🧮 Estadísticas por caso, ordenables y paginadas por cursor.
+
+    Ej: los 20 casos con peor tasa de éxito:
+    `/test-stats?sort=success_rate&order=asc&min_executions=5&limit=20`.
+    Con `last_failure` o `avg_duration` solo se listan casos que tienen ese dato.
+    """
+    dashboard = DashboardService(db)
+
+    async def compute(response: Response):
+        try:
+            rows, next_cursor = await dashboard.get_test_case_stats(
+                sort=sort, order=order, min_executions=min_executions, limit=limit, cursor=cursor
+            )
+        except ValueError as ve:
+            raise HTTPException(status_code=400, detail=str(ve))
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return rows
+
+    return await dashboard_cache.respond(request, "test-stats", CACHE_TTLS["test-stats"], compute)
+
+@router.get("/flaky")
+async def get_flaky_cases(
+    request: Request,
+    top: int = Query(10, ge=1, le=100),
+    min_runs: int = Query(5, ge=2, description="Mínimo de ejecuciones en la ventana"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    🎲 Casos más inestables (alternan entre pasar y fallar).
+
+    `score` = cambios de estado / (ejecuciones - 1) sobre las últimas
+    `FLAKY_WINDOW_SIZE` ejecuciones de cada caso. `history` las muestra
+    de la más antigua a la más reciente (P = passed, F = failed, E = error).
+    """
+    dashboard = DashboardService(db)
+    return await dashboard_cache.respond(
+        request, "flaky", CACHE_TTLS["flaky"],
+        lambda response: dashboard.get_flaky_cases(top=top, min_runs=min_runs)
+    )
+
+@router.get("/duration-drift")
+async def get_duration_drift(
+    request: Request,
+    top: int = Query(10, ge=1, le=100),
+    min_drift: float = Query(1.0, ge=0, description="Desviaciones estándar mínimas sobre la media"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    🐢 Casos cuya duración de ejecución viene subiendo.
+
+    Cada ejecución se compara con la media y varianza históricas del caso
+    (Welford); las que superan el umbral de z-score o percentil se cuentan
+    en `flagged_runs`.
+    """
     dashboard = DashboardService(db)
-    return dashboard.get_test_case_stats()
+    return await dashboard_cache.respond(
+        request, "duration-drift", CACHE_TTLS["duration-drift"],
+        lambda response: dashboard.get_duration_drift(top=top, min_drift=min_drift)
+    )
+
+# Comentario keep-alive para que proxies no cierren la conexión SSE
+SSE_KEEPALIVE_SECONDS = 15
+
+@router.get("/stream")
+async def stream_dashboard_events(request: Request):
+    """
+    📡 Eventos en vivo (Server-Sent Events) para el dashboard.
+
+    - `result`: nueva ejecución guardada (id, test_name, status, tiempo, fecha)
+    - `cases`: se agregaron casos de prueba
+    - `resync`: el cliente se atrasó y debe recargar el snapshot
+    """
+    queue = live_events.subscribe()
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                    yield live_events.format_sse(message)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+        finally:
+            live_events.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # Content-Encoding explícito: GZipMiddleware retendría los eventos en su buffer
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Content-Encoding": "identity"}
+    )
+
+@router.get("/export")
+async def export_results(
+    format: str = Query("csv", pattern="^(csv|jsonl|parquet)$"),
+    date_from: Optional[datetime] = Query(None, description="Desde (inclusive)"),
+    date_to: Optional[datetime] = Query(None, description="Hasta (exclusive)"),
+    status: Optional[List[str]] = Query(None, description="Uno o más estados"),
+    test_case_id: Optional[int] = None
+):
+    """
+    📤 Exporta el historial de ejecuciones (con nombre del caso y prompt usado).
+
+    Se genera por bloques desde un cursor del servidor: sirve para
+    volúmenes grandes sin cargar todo en memoria.
+    """
+    if format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Exportación Parquet no disponible: instalar pyarrow")
+    if date_from and date_to and date_from >= date_to:
+        raise HTTPException(status_code=400, detail="date_from debe ser anterior a date_to")
+
+    filters = {"date_from": date_from, "date_to": date_to, "statuses": status, "test_case_id": test_case_id}
+
+    async def export_stream():
+        # Sesión propia: la de la dependencia se cierra antes de terminar el streaming
+        async with AsyncSessionLocal() as db:
+            async for chunk in ResultExportService(db).stream(format, **filters):
+                yield chunk
+
+    filename = f"resultados_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "parquet":
+        headers["Content-Encoding"] = "identity"  # Ya comprimido por columnas
+
+    return StreamingResponse(export_stream(), media_type=EXPORT_FORMATS[format], headers=headers)
+
+@router.get("/cache-stats")
+async def get_cache_stats():
+    """
+    📦 Aciertos, fallos y tasa de acierto de la caché del dashboard.
+    """
+    return dashboard_cache.stats()
 
 @router.get("/execution/{execution_id}")
 async def get_execution_details(
     execution_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
-    🔍 Detalles completos de una ejecución específica.
+    🔍 Detalles de una ejecución específica.
     
     Incluye:
-    - Datos de la ejecución
+    - Datos de la ejecución (con tamaño y vista previa de los logs)
     - Caso de prueba asociado
-    - Prompt y código generado
-    - Logs completos
+    - Vista previa del prompt y código generado
+    
+    Los logs completos se leen por partes en `/execution/{id}/logs`.
     """
     dashboard = DashboardService(db)
-    return dashboard.get_execution_details(execution_id)
+    details = await dashboard.get_execution_details(execution_id)
+    if details is None:
+        raise HTTPException(status_code=404, detail="Ejecución no encontrada")
+    return details
+
+# Tamaño por defecto y máximo de cada tramo de logs (bytes)
+LOG_PAGE_SIZE = 64 * 1024
+LOG_MAX_PAGE_SIZE = 1024 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+@router.get("/execution/{execution_id}/logs")
+async def get_execution_logs(
+    execution_id: int,
+    request: Request,
+    offset: int = Query(0, ge=0, description="Byte inicial"),
+    length: int = Query(LOG_PAGE_SIZE, ge=1, le=LOG_MAX_PAGE_SIZE, description="Cantidad de bytes"),
+    tail: Optional[int] = Query(None, ge=1, le=10000, description="Últimas N líneas"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    📜 Tramo de los logs de una ejecución, sin cargar el log completo.
+
+    - `offset` + `length`: bytes [offset, offset + length)
+    - `tail=N`: últimas N líneas
+    - Header `Range: bytes=a-b` o `bytes=-N` (responde 206 con Content-Range)
+
+    `X-Log-Size` trae el tamaño total y `X-Next-Offset` el siguiente byte a
+    pedir. Los offsets son bytes UTF-8: un tramo puede cortar un carácter.
+    """
+    reader = LogReader(db)
+    if not await reader.open(execution_id):
+        raise HTTPException(status_code=404, detail="Ejecución sin logs o inexistente")
+
+    size = reader.size
+    # identity: si GZipMiddleware comprime el cuerpo, Content-Range y los offsets dejan de valer
+    headers = {"Accept-Ranges": "bytes", "X-Log-Size": str(size), "Content-Encoding": "identity"}
+    status_code = 200
+    range_header = request.headers.get("range")
+
+    if tail:
+        start, data = await reader.tail(tail)
+    elif range_header:
+        match = _RANGE_RE.match(range_header.strip())
+        if not match or match.groups() == ("", ""):
+            raise HTTPException(status_code=400, detail="Header Range no válido")
+        first, last = match.groups()
+        if first and last and int(last) < int(first):
+            raise HTTPException(status_code=416, detail="Rango invertido", headers={"Content-Range": f"bytes */{size}"})
+        if first:
+            start = int(first)
+            end = int(last) + 1 if last else start + LOG_PAGE_SIZE
+        else:
+            start, end = max(0, size - int(last)), size
+        if start >= size:
+            raise HTTPException(status_code=416, detail="Rango fuera del log", headers={"Content-Range": f"bytes */{size}"})
+        end = min(end, start + LOG_MAX_PAGE_SIZE, size)
+        data = await reader.read(start, end)
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{start + len(data) - 1}/{size}"
+    else:
+        start = offset
+        data = await reader.read(start, start + length)
+
+    if data and start + len(data) < size:
+        headers["X-Next-Offset"] = str(start + len(data))
+
+    return Response(content=data, media_type="text/plain; charset=utf-8", status_code=status_code, headers=headers)
 
 @router.get("/prompts")
 async def get_prompts_history(
+    response: Response,
     test_case_id: Optional[int] = None,
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[int] = Query(None, description="ID del último prompt de la página anterior"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     📝 Historial de prompts generados.
     
-    Opcionalmente filtrar por test_case_id.
+    Opcionalmente filtrar por test_case_id. Paginado por cursor:
+    el siguiente cursor viene en el header `X-Next-Cursor`.
     """
     dashboard = DashboardService(db)
-    return dashboard.get_prompts_history(test_case_id=test_case_id, limit=limit)
+    rows = await dashboard.get_prompts_history(test_case_id=test_case_id, limit=limit, cursor=cursor)
+    return paginate_rows(rows, limit, response)
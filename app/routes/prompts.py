@@ -0,0 +1,40 @@
+# app/routes/prompts.py
+
+import asyncio
+from fastapi import APIRouter, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import get_db
+from app.models.case_model import TestCase
+from app.schemas.prompt_schema import PromptPreviewRequest, PromptPreviewResponse
+from app.services.prompt_builder import PromptBuilder
+
+
+router = APIRouter()
+
+@router.post("/preview", response_model=PromptPreviewResponse)
+async def preview_prompts(request: PromptPreviewRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Genera los prompts de un conjunto de casos sin enviarlos a Manus.
+
+    Pensado para revisar una suite completa antes de ejecutarla: los casos
+    se agrupan por tipo de test y cada template se carga una sola vez.
+    `prompt_hash` identifica el conjunto de prompts (sirve como clave de
+    caché); los ids inexistentes se devuelven en `missing`.
+    """
+    case_ids = list(dict.fromkeys(request.case_ids))  # Sin repetidos, en el orden pedido
+    found = {
+        case.id: case
+        for case in (await db.scalars(select(TestCase).where(TestCase.id.in_(case_ids)))).all()
+    }
+    cases = [found[case_id] for case_id in case_ids if case_id in found]
+
+    # Detección, extracción y formateo son CPU: fuera del event loop
+    prompts, digest = await asyncio.to_thread(PromptBuilder().build_prompts, cases)
+
+    return PromptPreviewResponse(
+        prompt_hash=digest,
+        total=len(prompts),
+        prompts=prompts,
+        missing=[case_id for case_id in case_ids if case_id not in found],
+    )
@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 class TestCaseCreate(BaseModel):
     """Schema para crear un caso de prueba"""
@@ -27,6 +27,71 @@ class TestCaseResponse(BaseModel):
         from_attributes = True  # Para Pydantic v2 (antes era orm_mode = True)
 
 
+class TestCaseListItem(BaseModel):
+    """Schema para listados paginados (admite proyección de campos con `fields=`)"""
+    id: int
+    name: Optional[str] = None
+    description: Optional[str] = None
+    steps: Optional[str] = None
+    expected_result: Optional[str] = None
+    url: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class UploadSummary(BaseModel):
+    """Resultado de una carga de casos (upsert por nombre + hash de contenido)"""
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0  # Nombre repetido en el mismo bloque: solo se guarda la última fila
+    total: int = 0
+
+
+class ImportRowError(BaseModel):
+    """Fila del archivo que no se pudo importar"""
+    row: int
+    sheet: Optional[str] = None  # Solo en Excel
+    error: str
+
+
+class ImportSheetSummary(BaseModel):
+    """Totales de una hoja del libro importado"""
+    sheet: str
+    rows_done: int = 0
+    rows_failed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+
+
+class ImportJobResponse(BaseModel):
+    """Estado y progreso de una importación en segundo plano"""
+    id: int
+    filename: str
+    status: str
+    rows_done: int = 0
+    rows_failed: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+    pregenerate: bool = False
+    sheets: Optional[List[ImportSheetSummary]] = None
+    errors: List[ImportRowError] = []
+    message: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 # === Alias opcionales para mantener compatibilidad con tu código ===
 CaseCreate = TestCaseCreate
 CaseResponse = TestCaseResponse
@@ -1,6 +1,6 @@
 # app/schemas/prompt_schema.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class PromptBase(BaseModel):
@@ -17,3 +17,20 @@ class PromptResponse(PromptBase):
 
     class Config:
         orm_mode = True
+
+
+# Casos por solicitud de vista previa de prompts
+PREVIEW_MAX_CASES = 5000
+
+
+class PromptPreviewRequest(BaseModel):
+    """Casos (ej: los de una suite) cuyos prompts se quieren previsualizar"""
+    case_ids: List[int] = Field(..., min_length=1, max_length=PREVIEW_MAX_CASES)
+
+
+class PromptPreviewResponse(BaseModel):
+    """Prompts generados sin llamar a Manus"""
+    prompt_hash: str  # Clave de caché del conjunto: cambia si cambia algún prompt
+    total: int
+    prompts: Dict[int, str]  # id de caso -> prompt, en el orden pedido
+    missing: List[int] = []  # ids que no existen
@@ -1,4 +1,3 @@
-import requests
 import os
 import re
 from typing import Dict, Any
@@ -157,6 +156,7 @@ class AgentClient:
         Returns:
             Resultado de la ejecución con logs y screenshots
         """
+        import requests
         # ✅ Extraer código limpio antes de enviar
         clean_code = self.extract_python_code(script_code)
         
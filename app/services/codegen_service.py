@@ -0,0 +1,157 @@
+# app/services/codegen_service.py
+import asyncio
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import exists, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings, AsyncSessionLocal
+from app.models.artifact_model import load_text
+from app.models.case_model import TestCase
+from app.models.prompt_model import Prompt
+from app.services.prompt_builder import PromptBuilder
+from app.services.ia_client import IAClient, extract_python_code
+from app.utils.logger import setup_logger
+
+logger = setup_logger("codegen")
+
+# Consulta del estado de una tarea de Manus (igual que en /api/execute)
+MANUS_POLL_INTERVAL_SECONDS = 10
+MANUS_POLL_ATTEMPTS = 60
+
+# Código más corto que esto se considera respuesta inválida
+MIN_CODE_LENGTH = 50
+
+
+def _ready_prompts(test_case: TestCase):
+    return (Prompt.test_case_id == test_case.id, Prompt.case_hash == test_case.content_hash, Prompt.code_hash.is_not(None))
+
+
+async def has_ready_code(db: AsyncSession, test_case: TestCase) -> bool:
+    """Si la versión actual del caso ya tiene código listo (sin leer el artefacto)."""
+    if not test_case.content_hash:
+        return False
+    return await db.scalar(select(exists().where(*_ready_prompts(test_case))))
+
+
+async def get_ready_code(db: AsyncSession, test_case: TestCase) -> Optional[str]:
+    """
+    Código listo para ejecutar de la versión actual del caso, o None.
+
+    Es el último prompt del caso guardado con `case_hash` igual al
+    `content_hash` actual: si el caso cambió, el código anterior ya no aplica.
+    """
+    if not test_case.content_hash:
+        return None
+    prompt = await db.scalar(
+        select(Prompt)
+        .where(*_ready_prompts(test_case))
+        .order_by(Prompt.created_at.desc())
+        .limit(1)
+    )
+    if prompt is None:
+        return None
+    return await load_text(db, prompt, "generated_code")
+
+
+class CodeGenerationService:
+    """
+    Pre-generación de código con Manus en segundo plano.
+
+    Las importaciones con `pregenerate` encolan los casos nuevos o
+    modificados; cada worker genera el prompt, crea la tarea en Manus, espera
+    el código y lo guarda ya extraído en `prompts` con el hash del caso. Así
+    `/api/execute` solo tiene que enviarlo al executor.
+
+    Hay `PREGENERATE_CONCURRENCY` workers: nunca hay más tareas de Manus en
+    curso que eso. Un caso sale de la lista de pendientes cuando un worker
+    lo toma: si se vuelve a subir modificado mientras se genera, se encola
+    de nuevo y el código de la versión vieja se descarta. La cola vive en
+    memoria; lo pendiente al reiniciar se pierde y esos casos se generan al
+    ejecutarlos, como siempre.
+    """
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending: Set[int] = set()
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(max(1, settings.PREGENERATE_CONCURRENCY))
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+
+    def enqueue(self, case_ids: Iterable[int]) -> int:
+        """Encola casos para pre-generar (los ya encolados se omiten). Devuelve cuántos se agregaron."""
+        added = 0
+        for case_id in case_ids:
+            if case_id not in self._pending:
+                self._pending.add(case_id)
+                self._queue.put_nowait(case_id)
+                added += 1
+        return added
+
+    async def _worker(self) -> None:
+        while True:
+            case_id = await self._queue.get()
+            self._pending.discard(case_id)  # Desde acá, un cambio en el caso lo vuelve a encolar
+            try:
+                await self.generate(case_id)
+            except Exception as e:
+                logger.error(f"[CODEGEN] Caso {case_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def generate(self, case_id: int) -> bool:
+        """
+        Genera y guarda el código de la versión actual de un caso.
+        Devuelve False si no se guardó nada (caso inexistente, código ya
+        listo, o el caso cambió mientras Manus generaba).
+        """
+        async with AsyncSessionLocal() as db:
+            test_case = await db.get(TestCase, case_id)
+            if test_case is None or await has_ready_code(db, test_case):
+                return False
+            case_hash = test_case.content_hash
+            prompt_text = PromptBuilder().build_prompt(test_case)
+
+        # Sin sesión abierta mientras Manus trabaja (puede tardar minutos)
+        code = extract_python_code(await self._wait_for_code(prompt_text))
+        if len(code) < MIN_CODE_LENGTH:
+            raise ValueError("Manus no devolvió código ejecutable")
+
+        async with AsyncSessionLocal() as db:
+            current = await db.scalar(select(TestCase.content_hash).where(TestCase.id == case_id))
+            if current != case_hash:
+                logger.info(f"[CODEGEN] Caso {case_id} cambió durante la generación: código descartado")
+                return False
+            db.add(Prompt(test_case_id=case_id, prompt_text=prompt_text, generated_code=code, case_hash=case_hash))
+            await db.commit()
+        logger.info(f"[CODEGEN] Código listo para el caso {case_id} ({len(code)} chars)")
+        return True
+
+    async def _wait_for_code(self, prompt_text: str) -> str:
+        """Crea la tarea en Manus y espera a que termine; devuelve su respuesta."""
+        ia_client = IAClient()
+        task = await asyncio.to_thread(ia_client.generate_code, prompt=prompt_text, agent_profile="manus-1.5")
+        task_id = task.get("task_id")
+        if not task_id:
+            raise ValueError(f"Manus no devolvió task_id: {task}")
+
+        for _ in range(MANUS_POLL_ATTEMPTS):
+            await asyncio.sleep(MANUS_POLL_INTERVAL_SECONDS)
+            status = await asyncio.to_thread(ia_client.get_task_status, task_id)
+            if status.get("status") == "completed":
+                return status.get("code_text", "")
+            if status.get("status") == "failed":
+                raise ValueError(f"Manus falló: {status.get('error', 'Error desconocido')}")
+        raise TimeoutError(f"Tarea {task_id} sin terminar tras {MANUS_POLL_ATTEMPTS} consultas")
+
+
+# Instancia única: los workers se inician en el lifespan de la app
+codegen_service = CodeGenerationService()
@@ -1,54 +1,86 @@
 # app/services/dashboard_service.py
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
+from sqlalchemy.orm import aliased
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, desc, select, cast, literal, DateTime
+from sqlalchemy.dialects.postgresql import INTERVAL
+from app.models.artifact_model import Artifact
 from app.models.case_model import TestCase
 from app.models.result_model import TestResult
 from app.models.prompt_model import Prompt
+from app.models.rollup_model import ResultDailyRollup
+from app.models.flakiness_model import TestCaseFlakiness
+from app.models.duration_model import TestCaseDurationStats, stddev, zscore_threshold
+from app.models.case_stats_model import TestCaseStats
+from app.utils.pagination import apply_keyset, apply_sort_keyset, encode_cursor, decode_cursor
 from datetime import datetime, timedelta
-from typing import Dict, List, Any
+from types import SimpleNamespace
+from typing import Dict, List, Any, Optional, Tuple
+
+# Estados que se grafican en la línea temporal
+TIMELINE_STATUSES = ("passed", "failed", "error")
+
+# Con source=auto, rangos mayores a esto se leen de los rollups diarios
+TIMELINE_ROLLUP_MIN_DAYS = 31
+
+# Claves de orden de /test-stats: columna indexada y conversor del cursor
+TEST_STATS_SORTS = {
+    "success_rate": (TestCaseStats.success_rate, float),
+    "executions": (TestCaseStats.executions, int),
+    "last_failure": (TestCaseStats.last_failure_at, datetime.fromisoformat),
+    "avg_duration": (TestCaseStats.avg_duration, float),
+}
 
 class DashboardService:
     """
     Servicio para generar métricas y estadísticas del dashboard.
     """
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_metrics(self) -> Dict[str, Any]:
+    async def _count(self, model, *criteria) -> int:
+        query = select(func.count()).select_from(model)
+        if criteria:
+            query = query.where(*criteria)
+        return await self.db.scalar(query)
+
+    async def get_metrics(self) -> Dict[str, Any]:
         """
         Retorna métricas generales de ejecución.
         """
         # Total de casos de prueba
-        total_cases = self.db.query(TestCase).count()
+        total_cases = await self._count(TestCase)
         
-        # Total de ejecuciones
-        total_executions = self.db.query(TestResult).count()
+        # Ejecuciones por estado (una sola consulta agrupada)
+        by_status = dict((await self.db.execute(
+            select(TestResult.status, func.count()).group_by(TestResult.status)
+        )).all())
+        passed = by_status.get("passed", 0)
+        failed = by_status.get("failed", 0)
+        error = by_status.get("error", 0)
         
-        # Ejecuciones por estado
-        passed = self.db.query(TestResult).filter(TestResult.status == "passed").count()
-        failed = self.db.query(TestResult).filter(TestResult.status == "failed").count()
-        error = self.db.query(TestResult).filter(TestResult.status == "error").count()
+        # Total de ejecuciones
+        total_executions = sum(by_status.values())
         
         # Tasa de éxito
         success_rate = round((passed / total_executions * 100), 2) if total_executions > 0 else 0
         
         # Prompts generados
-        total_prompts = self.db.query(Prompt).count()
+        total_prompts = await self._count(Prompt)
         
         # Ejecuciones últimas 24 horas
         yesterday = datetime.now() - timedelta(days=1)
-        executions_24h = self.db.query(TestResult).filter(
-            TestResult.created_at >= yesterday
-        ).count()
+        executions_24h = await self._count(TestResult, TestResult.created_at >= yesterday)
         
         # Test más ejecutado - ✅ CORREGIDO: usar 'name' en lugar de 'test_name'
-        most_executed = self.db.query(
-            TestCase.name,
-            func.count(TestResult.id).label("count")
-        ).join(TestResult, TestCase.id == TestResult.test_case_id)\
-         .group_by(TestCase.id, TestCase.name)\
-         .order_by(desc("count"))\
-         .first()
+        most_executed = (await self.db.execute(
+            select(
+                TestCase.name,
+                func.count(TestResult.id).label("count")
+            ).join(TestResult, TestCase.id == TestResult.test_case_id)
+             .group_by(TestCase.id, TestCase.name)
+             .order_by(desc("count"))
+             .limit(1)
+        )).first()
         
         return {
             "summary": {
@@ -69,142 +101,403 @@ class DashboardService:
             }
         }
     
-    def get_recent_executions(self, limit: int = 10) -> List[Dict[str, Any]]:
+    async def get_recent_executions(self, limit: int = 10, cursor: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Lista las últimas ejecuciones con detalles completos.
+
+        Paginado por keyset sobre `id` descendente: devuelve hasta `limit + 1`
+        filas para que la ruta sepa si existe una página siguiente.
         """
-        executions = self.db.query(TestResult).join(
+        # Filas legacy sin preview: recortar en SQL en lugar de traer el log completo
+        logs_preview = func.coalesce(TestResult.logs_preview, func.substr(TestResult._logs, 1, 200))
+
+        query = select(TestResult, TestCase.name, logs_preview).outerjoin(
             TestCase, TestResult.test_case_id == TestCase.id
-        ).order_by(desc(TestResult.created_at)).limit(limit).all()
+        )
+        executions = (await self.db.execute(
+            apply_keyset(query, TestResult.id, cursor, limit, descending=True)
+        )).all()
         
         results = []
-        for execution in executions:
-            test_case = self.db.query(TestCase).filter(TestCase.id == execution.test_case_id).first()
-            
+        for execution, test_name, preview in executions:
             results.append({
                 "id": execution.id,
-                "test_name": test_case.name if test_case else "Unknown",  # ✅ CORREGIDO
+                "test_name": test_name or "Unknown",
                 "status": execution.status,
                 "execution_time": execution.execution_time,
                 "created_at": execution.created_at.strftime("%Y-%m-%d %H:%M:%S"),
                 "screenshot": execution.screenshot_path,
-                "logs_preview": execution.logs[:200] + "..." if execution.logs and len(execution.logs) > 200 else execution.logs
+                "logs_preview": preview
             })
         
         return results
     
-    def get_execution_timeline(self, days: int = 7) -> List[Dict[str, Any]]:
+    async def get_snapshot(self, days: int = 7, limit: int = 10) -> Dict[str, Any]:
+        """
+        Todos los paneles del dashboard (métricas, timeline, últimas ejecuciones)
+        calculados en una sola sesión y una sola lectura consistente.
+
+        En PostgreSQL la transacción es REPEATABLE READ: todas las consultas ven
+        la misma foto de la BD, así los paneles no pueden contradecirse.
+        """
+        if self.db.bind.dialect.name == "postgresql":
+            await self.db.connection(execution_options={"isolation_level": "REPEATABLE READ"})
+
+        metrics = await self.get_metrics()
+        timeline = await self.get_execution_timeline(days=days)
+        recent = await self.get_recent_executions(limit=limit)
+
+        compact_fields = ("id", "test_name", "status", "execution_time", "created_at")
+        return {
+            "generated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "metrics": metrics,
+            "timeline": timeline,
+            "recent": [{k: row[k] for k in compact_fields} for row in recent[:limit]]
+        }
+    
+    async def get_execution_timeline(
+        self,
+        days: int = 7,
+        granularity: str = "day",
+        source: str = "auto"
+    ) -> List[Dict[str, Any]]:
         """
         Datos para gráfico de línea temporal (últimos N días).
+
+        Los buckets (hora, día, semana o mes) se generan y rellenan en SQL con
+        `generate_series`, así los periodos sin ejecuciones aparecen en cero.
+
+        Args:
+            days: Rango hacia atrás desde ahora
+            granularity: hour | day | week | month
+            source: raw (test_results), rollup (result_daily_rollups) o auto
+                (rollup para rangos largos con granularidad diaria o mayor)
         """
-        start_date = datetime.now() - timedelta(days=days)
-        
-        timeline_data = self.db.query(
-            func.date(TestResult.created_at).label("date"),
-            TestResult.status,
-            func.count(TestResult.id).label("count")
-        ).filter(
-            TestResult.created_at >= start_date
-        ).group_by(
-            func.date(TestResult.created_at),
-            TestResult.status
-        ).order_by("date").all()
-        
-        formatted_data = {}
-        for record in timeline_data:
-            date_str = record.date.strftime("%Y-%m-%d")
-            if date_str not in formatted_data:
-                formatted_data[date_str] = {"date": date_str, "passed": 0, "failed": 0, "error": 0}
-            
-            formatted_data[date_str][record.status] = record.count
-        
-        return list(formatted_data.values())
+        now = datetime.now()
+        start_bucket = self._truncate(now - timedelta(days=days), granularity)
+        end_bucket = self._truncate(now, granularity)
+
+        use_rollup = granularity != "hour" and (
+            source == "rollup" or (source == "auto" and days > TIMELINE_ROLLUP_MIN_DAYS)
+        )
+
+        if self.db.bind.dialect.name != "postgresql":
+            rows = await self._timeline_python(start_bucket, granularity)
+        else:
+            rows = await self._timeline_sql(start_bucket, end_bucket, granularity, use_rollup)
+
+        label_format = "%Y-%m-%d %H:00" if granularity == "hour" else "%Y-%m-%d"
+        return [
+            {
+                "date": row.bucket.strftime(label_format),
+                "passed": row.passed,
+                "failed": row.failed,
+                "error": row.error
+            }
+            for row in rows
+        ]
+
+    @staticmethod
+    def _truncate(value: datetime, granularity: str) -> datetime:
+        """Equivalente en Python de date_trunc (semanas desde el lunes)."""
+        value = value.replace(minute=0, second=0, microsecond=0)
+        if granularity == "hour":
+            return value
+        value = value.replace(hour=0)
+        if granularity == "week":
+            return value - timedelta(days=value.weekday())
+        if granularity == "month":
+            return value.replace(day=1)
+        return value
+
+    async def _timeline_sql(self, start_bucket: datetime, end_bucket: datetime, granularity: str, use_rollup: bool):
+        step = cast(literal(f"1 {granularity}"), INTERVAL)
+        buckets = select(
+            func.generate_series(start_bucket, end_bucket, step).label("bucket")
+        ).subquery("buckets")
+
+        if use_rollup:
+            bucket = func.date_trunc(granularity, cast(ResultDailyRollup.day, DateTime))
+            counts = {
+                status: func.coalesce(func.sum(ResultDailyRollup.count).filter(ResultDailyRollup.status == status), 0)
+                for status in TIMELINE_STATUSES
+            }
+            where = ResultDailyRollup.day >= start_bucket.date()
+        else:
+            bucket = func.date_trunc(granularity, TestResult.created_at)
+            counts = {
+                status: func.count().filter(TestResult.status == status)
+                for status in TIMELINE_STATUSES
+            }
+            where = TestResult.created_at >= start_bucket
+
+        aggregated = select(
+            bucket.label("bucket"),
+            *[count.label(status) for status, count in counts.items()]
+        ).where(where).group_by(bucket).subquery("aggregated")
+
+        query = select(
+            buckets.c.bucket,
+            *[func.coalesce(aggregated.c[status], 0).label(status) for status in TIMELINE_STATUSES]
+        ).select_from(
+            buckets.outerjoin(aggregated, aggregated.c.bucket == buckets.c.bucket)
+        ).order_by(buckets.c.bucket)
+
+        return (await self.db.execute(query)).all()
+
+    async def _timeline_python(self, start_bucket: datetime, granularity: str):
+        """Alternativa para motores sin generate_series/date_trunc (ej: SQLite)."""
+        rows = (await self.db.execute(
+            select(TestResult.created_at, TestResult.status).where(TestResult.created_at >= start_bucket)
+        )).all()
+
+        step = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}
+        buckets = {}
+        current, end = start_bucket, self._truncate(datetime.now(), granularity)
+        while current <= end:
+            buckets[current] = dict.fromkeys(TIMELINE_STATUSES, 0)
+            if granularity == "month":
+                current = (current + timedelta(days=32)).replace(day=1)
+            else:
+                current += step[granularity]
+
+        for created_at, status in rows:
+            bucket = buckets.get(self._truncate(created_at, granularity))
+            if bucket is not None and status in bucket:
+                bucket[status] += 1
+
+        return [SimpleNamespace(bucket=key, **values) for key, values in buckets.items()]
     
-    def get_test_case_stats(self) -> List[Dict[str, Any]]:
-        """
-        Estadísticas por caso de prueba.
-        """
-        stats = self.db.query(
-            TestCase.name,  # ✅ CORREGIDO
-            func.count(TestResult.id).label("total_executions"),
-            func.sum(func.case((TestResult.status == "passed", 1), else_=0)).label("passed"),
-            func.sum(func.case((TestResult.status == "failed", 1), else_=0)).label("failed"),
-            func.sum(func.case((TestResult.status == "error", 1), else_=0)).label("error")
-        ).join(
-            TestResult, TestCase.id == TestResult.test_case_id
-        ).group_by(TestCase.id, TestCase.name).all()
-        
+    async def get_test_case_stats(
+        self,
+        sort: str = "executions",
+        order: str = "desc",
+        min_executions: int = 1,
+        limit: int = 20,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Estadísticas por caso de prueba, ordenadas y paginadas en SQL.
+
+        Lee los totales incrementales de `test_case_stats` recorriendo el
+        índice de la columna de orden: el costo depende de `limit`, no de la
+        cantidad de casos ni del historial. Devuelve (filas, siguiente cursor).
+
+        Raises:
+            ValueError: Si el cursor no es válido
+        """
+        column, parse = TEST_STATS_SORTS[sort]
+        descending = order == "desc"
+
+        query = select(TestCaseStats, TestCase.name)\
+            .join(TestCase, TestCase.id == TestCaseStats.test_case_id)\
+            .where(TestCaseStats.executions >= min_executions, column.is_not(None))
+        query = apply_sort_keyset(
+            query, column, TestCaseStats.test_case_id,
+            decode_cursor(cursor, parse), limit, descending=descending
+        )
+        rows = (await self.db.execute(query)).all()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1].TestCaseStats
+            next_cursor = encode_cursor(getattr(last, column.key), last.test_case_id)
+
         results = []
-        for stat in stats:
+        for stats, name in rows:
             results.append({
-                "test_name": stat.name,
-                "total_executions": stat.total_executions,
-                "passed": stat.passed,
-                "failed": stat.failed,
-                "error": stat.error,
-                "success_rate": round((stat.passed / stat.total_executions * 100), 2) if stat.total_executions > 0 else 0
+                "test_case_id": stats.test_case_id,
+                "test_name": name,
+                "total_executions": stats.executions,
+                "passed": stats.passed,
+                "failed": stats.failed,
+                "error": stats.error,
+                "success_rate": round(stats.success_rate, 2),
+                "avg_duration_seconds": round(stats.avg_duration, 2) if stats.avg_duration is not None else None,
+                "last_execution_at": stats.last_execution_at.strftime("%Y-%m-%d %H:%M:%S") if stats.last_execution_at else None,
+                "last_failure_at": stats.last_failure_at.strftime("%Y-%m-%d %H:%M:%S") if stats.last_failure_at else None
             })
-        
-        return results
-    
-    def get_execution_details(self, execution_id: int) -> Dict[str, Any]:
+
+        return results, next_cursor
+
+    async def get_flaky_cases(self, top: int = 10, min_runs: int = 5) -> List[Dict[str, Any]]:
         """
-        Detalles completos de una ejecución específica.
+        Casos más inestables según los cambios pasó ↔ falló en sus últimas
+        ejecuciones. Se lee del estado incremental, no del historial.
         """
-        execution = self.db.query(TestResult).filter(TestResult.id == execution_id).first()
-        
+        rows = (await self.db.execute(
+            select(TestCaseFlakiness, TestCase.name)
+            .join(TestCase, TestCase.id == TestCaseFlakiness.test_case_id)
+            .where(TestCaseFlakiness.runs >= min_runs, TestCaseFlakiness.flips > 0)
+            .order_by(desc(TestCaseFlakiness.score), desc(TestCaseFlakiness.runs), TestCaseFlakiness.test_case_id)
+            .limit(top)
+        )).all()
+
+        return [
+            {
+                "test_case_id": state.test_case_id,
+                "test_name": name,
+                "score": state.score,
+                "flips": state.flips,
+                "runs": state.runs,
+                "failure_rate": round(state.failures / state.runs * 100, 2) if state.runs else 0,
+                "history": state.history,
+                "last_status": state.last_status,
+                "total_runs": state.total_runs,
+                "updated_at": state.updated_at.strftime("%Y-%m-%d %H:%M:%S") if state.updated_at else None
+            }
+            for state, name in rows
+        ]
+
+    async def get_duration_drift(self, top: int = 10, min_drift: float = 1.0) -> Dict[str, Any]:
+        """
+        Casos cuya duración reciente se aleja hacia arriba de su media
+        histórica (`drift` en desviaciones estándar), del más afectado al menos.
+        """
+        rows = (await self.db.execute(
+            select(TestCaseDurationStats, TestCase.name)
+            .join(TestCase, TestCase.id == TestCaseDurationStats.test_case_id)
+            .where(TestCaseDurationStats.drift >= min_drift)
+            .order_by(desc(TestCaseDurationStats.drift), TestCaseDurationStats.test_case_id)
+            .limit(top)
+        )).all()
+
+        cases = []
+        for stats, name in rows:
+            deviation = stddev({"runs": stats.runs, "m2": stats.m2})
+            cases.append({
+                "test_case_id": stats.test_case_id,
+                "test_name": name,
+                "runs": stats.runs,
+                "mean_seconds": round(stats.mean, 2),
+                "stddev_seconds": round(deviation, 2) if deviation else 0,
+                "recent_mean_seconds": round(stats.recent_mean, 2),
+                "drift": stats.drift,
+                "last_duration_seconds": stats.last_duration,
+                "last_zscore": stats.last_zscore,
+                "flagged_runs": stats.flagged_runs,
+                "last_flagged_at": stats.last_flagged_at.strftime("%Y-%m-%d %H:%M:%S") if stats.last_flagged_at else None
+            })
+
+        return {"zscore_threshold": round(zscore_threshold(), 4), "cases": cases}
+
+    async def get_execution_details(self, execution_id: int) -> Optional[Dict[str, Any]]:
+        """
+        Metadatos de una ejecución específica (sin textos completos).
+
+        Los logs se leen aparte y por rango en `/execution/{id}/logs`; aquí
+        solo van su tamaño y vista previa. None si la ejecución no existe.
+        """
+        execution = (await self.db.execute(
+            select(
+                TestResult.id,
+                TestResult.test_case_id,
+                TestResult.status,
+                TestResult.execution_time,
+                TestResult.duration_seconds,
+                TestResult.duration_zscore,
+                TestResult.created_at,
+                TestResult.executed_by_agent,
+                TestResult.screenshot_path,
+                func.coalesce(TestResult.logs_preview, func.substr(TestResult._logs, 1, 200)).label("logs_preview"),
+                func.coalesce(Artifact.size, func.octet_length(TestResult._logs)).label("logs_size")
+            )
+            .outerjoin(Artifact, Artifact.hash == TestResult.logs_hash)
+            .where(TestResult.id == execution_id)
+        )).first()
+
         if not execution:
-            return {"error": "Ejecución no encontrada"}
-        
-        test_case = self.db.query(TestCase).filter(TestCase.id == execution.test_case_id).first()
-        prompt = self.db.query(Prompt).filter(Prompt.test_case_id == execution.test_case_id).order_by(desc(Prompt.created_at)).first()
-        
+            return None
+
+        test_case = await self.db.get(TestCase, execution.test_case_id)
+
+        # Prompt usado: el último del caso generado antes de la ejecución
+        prompt_artifact = aliased(Artifact)
+        code_artifact = aliased(Artifact)
+        prompt = (await self.db.execute(
+            select(
+                Prompt.id,
+                Prompt.created_at,
+                func.coalesce(Prompt.prompt_preview, func.substr(Prompt._prompt_text, 1, 500)).label("prompt_preview"),
+                func.coalesce(Prompt.code_preview, func.substr(Prompt._generated_code, 1, 500)).label("code_preview"),
+                func.coalesce(prompt_artifact.size, func.octet_length(Prompt._prompt_text)).label("prompt_size"),
+                func.coalesce(code_artifact.size, func.octet_length(Prompt._generated_code)).label("code_size")
+            )
+            .outerjoin(prompt_artifact, Prompt.prompt_hash == prompt_artifact.hash)
+            .outerjoin(code_artifact, Prompt.code_hash == code_artifact.hash)
+            .where(Prompt.test_case_id == execution.test_case_id, Prompt.created_at <= execution.created_at)
+            .order_by(desc(Prompt.created_at))
+            .limit(1)
+        )).first()
+
         return {
             "execution": {
                 "id": execution.id,
                 "status": execution.status,
                 "execution_time": execution.execution_time,
+                "duration_seconds": execution.duration_seconds,
+                "duration_zscore": execution.duration_zscore,
                 "created_at": execution.created_at.strftime("%Y-%m-%d %H:%M:%S"),
                 "executed_by_agent": execution.executed_by_agent,
-                "logs": execution.logs,
-                "screenshot_path": execution.screenshot_path
+                "screenshot_path": execution.screenshot_path,
+                "logs_preview": execution.logs_preview,
+                "logs_size": execution.logs_size or 0,
+                "logs_url": f"/api/dashboard/execution/{execution.id}/logs" if execution.logs_size is not None else None
             },
             "test_case": {
                 "id": test_case.id,
-                "name": test_case.test_name,
+                "name": test_case.name,
                 "url": test_case.url,
-                "expected_result": test_case.expected_result,
-                "test_type": test_case.test_type
+                "description": test_case.description,
+                "expected_result": test_case.expected_result
             } if test_case else None,
             "prompt": {
                 "id": prompt.id,
-                "prompt_text": prompt.prompt_text[:500] + "...",
-                "generated_code": prompt.generated_code[:500] + "..." if prompt.generated_code else None,
+                "prompt_text": prompt.prompt_preview,
+                "prompt_size": prompt.prompt_size or 0,
+                "generated_code": prompt.code_preview,
+                "code_size": prompt.code_size or 0,
                 "created_at": prompt.created_at.strftime("%Y-%m-%d %H:%M:%S")
             } if prompt else None
         }
-    
-    def get_prompts_history(self, test_case_id: int = None, limit: int = 20) -> List[Dict[str, Any]]:
+
+    async def get_prompts_history(self, test_case_id: int = None, limit: int = 20, cursor: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Historial de prompts generados.
+
+        Las longitudes salen del tamaño registrado en `artifacts` (o de la
+        columna legacy), nunca se cargan los textos. Paginado por keyset
+        sobre `id` descendente.
         """
-        query = self.db.query(Prompt)
+        prompt_artifact = aliased(Artifact)
+        code_artifact = aliased(Artifact)
+
+        query = select(
+            Prompt.id,
+            Prompt.created_at,
+            TestCase.name.label("test_case_name"),
+            func.coalesce(prompt_artifact.size, func.length(Prompt._prompt_text)).label("prompt_length"),
+            func.coalesce(code_artifact.size, func.length(Prompt._generated_code)).label("code_length")
+        ).outerjoin(TestCase, Prompt.test_case_id == TestCase.id)\
+         .outerjoin(prompt_artifact, Prompt.prompt_hash == prompt_artifact.hash)\
+         .outerjoin(code_artifact, Prompt.code_hash == code_artifact.hash)
         
         if test_case_id:
             query = query.filter(Prompt.test_case_id == test_case_id)
         
-        prompts = query.order_by(desc(Prompt.created_at)).limit(limit).all()
+        prompts = (await self.db.execute(
+            apply_keyset(query, Prompt.id, cursor, limit, descending=True)
+        )).all()
         
         results = []
         for prompt in prompts:
-            test_case = self.db.query(TestCase).filter(TestCase.id == prompt.test_case_id).first()
-            
             results.append({
                 "id": prompt.id,
-                "test_case_name": test_case.test_name if test_case else "Unknown",
-                "prompt_length": len(prompt.prompt_text),
-                "has_code": bool(prompt.generated_code),
-                "code_length": len(prompt.generated_code) if prompt.generated_code else 0,
+                "test_case_name": prompt.test_case_name or "Unknown",
+                "prompt_length": prompt.prompt_length or 0,
+                "has_code": bool(prompt.code_length),
+                "code_length": prompt.code_length or 0,
                 "created_at": prompt.created_at.strftime("%Y-%m-%d %H:%M:%S")
             })
         
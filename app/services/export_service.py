@@ -0,0 +1,187 @@
+# app/services/export_service.py
+import csv
+import importlib.util
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional
+from sqlalchemy import func, or_, select, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.case_model import TestCase
+from app.models.result_model import TestResult
+from app.models.prompt_model import Prompt
+
+
+EXPORT_FORMATS = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Columnas exportadas, en orden
+EXPORT_COLUMNS = [
+    "id", "test_case_id", "test_name", "status", "execution_time", "duration_seconds",
+    "executed_by_agent", "screenshot_path", "created_at", "logs_preview",
+    "prompt_id", "prompt_created_at", "prompt_preview", "has_generated_code",
+]
+
+
+def parquet_available() -> bool:
+    # Sin importar pyarrow (pesado): se carga recién al exportar en Parquet
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Destino de escritura que se vacía por partes. Mantiene la posición
+    absoluta (`tell`) que Parquet usa para los offsets del pie del archivo.
+    """
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ResultExportService:
+    """
+    Exportación del historial de ejecuciones en CSV, JSONL o Parquet.
+
+    Lee con un cursor del lado del servidor y genera el archivo por bloques,
+    así la memoria no crece con la cantidad de filas.
+    """
+    def __init__(self, db: AsyncSession, chunk_size: int = 2000):
+        self.db = db
+        self.chunk_size = chunk_size
+
+    def build_query(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        statuses: Optional[List[str]] = None,
+        test_case_id: Optional[int] = None
+    ):
+        """Resultados + nombre del caso + prompt usado (el último previo a la ejecución)."""
+        # Filas legacy sin artefacto: preview recortado en SQL, como en el dashboard
+        prompt = (
+            select(
+                Prompt.id,
+                Prompt.created_at,
+                func.coalesce(Prompt.prompt_preview, func.substr(Prompt._prompt_text, 1, 500)).label("prompt_preview"),
+                or_(Prompt.code_hash.is_not(None), Prompt._generated_code.is_not(None)).label("has_generated_code"),
+            )
+            .where(Prompt.test_case_id == TestResult.test_case_id, Prompt.created_at <= TestResult.created_at)
+            .order_by(Prompt.created_at.desc())
+            .limit(1)
+            .lateral("prompt")
+        )
+
+        query = (
+            select(
+                TestResult.id,
+                TestResult.test_case_id,
+                TestCase.name.label("test_name"),
+                TestResult.status,
+                TestResult.execution_time,
+                TestResult.duration_seconds,
+                TestResult.executed_by_agent,
+                TestResult.screenshot_path,
+                TestResult.created_at,
+                func.coalesce(TestResult.logs_preview, func.substr(TestResult._logs, 1, 200)).label("logs_preview"),
+                prompt.c.id.label("prompt_id"),
+                prompt.c.created_at.label("prompt_created_at"),
+                prompt.c.prompt_preview,
+                prompt.c.has_generated_code,
+            )
+            .outerjoin(TestCase, TestCase.id == TestResult.test_case_id)
+            .outerjoin(prompt, true())
+            .order_by(TestResult.created_at, TestResult.id)
+        )
+
+        # Filtros en SQL: el rango de fechas además descarta particiones
+        if date_from:
+            query = query.where(TestResult.created_at >= date_from)
+        if date_to:
+            query = query.where(TestResult.created_at < date_to)
+        if statuses:
+            query = query.where(TestResult.status.in_(statuses))
+        if test_case_id:
+            query = query.where(TestResult.test_case_id == test_case_id)
+
+        return query
+
+    async def stream(self, fmt: str, **filters) -> AsyncIterator[bytes]:
+        """Genera el archivo en bloques de bytes en el formato pedido."""
+        writer = {"csv": self._csv, "jsonl": self._jsonl, "parquet": self._parquet}[fmt]
+        result = await self.db.stream(
+            self.build_query(**filters).execution_options(yield_per=self.chunk_size)
+        )
+        async for chunk in writer(result.mappings().partitions()):
+            yield chunk
+
+    async def _csv(self, partitions) -> AsyncIterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_COLUMNS)
+        async for rows in partitions:
+            writer.writerows([[self._plain(row[col]) for col in EXPORT_COLUMNS] for row in rows])
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")
+
+    async def _jsonl(self, partitions) -> AsyncIterator[bytes]:
+        async for rows in partitions:
+            lines = [
+                json.dumps({col: self._plain(row[col]) for col in EXPORT_COLUMNS}, ensure_ascii=False)
+                for row in rows
+            ]
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+
+    async def _parquet(self, partitions) -> AsyncIterator[bytes]:
+        import pyarrow as pa  # Parquet es opcional
+        import pyarrow.parquet as pq
+
+        # Un row group por bloque; el pie del archivo se escribe al cerrar
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, self._parquet_schema(pa))
+        try:
+            async for rows in partitions:
+                columns = {col: [row[col] for row in rows] for col in EXPORT_COLUMNS}
+                writer.write_table(pa.Table.from_pydict(columns, schema=writer.schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    @staticmethod
+    def _parquet_schema(pa):
+        return pa.schema([
+            ("id", pa.int64()), ("test_case_id", pa.int64()), ("test_name", pa.string()),
+            ("status", pa.string()), ("execution_time", pa.string()), ("duration_seconds", pa.float64()),
+            ("executed_by_agent", pa.bool_()), ("screenshot_path", pa.string()),
+            ("created_at", pa.timestamp("us")), ("logs_preview", pa.string()),
+            ("prompt_id", pa.int64()), ("prompt_created_at", pa.timestamp("us")),
+            ("prompt_preview", pa.string()), ("has_generated_code", pa.bool_()),
+        ])
+
+    @staticmethod
+    def _plain(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat(sep=" ")
+        return value
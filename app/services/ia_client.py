@@ -1,8 +1,39 @@
 # app/services/ia_client.py
-import requests
 import os
+import re
 from typing import Dict, Any, List
 
+
+def extract_python_code(text: str) -> str:
+    """
+    Extrae código Python de la respuesta de Manus con múltiples estrategias.
+    """
+    if not text or not text.strip():
+        return ""
+    
+    # Estrategia 1: Buscar bloques ```python
+    python_blocks = re.findall(r'```python\s*\n(.*?)\n```', text, re.DOTALL | re.IGNORECASE)
+    if python_blocks:
+        print(f"✓ Encontrado código en bloque ```python (tamaño: {len(python_blocks[0])} chars)")
+        return python_blocks[0].strip()
+    
+    # Estrategia 2: Buscar bloques ``` sin especificar lenguaje
+    code_blocks = re.findall(r'```\s*\n(.*?)\n```', text, re.DOTALL)
+    if code_blocks:
+        for block in code_blocks:
+            if any(keyword in block for keyword in ['import', 'driver', 'print(', 'time.sleep']):
+                print(f"✓ Encontrado código en bloque ``` (tamaño: {len(block)} chars)")
+                return block.strip()
+    
+    # Estrategia 3: Si no hay bloques pero el texto parece código Python
+    if any(keyword in text for keyword in ['driver.', 'print(', 'time.sleep', '# Config']):
+        print(f"✓ Texto detectado como código directo (tamaño: {len(text)} chars)")
+        return text.strip()
+    
+    print("⚠️ No se detectó código Python ejecutable en la respuesta")
+    return ""
+
+
 class IAClient:
     def __init__(self):
         self.api_url = os.getenv("MANUS_API_URL", "https://api.manus.ai/v1")
@@ -15,6 +46,7 @@ class IAClient:
         """
         Envía el prompt a Manus IA y recibe la tarea generada.
         """
+        import requests
         headers = {
             "API_KEY": self.api_key,
             "Content-Type": "application/json"
@@ -55,6 +87,7 @@ class IAClient:
         Obtiene el estado de una tarea de Manus usando el ID específico.
         Extrae el código Python del campo output.
         """
+        import requests
         headers = {
             "API_KEY": self.api_key
         }
@@ -261,6 +294,7 @@ class IAClient:
         Args:
             webhook_url: URL donde Manus enviará las notificaciones (ej: https://tuapp.com/api/webhooks/manus)
         """
+        import requests
         headers = {
             "API_KEY": self.api_key,
             "Content-Type": "application/json"
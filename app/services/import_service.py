@@ -0,0 +1,390 @@
+# app/services/import_service.py
+import asyncio
+import os
+import shutil
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.config import settings, AsyncSessionLocal
+from app.models.case_model import TestCase, content_hash
+from app.models.import_job_model import ImportJob
+from app.schemas.case_schema import UploadSummary
+from app.services.codegen_service import codegen_service
+from app.utils.logger import setup_logger
+
+logger = setup_logger("imports")
+
+# Filas por bloque (una consulta de búsqueda + un INSERT/UPDATE) en la carga masiva
+UPLOAD_CHUNK_SIZE = 1000
+
+# Identidad de este proceso como dueño de trabajos (`import_jobs.claimed_by`)
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Largo máximo de las columnas limitadas de `test_cases`
+_MAX_LENGTHS = {col: TestCase.__table__.c[col].type.length for col in ("name", "url")}
+
+
+async def upsert_cases(db: AsyncSession, cases_data: List[dict], summary: UploadSummary) -> List[int]:
+    """
+    Guarda un bloque de casos identificándolos por nombre:
+
+    - mismo nombre y mismo `content_hash` → sin cambios (no se escribe nada)
+    - mismo nombre y otro hash → se actualiza la fila existente
+    - nombre nuevo → INSERT ... ON CONFLICT (content_hash) DO NOTHING
+
+    Una sola consulta por bloque trae (id, hash) de los nombres presentes.
+    Si un nombre se repite en el bloque, la última fila decide el resultado
+    y las anteriores cuentan como `duplicates` (en la BD se escribe una sola).
+    Repetido en bloques distintos, el posterior actualiza al anterior.
+    Devuelve los ids de los casos insertados o actualizados.
+    """
+    if not cases_data:
+        return []
+
+    names = {case["name"] for case in cases_data}
+    known = {}
+    rows = await db.execute(
+        select(TestCase.id, TestCase.name, TestCase.content_hash)
+        .where(TestCase.name.in_(names))
+        .order_by(TestCase.content_hash.is_(None), TestCase.id)  # Duplicados legacy sin hash al final
+    )
+    for case_id, name, digest in rows:
+        known.setdefault(name, (case_id, digest))
+
+    latest = {}
+    for case in cases_data:
+        summary.total += 1
+        if case["name"] in latest:
+            summary.duplicates += 1
+        latest[case["name"]] = case
+
+    to_insert, to_update = {}, {}
+    for name, case in latest.items():
+        case = {**case, "content_hash": content_hash(name, case["steps"], case["expected_result"], case["url"])}
+        case_id, digest = known.get(name, (None, None))
+        if digest == case["content_hash"]:
+            summary.unchanged += 1
+        elif case_id is not None:
+            to_update[case_id] = {"id": case_id, **case}
+            summary.updated += 1
+        else:
+            to_insert[name] = case
+
+    changed = list(to_update)
+    if to_update:
+        await db.execute(update(TestCase), list(to_update.values()))
+
+    if to_insert:
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = (
+            dialect.insert(TestCase)
+            .on_conflict_do_nothing(index_elements=[TestCase.content_hash])
+            .returning(TestCase.id)
+            # NULL explícito: sin esto el ORM agrupa por columnas presentes y
+            # las filas con/sin url se insertan en cientos de sentencias
+            .execution_options(render_nulls=True)
+        )
+        inserted = (await db.execute(stmt, list(to_insert.values()))).scalars().all()
+        changed.extend(inserted)
+        summary.inserted += len(inserted)
+        summary.unchanged += len(to_insert) - len(inserted)  # Insertados por una carga concurrente
+    return changed
+
+
+def validate_case(case: dict) -> Optional[str]:
+    """Error de una fila normalizada, o None si se puede guardar."""
+    if not case["name"]:
+        return "case_name vacío"
+    if not case["steps"]:
+        return "input_data vacío"
+    for column, limit in _MAX_LENGTHS.items():
+        if case[column] and len(case[column]) > limit:
+            return f"{column} excede {limit} caracteres"
+    return None
+
+
+def _open_sheets(path: str, filename: str):
+    # file_loader (pandas, openpyxl) se importa recién con la primera carga
+    from app.utils.file_loader import iter_upload_sheets, chunked
+    for sheet, rows in iter_upload_sheets(path, filename, settings.IMPORT_PROCESSES):
+        yield sheet, chunked(rows, UPLOAD_CHUNK_SIZE)
+
+
+def _error_text(error: Exception) -> str:
+    # Sin la sentencia SQL: solo el mensaje de la BD
+    return str(getattr(error, "orig", None) or error).strip().splitlines()[0]
+
+
+class ImportService:
+    """
+    Importación de archivos de casos en segundo plano.
+
+    `submit` guarda el archivo en `UPLOAD_DIR` y registra un `ImportJob` en
+    estado `queued`; los workers (tareas asyncio iniciadas con `start`) lo
+    procesan por bloques, con el parseo en un hilo (y los libros Excel
+    grandes de varias hojas en un pool de procesos). Cada bloque se guarda
+    en su propia transacción junto con el progreso del trabajo y los
+    totales por hoja.
+
+    Si un bloque falla en la BD se reintenta fila por fila para aislar las
+    filas con error, que quedan en el reporte del trabajo.
+
+    La cola es la tabla `import_jobs`: cada worker reclama un trabajo con
+    UPDATE ... FOR UPDATE SKIP LOCKED, así con varios procesos (workers de
+    uvicorn, reinicios escalonados) cada trabajo lo toma uno solo. El
+    proceso dueño renueva `heartbeat_at` de sus trabajos; los que quedan en
+    `running` sin latido por `IMPORT_STALE_SECONDS` (proceso caído) vuelven
+    a `queued`. El upsert hace que re-procesar filas no duplique casos.
+    """
+    def __init__(self):
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Recupera trabajos huérfanos e inicia los workers y el latido."""
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+        self._wakeup = asyncio.Event()
+        await self._recover_stale()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(max(1, settings.IMPORT_WORKERS))]
+        self._workers.append(asyncio.create_task(self._heartbeat()))
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        # Liberar los trabajos interrumpidos para que otro proceso los retome sin esperar
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(ImportJob)
+                .where(ImportJob.claimed_by == WORKER_ID, ImportJob.status == "running")
+                .values(status="queued", claimed_by=None)
+            )
+            await db.commit()
+
+    async def _claim(self) -> Optional[int]:
+        """Toma el trabajo en cola más antiguo (atómico entre procesos), o None si no hay."""
+        candidate = (
+            select(ImportJob.id)
+            .where(ImportJob.status == "queued")
+            .order_by(ImportJob.id)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        async with AsyncSessionLocal() as db:
+            job_id = await db.scalar(
+                update(ImportJob)
+                .where(ImportJob.id == candidate)
+                .values(status="running", claimed_by=WORKER_ID, heartbeat_at=func.now())
+                .returning(ImportJob.id)
+            )
+            await db.commit()
+        return job_id
+
+    async def _recover_stale(self) -> int:
+        """Vuelve a encolar los trabajos `running` cuyo proceso dejó de dar latidos."""
+        cutoff = func.now() - timedelta(seconds=settings.IMPORT_STALE_SECONDS)
+        async with AsyncSessionLocal() as db:
+            recovered = (await db.scalars(
+                update(ImportJob)
+                .where(
+                    ImportJob.status == "running",
+                    or_(ImportJob.heartbeat_at.is_(None), ImportJob.heartbeat_at < cutoff)
+                )
+                .values(status="queued", claimed_by=None)
+                .returning(ImportJob.id)
+            )).all()
+            await db.commit()
+        if recovered:
+            logger.info(f"[IMPORT] {len(recovered)} trabajos huérfanos vueltos a encolar")
+            self._wakeup.set()
+        return len(recovered)
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(settings.IMPORT_HEARTBEAT_SECONDS)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(ImportJob)
+                        .where(ImportJob.claimed_by == WORKER_ID, ImportJob.status == "running")
+                        .values(heartbeat_at=func.now())
+                    )
+                    await db.commit()
+                await self._recover_stale()
+            except Exception as e:
+                logger.error(f"[IMPORT] Latido: {e}")
+
+    async def submit(self, db: AsyncSession, file, filename: str, pregenerate: bool = False) -> ImportJob:
+        """
+        Guarda el archivo en disco, crea el trabajo y lo encola.
+        Con `pregenerate`, los casos nuevos o modificados se encolan para
+        pre-generar su código (ver `CodeGenerationService`).
+        """
+        extension = os.path.splitext(filename or "")[1].lower()
+        path = os.path.join(settings.UPLOAD_DIR, f"{uuid.uuid4().hex}{extension}")
+        os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+
+        def spool():
+            with open(path, "wb") as target:
+                shutil.copyfileobj(file, target, 1024 * 1024)
+
+        await asyncio.to_thread(spool)
+
+        job = ImportJob(filename=filename or "upload", file_path=path, status="queued", pregenerate=pregenerate)
+        db.add(job)
+        await db.commit()
+        self._wakeup.set()
+        return job
+
+    async def _worker(self) -> None:
+        while True:
+            self._wakeup.clear()
+            try:
+                job_id = await self._claim()
+            except Exception as e:
+                logger.error(f"[IMPORT] No se pudo reclamar un trabajo: {e}")
+                job_id = None
+            if job_id is None:
+                # Sin trabajos: esperar un submit de este proceso o revisar la tabla de nuevo
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.IMPORT_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self.run(job_id)
+            except Exception as e:
+                logger.error(f"[IMPORT] Trabajo {job_id}: {e}")
+
+    async def run(self, job_id: int) -> None:
+        """Importa de principio a fin el archivo de un trabajo reclamado por este proceso."""
+        async with AsyncSessionLocal() as db:
+            job = await db.get(ImportJob, job_id)
+            if job is None or job.status != "running" or job.claimed_by != WORKER_ID:
+                return
+
+            if not job.file_path or not os.path.exists(job.file_path):
+                job.status, job.message = "failed", "Archivo no disponible en este servidor"
+                job.finished_at, job.file_path = datetime.now(), None
+                await db.commit()
+                return
+
+            job.started_at, job.message = datetime.now(), None
+            job.rows_done = job.rows_failed = job.inserted = job.updated = job.unchanged = job.duplicates = 0
+            job.errors, job.sheets = [], None
+            await db.commit()
+
+            sheets = _open_sheets(job.file_path, job.filename)
+            try:
+                # Una hoja a la vez (en Excel grandes ya parseadas en paralelo), por bloques
+                while True:
+                    entry = await asyncio.to_thread(next, sheets, None)
+                    if entry is None:
+                        break
+                    sheet, chunks = entry
+                    while True:
+                        chunk = await asyncio.to_thread(next, chunks, None)
+                        if chunk is None:
+                            break
+                        changed = await self._import_chunk(db, job, chunk, sheet)
+                        await db.commit()
+                        if job.pregenerate and changed:
+                            codegen_service.enqueue(changed)
+
+                if not job.rows_done and not job.rows_failed:
+                    raise ValueError("❌ No se encontraron casos de prueba activos en el archivo")
+                job.status = "completed"
+            except Exception as e:
+                await db.rollback()
+                await db.refresh(job)
+                job.status, job.message = "failed", str(e)
+                logger.error(f"[IMPORT] Trabajo {job_id} falló: {e}")
+            finally:
+                sheets.close()
+
+            job.finished_at = datetime.now()
+            path, job.file_path = job.file_path, None
+            await db.commit()
+
+        if path and os.path.exists(path):
+            os.remove(path)
+        logger.info(
+            f"[IMPORT] Trabajo {job_id} {job.status}: {job.inserted} nuevos, {job.updated} actualizados, "
+            f"{job.unchanged} sin cambios, {job.duplicates} repetidos, {job.rows_failed} con error"
+        )
+
+    async def _import_chunk(
+        self,
+        db: AsyncSession,
+        job: ImportJob,
+        chunk: List[Tuple[int, dict]],
+        sheet: Optional[str] = None
+    ) -> List[int]:
+        """Importa un bloque y suma sus totales al trabajo; devuelve los ids insertados o actualizados."""
+        location = {"sheet": sheet} if sheet else {}
+        errors, valid = [], []
+        for row, case in chunk:
+            problem = validate_case(case)
+            if problem:
+                errors.append({"row": row, **location, "error": problem})
+            else:
+                valid.append((row, case))
+
+        summary = UploadSummary()
+        try:
+            async with db.begin_nested():
+                changed = await upsert_cases(db, [case for _, case in valid], summary)
+        except Exception:
+            # Aislar las filas que fallan: una transacción anidada por fila
+            summary, changed = UploadSummary(), []
+            for row, case in valid:
+                row_summary = UploadSummary()
+                try:
+                    async with db.begin_nested():
+                        changed += await upsert_cases(db, [case], row_summary)
+                except Exception as e:
+                    errors.append({"row": row, **location, "error": _error_text(e)})
+                    continue
+                summary.inserted += row_summary.inserted
+                summary.updated += row_summary.updated
+                summary.unchanged += row_summary.unchanged
+                summary.duplicates += row_summary.duplicates
+                summary.total += row_summary.total
+
+        job.rows_done += summary.total
+        job.rows_failed += len(errors)
+        job.inserted += summary.inserted
+        job.updated += summary.updated
+        job.unchanged += summary.unchanged
+        job.duplicates += summary.duplicates
+        if sheet:
+            # Totales por hoja (las filas de una hoja llegan seguidas)
+            sheets = [dict(entry) for entry in job.sheets or []]
+            if not sheets or sheets[-1]["sheet"] != sheet:
+                sheets.append({
+                    "sheet": sheet, "rows_done": 0, "rows_failed": 0,
+                    "inserted": 0, "updated": 0, "unchanged": 0, "duplicates": 0
+                })
+            current = sheets[-1]
+            current["rows_done"] += summary.total
+            current["rows_failed"] += len(errors)
+            current["inserted"] += summary.inserted
+            current["updated"] += summary.updated
+            current["unchanged"] += summary.unchanged
+            current["duplicates"] += summary.duplicates
+            job.sheets = sheets
+        if errors:
+            room = settings.IMPORT_MAX_ERRORS - len(job.errors or [])
+            job.errors = (job.errors or []) + sorted(errors, key=lambda e: e["row"])[:max(0, room)]
+        return changed
+
+
+# Instancia única: los workers se inician en el lifespan de la app
+import_service = ImportService()
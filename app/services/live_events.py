@@ -0,0 +1,150 @@
+# app/services/live_events.py
+import asyncio
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import CursorResult
+from sqlalchemy.orm import Session
+from app.models.case_model import TestCase
+from app.models.result_model import TestResult
+
+
+class LiveEventPublisher:
+    """
+    Publicador único de eventos del dashboard hacia todos los clientes SSE.
+
+    Cada cliente tiene su propia cola acotada. Si un cliente lento llena su
+    cola, se vacía y recibe un evento `resync` para recargar el snapshot.
+    Se puede publicar desde cualquier hilo (ej: tareas en background).
+    """
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self._subscribers: List[asyncio.Queue] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.published = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue:
+        self._loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> None:
+        """Envía un evento a todos los clientes conectados (no bloquea)."""
+        if not self._subscribers or self._loop is None or self._loop.is_closed():
+            return
+
+        message = {"type": event_type, "data": data}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is self._loop:
+            self._fan_out(message)
+        else:
+            self._loop.call_soon_threadsafe(self._fan_out, message)
+
+    def _fan_out(self, message: Dict[str, Any]) -> None:
+        self.published += 1
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync", "data": {}})
+
+    @staticmethod
+    def format_sse(message: Dict[str, Any]) -> str:
+        payload = json.dumps(message["data"], ensure_ascii=False, separators=(",", ":"))
+        return f"event: {message['type']}\ndata: {payload}\n\n"
+
+
+live_events = LiveEventPublisher()
+
+
+# ------------------------------
+# Publicar al confirmar escrituras
+# ------------------------------
+
+def _queue_event(session, event_type: str, data: Dict[str, Any]) -> None:
+    # Junto al savepoint vigente (si hay): si se revierte, el evento se descarta
+    session.info.setdefault("live_events", []).append((session.get_nested_transaction(), event_type, data))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_live_events(session, flush_context):
+    new_results = [obj for obj in session.new if isinstance(obj, TestResult)]
+    new_cases = sum(1 for obj in session.new if isinstance(obj, TestCase))
+
+    with session.no_autoflush:
+        for result in new_results:
+            test_case = session.get(TestCase, result.test_case_id)
+            created_at = result.created_at or datetime.now()
+            _queue_event(session, "result", {
+                "id": result.id,
+                "test_case_id": result.test_case_id,
+                "test_name": test_case.name if test_case else "Unknown",
+                "status": result.status,
+                "execution_time": result.execution_time,
+                "created_at": created_at.strftime("%Y-%m-%d %H:%M:%S")
+            })
+
+    if new_cases:
+        _queue_event(session, "cases", {"added": new_cases})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_bulk_case_inserts(orm_execute_state):
+    # La carga masiva de casos usa INSERT ... RETURNING, fuera del flush.
+    # Se cuentan las filas devueltas: las omitidas por ON CONFLICT no cuentan.
+    mapper = orm_execute_state.bind_mapper
+    if not (orm_execute_state.is_insert and mapper is not None and mapper.class_ is TestCase):
+        return None
+
+    result = orm_execute_state.invoke_statement()
+    if isinstance(result, CursorResult) and not result.returns_rows:
+        added = max(result.rowcount, 0)
+    else:
+        frozen = result.freeze()
+        added, result = len(frozen.data), frozen()
+    if added:
+        _queue_event(orm_execute_state.session, "cases", {"added": added})
+    return result
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_live_events(session):
+    for _, event_type, data in session.info.pop("live_events", []):
+        live_events.publish(event_type, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_live_events(session):
+    session.info.pop("live_events", None)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_savepoint_events(session, previous_transaction):
+    # Rollback de un savepoint: descartar lo encolado dentro de él (o de savepoints internos)
+    if not previous_transaction.nested or not session.info.get("live_events"):
+        return
+
+    def inside(transaction):
+        while transaction is not None:
+            if transaction is previous_transaction:
+                return True
+            transaction = transaction.parent
+        return False
+
+    session.info["live_events"] = [entry for entry in session.info["live_events"] if not inside(entry[0])]
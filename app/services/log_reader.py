@@ -0,0 +1,124 @@
+# app/services/log_reader.py
+import gzip
+import zlib
+from typing import Optional, Tuple
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.artifact_model import Artifact
+from app.models.result_model import TestResult
+
+# Bloque comprimido leído por consulta en artefactos sin índice
+LEGACY_FETCH_SIZE = 256 * 1024
+
+# Ventana inicial (bytes) al buscar las últimas líneas; se duplica si no alcanza
+TAIL_WINDOW = 64 * 1024
+
+
+class LogReader:
+    """
+    Lectura parcial de los logs de una ejecución sin traer el texto completo.
+
+    - Artefactos por bloques: se piden con substring() solo los miembros gzip
+      que cubren el rango.
+    - Artefactos antiguos (un solo miembro): se descomprime en streaming hasta
+      el final del rango.
+    - Filas legacy sin artefacto: substring() sobre la columna de texto.
+
+    Los offsets son en bytes del texto UTF-8 original.
+    """
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.size: int = 0
+        self._execution_id: Optional[int] = None
+        self._artifact = None  # (hash, chunk_size, chunk_offsets) o None si es legacy
+
+    async def open(self, execution_id: int) -> bool:
+        """Carga los metadatos de los logs. False si la ejecución no tiene logs."""
+        row = (await self.db.execute(
+            select(
+                TestResult.logs_hash,
+                Artifact.size,
+                Artifact.chunk_size,
+                Artifact.chunk_offsets,
+                func.octet_length(TestResult._logs).label("legacy_size")
+            )
+            .outerjoin(Artifact, Artifact.hash == TestResult.logs_hash)
+            .where(TestResult.id == execution_id)
+        )).first()
+
+        if row is None or (row.logs_hash is None and row.legacy_size is None):
+            return False
+
+        self._execution_id = execution_id
+        if row.logs_hash is not None:
+            self._artifact = (row.logs_hash, row.chunk_size, row.chunk_offsets)
+            self.size = row.size or 0
+        else:
+            self.size = row.legacy_size
+        return True
+
+    async def read(self, start: int, end: int) -> bytes:
+        """Bytes [start, end) de los logs (recortado al tamaño real)."""
+        start, end = max(0, start), min(end, self.size)
+        if start >= end:
+            return b""
+        if self._artifact is None:
+            return await self._read_legacy_column(start, end)
+
+        digest, chunk_size, offsets = self._artifact
+        if offsets:
+            return await self._read_chunked(digest, chunk_size, offsets, start, end)
+        return await self._read_single_member(digest, start, end)
+
+    async def tail(self, lines: int) -> Tuple[int, bytes]:
+        """Últimas `lines` líneas. Devuelve (offset inicial, bytes)."""
+        window = TAIL_WINDOW
+        while True:
+            start = max(0, self.size - window)
+            data = await self.read(start, self.size)
+            body = data[:-1] if data.endswith(b"\n") else data
+            if body.count(b"\n") >= lines or start == 0:
+                break
+            window *= 2
+
+        # Retroceder `lines` saltos de línea; si no los hay, la ventana ya es todo el log
+        cut = len(body)
+        for _ in range(lines):
+            cut = body.rfind(b"\n", 0, cut)
+            if cut < 0:
+                break
+        skip = cut + 1 if cut >= 0 else 0
+        return start + skip, data[skip:]
+
+    async def _fetch(self, digest: str, offset: int, length: int) -> bytes:
+        # substring de bytea es 1-based
+        return await self.db.scalar(
+            select(func.substring(Artifact.data, offset + 1, length)).where(Artifact.hash == digest)
+        ) or b""
+
+    async def _read_chunked(self, digest: str, chunk_size: int, offsets: list, start: int, end: int) -> bytes:
+        first, last = start // chunk_size, (end - 1) // chunk_size
+        compressed = await self._fetch(digest, offsets[first], offsets[last + 1] - offsets[first])
+        raw = gzip.decompress(compressed)
+        base = first * chunk_size
+        return raw[start - base:end - base]
+
+    async def _read_single_member(self, digest: str, start: int, end: int) -> bytes:
+        decompressor = zlib.decompressobj(wbits=31)  # gzip
+        produced, position, output = 0, 0, bytearray()
+        while produced < end:
+            compressed = await self._fetch(digest, position, LEGACY_FETCH_SIZE)
+            if not compressed:
+                break
+            position += len(compressed)
+            data = decompressor.decompress(compressed)
+            if produced + len(data) > start:
+                output += data[max(0, start - produced):end - produced]
+            produced += len(data)
+        return bytes(output)
+
+    async def _read_legacy_column(self, start: int, end: int) -> bytes:
+        return await self.db.scalar(
+            select(func.substring(func.convert_to(TestResult._logs, "UTF8"), start + 1, end - start))
+            .where(TestResult.id == self._execution_id)
+        ) or b""
@@ -0,0 +1,349 @@
+# app/services/partition_service.py
+import gzip
+import json
+import os
+import re
+from datetime import datetime, date
+from typing import Dict, List, Any, Optional
+from sqlalchemy import text, select
+from sqlalchemy.engine import Engine, Connection
+from app.config import settings, Base
+from app.models.artifact_model import Artifact
+from app.utils.logger import setup_logger
+
+logger = setup_logger("partitions")
+
+# Tablas particionadas por mes y columnas de texto que viven en `artifacts`
+PARTITIONED_TABLES = {
+    "test_results": {"logs_hash": "logs"},
+    "prompts": {"prompt_hash": "prompt_text", "code_hash": "generated_code"},
+}
+
+# Clave para pg_advisory_xact_lock (evita mantenimiento concurrente entre workers)
+MAINTENANCE_LOCK_KEY = 72_029
+
+_BOUND_RE = re.compile(r"FROM \((.+?)\) TO \((.+?)\)")
+
+
+def month_start(value: date, offset: int = 0) -> date:
+    """Primer día del mes de `value`, desplazado `offset` meses."""
+    index = value.year * 12 + (value.month - 1) + offset
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class PartitionService:
+    """
+    Particionado mensual por `created_at`, retención y archivado del historial.
+
+    Cada tabla tiene además una partición DEFAULT que recibe las filas fuera
+    de los meses creados (ej: `created_at` en el pasado); el mantenimiento
+    las mueve a su partición mensual para que la retención las alcance.
+
+    Solo aplica en PostgreSQL; en otros motores las operaciones no hacen nada.
+    """
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.enabled = engine.dialect.name == "postgresql"
+
+    def prepare(self) -> Dict[str, Any]:
+        """
+        Convierte tablas legacy y crea las particiones del mes actual y futuros.
+        Debe ejecutarse al iniciar, antes de aceptar escrituras.
+        """
+        if not self.enabled:
+            return {"enabled": False}
+
+        with self.engine.begin() as conn:
+            # Serializa la conversión entre workers que arrancan a la vez
+            conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MAINTENANCE_LOCK_KEY})
+            converted = [t for t in PARTITIONED_TABLES if self._convert_legacy_table(conn, t)]
+            created = self._ensure_partitions(conn)
+
+        return {"enabled": True, "converted": converted, "created": created}
+
+    def run_maintenance(self) -> Dict[str, Any]:
+        """
+        Mantenimiento periódico: particiones futuras + archivado de las vencidas.
+        Pensado para ejecutarse una vez al día.
+        """
+        summary = self.prepare()
+        if summary["enabled"]:
+            summary["archived"] = self.archive_expired()
+            logger.info(f"[PARTICIONES] Mantenimiento: {summary}")
+        return summary
+
+    def list_partitions(self, conn: Connection, table: str) -> List[Dict[str, Any]]:
+        """Particiones de una tabla con sus límites (None = MINVALUE/MAXVALUE)."""
+        rows = conn.execute(text("""
+            SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+            FROM pg_inherits
+            JOIN pg_class parent ON pg_inherits.inhparent = parent.oid
+            JOIN pg_class child ON pg_inherits.inhrelid = child.oid
+            WHERE parent.relname = :table
+        """), {"table": table}).all()
+
+        partitions = []
+        for row in rows:
+            match = _BOUND_RE.search(row.bound or "")
+            if not match:
+                continue
+            lower, upper = (self._parse_bound(value) for value in match.groups())
+            partitions.append({"name": row.name, "from": lower, "to": upper})
+
+        return sorted(partitions, key=lambda p: p["from"] or date.min)
+
+    def _parse_bound(self, value: str) -> Optional[date]:
+        if value in ("MINVALUE", "MAXVALUE"):
+            return None
+        return datetime.fromisoformat(value.strip("'")).date()
+
+    def _is_partitioned(self, conn: Connection, table: str) -> Optional[bool]:
+        """True si es tabla particionada, False si es tabla normal, None si no existe."""
+        kind = conn.execute(
+            text("SELECT relkind FROM pg_class WHERE relname = :table AND relnamespace = 'public'::regnamespace"),
+            {"table": table}
+        ).scalar()
+        if kind is None:
+            return None
+        return kind == "p"
+
+    def _convert_legacy_table(self, conn: Connection, table: str) -> bool:
+        """
+        Convierte una tabla existente sin particionar en tabla particionada.
+
+        La tabla original se renombra a `<tabla>_legacy` y se adjunta como
+        partición que cubre todo lo anterior al mes siguiente; no se copian filas.
+        Como abarca muchos meses, la retención la recorta por filas en lugar
+        de eliminarla entera (ver `archive_expired`).
+        """
+        if self._is_partitioned(conn, table) is not False:
+            return False
+
+        legacy = f"{table}_legacy"
+        boundary = month_start(date.today(), 1)
+
+        conn.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+        conn.execute(text(f"ALTER SEQUENCE IF EXISTS {table}_id_seq RENAME TO {legacy}_id_seq"))
+
+        # Los nombres de índices son globales al esquema: liberarlos para la tabla nueva
+        indexes = conn.execute(
+            text("SELECT indexname FROM pg_indexes WHERE tablename = :table"), {"table": legacy}
+        ).scalars().all()
+        for index in indexes:
+            if table in index:
+                conn.execute(text(f'ALTER INDEX "{index}" RENAME TO "{index.replace(table, legacy, 1)}"'))
+
+        # La clave de partición no admite NULL ni la PK antigua (solo id)
+        conn.execute(text(f"UPDATE {legacy} SET created_at = now() WHERE created_at IS NULL"))
+        conn.execute(text(f"ALTER TABLE {legacy} ALTER COLUMN created_at SET NOT NULL"))
+        conn.execute(text(f"ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {legacy}_pkey"))
+        conn.execute(text(f"ALTER TABLE {legacy} DROP CONSTRAINT IF EXISTS {table}_pkey"))
+
+        Base.metadata.tables[table].create(bind=conn)
+        conn.execute(text(
+            f"SELECT setval('{table}_id_seq', (SELECT COALESCE(MAX(id), 0) + 1 FROM {legacy}), false)"
+        ))
+        conn.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{boundary.isoformat()}')"
+        ))
+
+        logger.info(f"[PARTICIONES] {table} convertida; filas previas en {legacy}")
+        return True
+
+    def _ensure_partitions(self, conn: Connection) -> List[str]:
+        """
+        Crea la partición DEFAULT, las mensuales del mes actual y de los
+        próximos meses, y las de los meses que tengan filas en DEFAULT.
+        """
+        created = []
+        today = date.today()
+
+        for table in PARTITIONED_TABLES:
+            if not self._is_partitioned(conn, table):
+                continue
+
+            default = f"{table}_default"
+            if conn.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar() is None:
+                conn.execute(text(f"CREATE TABLE {default} PARTITION OF {table} DEFAULT"))
+                created.append(default)
+
+            months = {month_start(today, offset) for offset in range(0, settings.PARTITIONS_MONTHS_AHEAD + 1)}
+            months.update(conn.execute(
+                text(f"SELECT DISTINCT date_trunc('month', created_at)::date FROM {default}")
+            ).scalars())
+
+            existing = self.list_partitions(conn, table)
+            for lower in sorted(months):
+                upper = month_start(lower, 1)
+
+                overlaps = any(
+                    (p["from"] is None or p["from"] < upper) and (p["to"] is None or p["to"] > lower)
+                    for p in existing
+                )
+                if overlaps:
+                    continue
+
+                name = f"{table}_y{lower.year}m{lower.month:02d}"
+                self._create_partition(conn, table, name, lower, upper)
+                existing.append({"name": name, "from": lower, "to": upper})
+                created.append(name)
+
+        return created
+
+    def _create_partition(self, conn: Connection, table: str, name: str, lower: date, upper: date) -> None:
+        """
+        Crea la partición [lower, upper). Si DEFAULT tiene filas en ese rango,
+        PostgreSQL no permite crearla directamente: se crea como tabla suelta,
+        se mueven las filas y recién entonces se adjunta.
+        """
+        bounds = f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        in_range = "created_at >= :lower AND created_at < :upper"
+        params = {"lower": lower, "upper": upper}
+
+        if not conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {table}_default WHERE {in_range})"), params).scalar():
+            conn.execute(text(f"CREATE TABLE {name} PARTITION OF {table} {bounds}"))
+            return
+
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        moved = conn.execute(text(
+            f"WITH moved AS (DELETE FROM {table}_default WHERE {in_range} RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved"
+        ), params).rowcount
+        conn.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {name} {bounds}"))
+        logger.info(f"[PARTICIONES] {moved} filas movidas de {table}_default a {name}")
+
+    def archive_expired(self) -> List[str]:
+        """
+        Archiva en JSONL comprimido y elimina las particiones fuera de retención.
+
+        Cada fila del archivo incluye los textos completos (logs, prompt, código)
+        resueltos desde `artifacts`, así el archivo es autocontenido. La
+        partición legacy (desde MINVALUE) sigue recibiendo uso hasta su límite:
+        de ella se archivan y borran solo las filas anteriores al corte.
+        """
+        if not self.enabled or settings.RESULTS_RETENTION_MONTHS <= 0:
+            return []
+
+        cutoff = month_start(date.today(), -settings.RESULTS_RETENTION_MONTHS)
+        archived = []
+
+        for table in PARTITIONED_TABLES:
+            with self.engine.connect() as conn:
+                if not self._is_partitioned(conn, table):
+                    continue
+                partitions = self.list_partitions(conn, table)
+            expired = [p for p in partitions if p["to"] and p["to"] <= cutoff]
+            spanning = [p for p in partitions if p["from"] is None and (p["to"] is None or p["to"] > cutoff)]
+
+            for partition in expired:
+                with self.engine.connect() as conn:
+                    path = self._write_archive(conn, table, partition["name"])
+                with self.engine.begin() as conn:
+                    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {partition['name']}"))
+                    conn.execute(text(f"DROP TABLE {partition['name']}"))
+                logger.info(f"[PARTICIONES] {partition['name']} archivada en {path} y eliminada")
+                archived.append(partition["name"])
+
+            for partition in spanning:
+                if self._archive_rows_before(table, partition["name"], cutoff):
+                    archived.append(f"{partition['name']} (< {cutoff.isoformat()})")
+
+        if archived:
+            self._delete_orphan_artifacts()
+
+        return archived
+
+    def _archive_rows_before(self, table: str, partition: str, cutoff: date) -> int:
+        """
+        Archiva y borra las filas de `partition` anteriores a `cutoff`.
+        Lectura y borrado van en una transacción REPEATABLE READ: se borran
+        exactamente las filas escritas en el archivo. Devuelve las borradas.
+        """
+        params = {"cutoff": cutoff}
+        with self.engine.execution_options(isolation_level="REPEATABLE READ").begin() as conn:
+            if not conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {partition} WHERE created_at < :cutoff)"), params).scalar():
+                return 0
+            name = f"{partition}_antes_{cutoff:%Y%m%d}_{datetime.now():%Y%m%d%H%M%S}"
+            path = self._write_archive(conn, table, partition, name=name, before=cutoff)
+            deleted = conn.execute(text(f"DELETE FROM {partition} WHERE created_at < :cutoff"), params).rowcount
+        logger.info(f"[PARTICIONES] {deleted} filas de {partition} archivadas en {path} y eliminadas")
+        return deleted
+
+    def _write_archive(
+        self,
+        conn: Connection,
+        table: str,
+        partition: str,
+        name: Optional[str] = None,
+        before: Optional[date] = None,
+        chunk_size: int = 500
+    ) -> str:
+        """
+        Vuelca una partición (o sus filas anteriores a `before`) a
+        `<ARCHIVE_DIR>/<name>.jsonl.gz` en bloques.
+        """
+        os.makedirs(settings.ARCHIVE_DIR, exist_ok=True)
+        path = os.path.join(settings.ARCHIVE_DIR, f"{name or partition}.jsonl.gz")
+        text_columns = PARTITIONED_TABLES[table]
+        where = "" if before is None else "WHERE created_at < :before"
+
+        with gzip.open(path, "wt", encoding="utf-8") as archive:
+            result = conn.execute(
+                text(f"SELECT * FROM {partition} {where} ORDER BY id"), {"before": before},
+                execution_options={"stream_results": True, "yield_per": chunk_size}
+            )
+            for chunk in result.mappings().partitions():
+                hashes = {row[col] for row in chunk for col in text_columns if row[col]}
+                texts = {
+                    artifact.hash: artifact.read_text()
+                    for artifact in self._load_artifacts(conn, hashes)
+                }
+                for row in chunk:
+                    record = {
+                        key: value.isoformat() if isinstance(value, (datetime, date)) else value
+                        for key, value in row.items()
+                    }
+                    for hash_column, text_name in text_columns.items():
+                        if row[hash_column]:
+                            record[text_name] = texts.get(row[hash_column])
+                    archive.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        return path
+
+    def _load_artifacts(self, conn: Connection, hashes: set) -> List[Artifact]:
+        if not hashes:
+            return []
+        rows = conn.execute(
+            select(Artifact.hash, Artifact.encoding, Artifact.size, Artifact.data).where(Artifact.hash.in_(hashes))
+        ).all()
+        return [Artifact(hash=r.hash, encoding=r.encoding, size=r.size, data=r.data) for r in rows]
+
+    def _delete_orphan_artifacts(self, batch_size: int = 5000) -> None:
+        """
+        Elimina artefactos que ya no referencia ninguna fila.
+
+        Una escritura que reutiliza un artefacto lo bloquea hasta su commit
+        (ver `_store_pending_artifacts`). Acá se bloquean los candidatos
+        salteando los que están en uso y se vuelve a comprobar en otra
+        sentencia, que ya ve las filas confirmadas mientras tanto.
+        """
+        references = " AND ".join(
+            f"NOT EXISTS (SELECT 1 FROM {table} WHERE {table}.{column} = artifacts.hash)"
+            for table, columns in PARTITIONED_TABLES.items()
+            for column in columns
+        )
+        deleted = 0
+        while True:
+            with self.engine.begin() as conn:
+                candidates = conn.execute(
+                    text(f"SELECT hash FROM artifacts WHERE {references} LIMIT :limit FOR UPDATE SKIP LOCKED"),
+                    {"limit": batch_size}
+                ).scalars().all()
+                if not candidates:
+                    break
+                deleted += conn.execute(
+                    text(f"DELETE FROM artifacts WHERE hash = ANY(:hashes) AND {references}"),
+                    {"hashes": candidates}
+                ).rowcount
+        logger.info(f"[PARTICIONES] Artefactos huérfanos eliminados: {deleted}")
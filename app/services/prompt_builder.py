@@ -1,8 +1,71 @@
 from app.models.case_model import TestCase
+from collections import defaultdict
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Iterable, Mapping, Optional, Tuple
+import hashlib
 import os
 import re
 import json
 
+_NAME_CHARS = r"[A-Za-záéíóúÁÉÍÓÚñÑ\s]+?"
+
+# Extractores de datos del texto del caso: campo -> [(patrón, grupo), ...]
+# Por campo se usa el primer patrón que coincide (mismo orden de prioridad de siempre)
+FIELD_EXTRACTORS = {
+    "email": [
+        (re.compile(r'\b[\w.-]+@[\w.-]+\.\w+\b'), 0),
+        (re.compile(r'(?:e?mail|correo)[:\s]+([^\s,;]+@[^\s,;]+)', re.IGNORECASE), 1),
+    ],
+    "username": [(re.compile(r'(?:usuario|username|user)[:\s]+([^\s,;]+)', re.IGNORECASE), 1)],
+    "password": [(re.compile(r'(?:contraseña|password|clave)[:\s]+([^\s,;]+)', re.IGNORECASE), 1)],
+    "fullname": [(re.compile(r'(?:nombre|fullname|name)[:\s]+(' + _NAME_CHARS + r')(?:,|;|\.|$)', re.IGNORECASE), 1)],
+    "lastname": [(re.compile(r'(?:apellido|lastname|surname)[:\s]+(' + _NAME_CHARS + r')(?:,|;|\.|$)', re.IGNORECASE), 1)],
+    "search_term": [(re.compile(r'(?:buscar|search)[:\s]+([^,;.]+)', re.IGNORECASE), 1)],
+    "sections": [(re.compile(r'(?:secciones|módulos|sections)[:\s]+([^.]+)', re.IGNORECASE), 1)],
+}
+
+# Indicadores de credenciales explícitas al detectar el tipo de test
+_HAS_EMAIL = re.compile(r'(email|correo|e-mail)[:\s]+[\w.-]+@[\w.-]+\.\w+', re.IGNORECASE)
+_HAS_PASSWORD = re.compile(r'(contraseña|password|clave)[:\s]+\w+', re.IGNORECASE)
+
+# Casos distintos (por texto) cuyos datos extraídos se conservan en memoria
+EXTRACTION_CACHE_SIZE = 16384
+
+
+@lru_cache(maxsize=EXTRACTION_CACHE_SIZE)
+def extract_fields(text: str) -> Mapping[str, Optional[str]]:
+    """
+    Aplica los extractores al texto de un caso: una búsqueda por patrón,
+    hasta el primero que coincide en cada campo.
+
+    Memoizado por texto: el mismo caso (y versión) no se vuelve a escanear,
+    y cualquier cambio en pasos o descripción produce otra entrada.
+    Devuelve un mapeo de solo lectura campo -> valor (None si no aparece).
+    """
+    fields = {}
+    for field, extractors in FIELD_EXTRACTORS.items():
+        fields[field] = None
+        for pattern, group in extractors:
+            match = pattern.search(text)
+            if match:
+                value = match.group(group)
+                fields[field] = value if group == 0 else value.strip()
+                break
+    return MappingProxyType(fields)
+
+
+def prompts_hash(prompts: Mapping[int, str]) -> str:
+    """
+    Hash de un conjunto de prompts (id de caso + texto, ordenados por id).
+    Sirve como clave de caché: cambia si cambia cualquier prompt o el set de casos.
+    """
+    digest = hashlib.sha256()
+    for case_id in sorted(prompts):
+        digest.update(f"{case_id}\x1f{prompts[case_id]}\x1e".encode("utf-8"))
+    return digest.hexdigest()
+
+
 class PromptBuilder:
     """
     Construye prompts optimizados usando templates específicos para cada tipo de test.
@@ -46,6 +109,37 @@ class PromptBuilder:
             print(f"⚠️ Error al formatear template: {e}")
             return self._build_fallback_prompt(test_case)
     
+    def build_prompts(self, test_cases: Iterable[TestCase]) -> Tuple[Dict[int, str], str]:
+        """
+        Genera los prompts de varios casos (ej: una suite completa) de una vez.
+        
+        Agrupa los casos por tipo de test y carga cada template una sola vez
+        para todo su grupo, en lugar de detectar y leer el archivo por caso.
+        Cada prompt es idéntico al que devolvería `build_prompt`.
+        
+        Returns:
+            (prompts, hash): mapeo id de caso -> prompt, en el orden recibido,
+            y el hash del conjunto (ver `prompts_hash`)
+        """
+        test_cases = list(test_cases)
+        groups = defaultdict(list)
+        for test_case in test_cases:
+            groups[self._detect_test_type(test_case)].append(test_case)
+        
+        rendered = {}
+        for test_type, cases in groups.items():
+            template = self._load_template(test_type)
+            for test_case in cases:
+                try:
+                    rendered[test_case.id] = template.format(**self._extract_test_data(test_case, test_type))
+                except KeyError as e:
+                    print(f"⚠️ Error al formatear template {test_type} (caso {test_case.id}): {e}")
+                    rendered[test_case.id] = self._build_fallback_prompt(test_case)
+        
+        prompts = {test_case.id: rendered[test_case.id] for test_case in test_cases}
+        print(f"✅ {len(prompts)} prompts generados ({len(groups)} tipos de test)")
+        return prompts, prompts_hash(prompts)
+    
     def _detect_test_type(self, test_case: TestCase) -> str:
         """
         Detecta el tipo de test basándose en el contenido del caso de prueba.
@@ -71,8 +165,8 @@ class PromptBuilder:
             has_success_indicator = any(keyword in text for keyword in ['correcto', 'válido', 'exitoso', 'correct', 'valid', 'successful', 'exitosa', 'válida'])
             
             # O tiene email Y password explícitos
-            has_email = bool(re.search(r'(email|correo|e-mail)[:\s]+[\w.-]+@[\w.-]+\.\w+', text, re.IGNORECASE))
-            has_password = bool(re.search(r'(contraseña|password|clave)[:\s]+\w+', text, re.IGNORECASE))
+            has_email = bool(_HAS_EMAIL.search(text))
+            has_password = bool(_HAS_PASSWORD.search(text))
             
             if has_success_indicator or (has_email and has_password):
                 return "login_credenciales_correctas"
@@ -143,6 +237,11 @@ class PromptBuilder:
             except (json.JSONDecodeError, TypeError):
                 # Si no es JSON, mantener como texto
                 pass
+            if not isinstance(input_data, dict):
+                input_data = {}  # JSON que no es objeto (ej: "123"): se trata como texto
+        
+        # Datos del texto del caso (memoizado por texto)
+        fields = self._extract_fields(test_case)
         
         # Datos base comunes para todos los templates
         data = {
@@ -154,14 +253,14 @@ class PromptBuilder:
         
         # Datos específicos según el tipo de test
         if test_type == "login_google_auth":
-            data["email"] = input_data.get("email") or self._extract_email(test_case) or "andersonveelezca@gmail.com"
+            data["email"] = input_data.get("email") or fields["email"] or "andersonveelezca@gmail.com"
         
         elif test_type == "login_facebook_auth":
-            data["email"] = input_data.get("email") or self._extract_email(test_case) or "andersonveelezca@gmail.com"
+            data["email"] = input_data.get("email") or fields["email"] or "andersonveelezca@gmail.com"
         
         elif test_type == "login_credenciales_correctas":
-            data["email"] = input_data.get("email") or self._extract_email(test_case) or "carmen_llanos@gmail.com"
-            data["password"] = input_data.get("password") or self._extract_password(test_case) or "carmenLlanos123#"
+            data["email"] = input_data.get("email") or fields["email"] or "carmen_llanos@gmail.com"
+            data["password"] = input_data.get("password") or fields["password"] or "carmenLlanos123#"
         
         elif test_type == "login_credenciales_incorrectas":
             data["email"] = input_data.get("email") or "usuario_invalido@example.com"
@@ -169,19 +268,19 @@ class PromptBuilder:
             data["expected_result"] = "Credenciales incorrectas o error de autenticación"
         
         elif test_type == "google_oauth_login":
-            data["email"] = input_data.get("email") or self._extract_email(test_case) or "andersonveelezca@gmail.com"
+            data["email"] = input_data.get("email") or fields["email"] or "andersonveelezca@gmail.com"
             data["oauth_provider"] = "Google"
         
         elif test_type == "traditional_login":
-            data["username"] = input_data.get("username") or self._extract_username(test_case) or "testuser"
-            data["password"] = input_data.get("password") or self._extract_password(test_case) or "Test123!"
+            data["username"] = input_data.get("username") or fields["username"] or "testuser"
+            data["password"] = input_data.get("password") or fields["password"] or "Test123!"
         
         elif test_type == "user_registration":
-            data["fullname"] = input_data.get("fullname") or self._extract_fullname(test_case) or "Juan"
-            data["lastname"] = input_data.get("lastname") or self._extract_lastname(test_case) or "Pérez"
-            data["email"] = input_data.get("email") or self._extract_email(test_case) or "testuser@example.com"
-            data["username"] = input_data.get("username") or self._extract_username(test_case) or "testuser123"
-            data["password"] = input_data.get("password") or self._extract_password(test_case) or "Test123!@#"
+            data["fullname"] = input_data.get("fullname") or fields["fullname"] or "Juan"
+            data["lastname"] = input_data.get("lastname") or fields["lastname"] or "Pérez"
+            data["email"] = input_data.get("email") or fields["email"] or "testuser@example.com"
+            data["username"] = input_data.get("username") or fields["username"] or "testuser123"
+            data["password"] = input_data.get("password") or fields["password"] or "Test123!@#"
             data["confirm_password"] = input_data.get("confirm_password") or data["password"]
             data["gender"] = input_data.get("gender") or "Masculino"
             
@@ -197,10 +296,10 @@ class PromptBuilder:
                 data["birthdate_year"] = "1990"
         
         elif test_type == "search_functionality":
-            data["search_term"] = input_data.get("search_term") or self._extract_search_term(test_case) or "producto test"
+            data["search_term"] = input_data.get("search_term") or fields["search_term"] or "producto test"
         
         elif test_type == "navigation":
-            sections = input_data.get("sections") or self._extract_sections(test_case)
+            sections = input_data.get("sections") or fields["sections"]
             data["sections"] = sections if sections else "Home,Productos,Contacto"
         
         elif test_type == "logout":
@@ -209,133 +308,9 @@ class PromptBuilder:
         
         return data
     
-    def _extract_email(self, test_case: TestCase) -> str:
-        """Extrae email del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        # Buscar patrón de email
-        email_match = re.search(r'\b[\w.-]+@[\w.-]+\.\w+\b', text)
-        if email_match:
-            return email_match.group(0)
-        
-        # Buscar "Email: xxx" o "Correo: xxx"
-        email_pattern = re.search(r'(?:e?mail|correo)[:\s]+([^\s,;]+@[^\s,;]+)', text, re.IGNORECASE)
-        if email_pattern:
-            return email_pattern.group(1)
-        
-        return None
-    
-    def _extract_username(self, test_case: TestCase) -> str:
-        """Extrae username del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        username_pattern = re.search(r'(?:usuario|username|user)[:\s]+([^\s,;]+)', text, re.IGNORECASE)
-        if username_pattern:
-            return username_pattern.group(1)
-        
-        return None
-    
-    def _extract_password(self, test_case: TestCase) -> str:
-        """Extrae password del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        password_pattern = re.search(r'(?:contraseña|password|clave)[:\s]+([^\s,;]+)', text, re.IGNORECASE)
-        if password_pattern:
-            return password_pattern.group(1)
-        
-        return None
-    
-    def _extract_fullname(self, test_case: TestCase) -> str:
-        """Extrae nombre completo del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        # Buscar "Nombre: xxx" o "Fullname: xxx"
-        name_pattern = re.search(r'(?:nombre|fullname|name)[:\s]+([A-Za-záéíóúÁÉÍÓÚñÑ\s]+?)(?:,|;|\.|$)', text, re.IGNORECASE)
-        if name_pattern:
-            return name_pattern.group(1).strip()
-        
-        return None
-    
-    def _extract_lastname(self, test_case: TestCase) -> str:
-        """Extrae apellido del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        lastname_pattern = re.search(r'(?:apellido|lastname|surname)[:\s]+([A-Za-záéíóúÁÉÍÓÚñÑ\s]+?)(?:,|;|\.|$)', text, re.IGNORECASE)
-        if lastname_pattern:
-            return lastname_pattern.group(1).strip()
-        
-        return None
-    
-    def _extract_search_term(self, test_case: TestCase) -> str:
-        """Extrae término de búsqueda del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        search_pattern = re.search(r'(?:buscar|search)[:\s]+([^,;.]+)', text, re.IGNORECASE)
-        if search_pattern:
-            return search_pattern.group(1).strip()
-        
-        return None
-    
-    def _extract_sections(self, test_case: TestCase) -> str:
-        """Extrae secciones a visitar del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        sections_pattern = re.search(r'(?:secciones|módulos|sections)[:\s]+([^.]+)', text, re.IGNORECASE)
-        if sections_pattern:
-            return sections_pattern.group(1).strip()
-        
-        return None
-    
-    def _extract_password(self, test_case: TestCase) -> str:
-        """Extrae password del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        password_pattern = re.search(r'(?:contraseña|password|clave)[:\s]+([^\s,;]+)', text, re.IGNORECASE)
-        if password_pattern:
-            return password_pattern.group(1)
-        
-        return None
-    
-    def _extract_fullname(self, test_case: TestCase) -> str:
-        """Extrae nombre completo del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        # Buscar "Nombre: xxx" o "Fullname: xxx"
-        name_pattern = re.search(r'(?:nombre|fullname|name)[:\s]+([A-Za-záéíóúÁÉÍÓÚñÑ\s]+?)(?:,|;|\.|$)', text, re.IGNORECASE)
-        if name_pattern:
-            return name_pattern.group(1).strip()
-        
-        return None
-    
-    def _extract_lastname(self, test_case: TestCase) -> str:
-        """Extrae apellido del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        lastname_pattern = re.search(r'(?:apellido|lastname|surname)[:\s]+([A-Za-záéíóúÁÉÍÓÚñÑ\s]+?)(?:,|;|\.|$)', text, re.IGNORECASE)
-        if lastname_pattern:
-            return lastname_pattern.group(1).strip()
-        
-        return None
-    
-    def _extract_search_term(self, test_case: TestCase) -> str:
-        """Extrae término de búsqueda del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        search_pattern = re.search(r'(?:buscar|search)[:\s]+([^,;.]+)', text, re.IGNORECASE)
-        if search_pattern:
-            return search_pattern.group(1).strip()
-        
-        return None
-    
-    def _extract_sections(self, test_case: TestCase) -> str:
-        """Extrae secciones a visitar del test case"""
-        text = f"{test_case.steps} {test_case.description}"
-        
-        sections_pattern = re.search(r'(?:secciones|módulos|sections)[:\s]+([^.]+)', text, re.IGNORECASE)
-        if sections_pattern:
-            return sections_pattern.group(1).strip()
-        
-        return None
+    def _extract_fields(self, test_case: TestCase) -> Mapping[str, Optional[str]]:
+        """Datos del texto del caso (pasos + descripción), ver `extract_fields`."""
+        return extract_fields(f"{test_case.steps} {test_case.description}")
     
     def _get_default_template(self, test_type: str) -> str:
         """
@@ -0,0 +1,178 @@
+let statusChart, timelineChart;
+let state = null;  // Último snapshot, actualizado en vivo por SSE
+
+async function loadDashboard() {
+    try {
+        // Una sola petición con todos los paneles (lectura consistente)
+        const snapshotRes = await fetch('/api/dashboard/snapshot?days=7&limit=10');
+        state = await snapshotRes.json();
+        renderAll();
+
+    } catch (error) {
+        console.error('Error cargando dashboard:', error);
+    }
+}
+
+function renderAll() {
+    renderMetrics(state.metrics);
+    renderStatusChart(state.metrics.status_breakdown);
+    renderTimelineChart(state.timeline);
+    renderExecutionsTable(state.recent);
+}
+
+function renderMetrics(metrics) {
+    const metricsHtml = `
+        <div class="metric-card info">
+            <div class="metric-label">Total Tests</div>
+            <div class="metric-value">${metrics.summary.total_cases}</div>
+        </div>
+        <div class="metric-card success">
+            <div class="metric-label">Ejecuciones</div>
+            <div class="metric-value">${metrics.summary.total_executions}</div>
+        </div>
+        <div class="metric-card warning">
+            <div class="metric-label">Tasa de Éxito</div>
+            <div class="metric-value">${metrics.status_breakdown.success_rate}%</div>
+        </div>
+        <div class="metric-card danger">
+            <div class="metric-label">Últimas 24h</div>
+            <div class="metric-value">${metrics.summary.executions_24h}</div>
+        </div>
+    `;
+    document.getElementById('metrics').innerHTML = metricsHtml;
+}
+
+function renderStatusChart(breakdown) {
+    const data = [breakdown.passed, breakdown.failed, breakdown.error];
+
+    // Actualizar en el lugar si ya existe (sin recrear el gráfico)
+    if (statusChart) {
+        statusChart.data.datasets[0].data = data;
+        statusChart.update();
+        return;
+    }
+
+    const ctx = document.getElementById('statusChart').getContext('2d');
+    statusChart = new Chart(ctx, {
+        type: 'doughnut',
+        data: {
+            labels: ['Passed', 'Failed', 'Error'],
+            datasets: [{
+                data: data,
+                backgroundColor: ['#10b981', '#ef4444', '#f59e0b'],
+                borderWidth: 0
+            }]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                legend: { position: 'bottom' }
+            }
+        }
+    });
+}
+
+function renderTimelineChart(timeline) {
+    const labels = timeline.map(d => d.date);
+    const passed = timeline.map(d => d.passed);
+    const failed = timeline.map(d => d.failed);
+
+    if (timelineChart) {
+        timelineChart.data.labels = labels;
+        timelineChart.data.datasets[0].data = passed;
+        timelineChart.data.datasets[1].data = failed;
+        timelineChart.update();
+        return;
+    }
+
+    const ctx = document.getElementById('timelineChart').getContext('2d');
+    timelineChart = new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: labels,
+            datasets: [
+                {
+                    label: 'Passed',
+                    data: passed,
+                    borderColor: '#10b981',
+                    backgroundColor: 'rgba(16, 185, 129, 0.1)',
+                    tension: 0.4
+                },
+                {
+                    label: 'Failed',
+                    data: failed,
+                    borderColor: '#ef4444',
+                    backgroundColor: 'rgba(239, 68, 68, 0.1)',
+                    tension: 0.4
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            plugins: {
+                legend: { position: 'bottom' }
+            }
+        }
+    });
+}
+
+function renderExecutionsTable(executions) {
+    const tbody = document.querySelector('#executionsTable tbody');
+    tbody.innerHTML = executions.map(ex => `
+        <tr>
+            <td>#${ex.id}</td>
+            <td>${ex.test_name}</td>
+            <td><span class="status-badge status-${ex.status}">${ex.status.toUpperCase()}</span></td>
+            <td>${ex.execution_time}</td>
+            <td>${ex.created_at}</td>
+        </tr>
+    `).join('');
+}
+
+// Aplicar una ejecución nueva al estado local sin volver a consultar la API
+function applyResult(result) {
+    if (!state) return;
+
+    const summary = state.metrics.summary;
+    const breakdown = state.metrics.status_breakdown;
+    summary.total_executions += 1;
+    summary.executions_24h += 1;
+    if (result.status in breakdown) breakdown[result.status] += 1;
+    breakdown.success_rate = summary.total_executions > 0
+        ? Math.round(breakdown.passed / summary.total_executions * 10000) / 100
+        : 0;
+
+    const day = result.created_at.slice(0, 10);
+    let bucket = state.timeline.find(d => d.date === day);
+    if (!bucket) {
+        bucket = { date: day, passed: 0, failed: 0, error: 0 };
+        state.timeline.push(bucket);
+    }
+    if (result.status in bucket) bucket[result.status] += 1;
+
+    state.recent = [result, ...state.recent].slice(0, 10);
+    renderAll();
+}
+
+function connectLiveUpdates() {
+    const source = new EventSource('/api/dashboard/stream');
+
+    source.addEventListener('result', e => applyResult(JSON.parse(e.data)));
+    source.addEventListener('cases', e => {
+        if (!state) return;
+        state.metrics.summary.total_cases += JSON.parse(e.data).added;
+        renderMetrics(state.metrics);
+    });
+    source.addEventListener('resync', () => loadDashboard());
+
+    // Al reconectar pueden haberse perdido eventos: recargar el snapshot
+    let connectedOnce = false;
+    source.addEventListener('open', () => {
+        if (connectedOnce) loadDashboard();
+        connectedOnce = true;
+    });
+}
+
+// Cargar al inicio y luego escuchar actualizaciones en vivo
+loadDashboard();
+connectLiveUpdates();
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Respuestas guardadas como máximo (LRU): cada combinación de query string es una entrada
+CACHE_MAX_ENTRIES = 1024
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    etag: str
+    expires_at: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache:
+    """
+    Caché en memoria de respuestas JSON con TTL por endpoint y ETag.
+
+    - Se invalida completa cuando se escribe alguna de las tablas vigiladas.
+    - Las peticiones concurrentes a una misma clave esperan un único cálculo.
+    - Lleva contadores de aciertos/fallos por endpoint.
+
+    Las claves dependen del query string (cursor, limit, ...), que controla
+    el cliente: las entradas se acotan a `max_entries` (LRU, las vencidas se
+    descartan al leerlas) y el lock de una clave vive solo mientras alguien
+    la está calculando o esperando.
+    """
+    def __init__(self, watched_tables: Set[str], max_entries: int = CACHE_MAX_ENTRIES):
+        self.watched_tables = watched_tables
+        self.max_entries = max_entries
+        self.version = 0
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._waiters: Dict[str, int] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self._entries.clear()
+
+    def _record(self, name: str, hit: bool) -> None:
+        stats = self._stats.setdefault(name, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Aciertos, fallos y tasa de acierto por endpoint."""
+        endpoints = {}
+        for name, stats in self._stats.items():
+            total = stats["hits"] + stats["misses"]
+            endpoints[name] = {
+                **stats,
+                "hit_ratio": round(stats["hits"] / total, 4) if total else 0.0
+            }
+        return {"version": self.version, "entries": len(self._entries), "endpoints": endpoints}
+
+    async def respond(
+        self,
+        request: Request,
+        name: str,
+        ttl: int,
+        compute: Callable[[Response], Awaitable[Any]]
+    ) -> Response:
+        """
+        Devuelve la respuesta cacheada de `name` o la calcula con `compute`.
+
+        `compute` recibe un Response para fijar headers propios (ej: X-Next-Cursor),
+        que se guardan junto al cuerpo. Si el cliente envía un `If-None-Match`
+        igual al ETag vigente se responde 304 sin cuerpo.
+        """
+        key = f"{name}?{request.url.query}"
+        entry = self._get(key)
+        self._record(name, hit=entry is not None)
+
+        if entry is None:
+            lock = self._locks.setdefault(key, asyncio.Lock())
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+            try:
+                async with lock:
+                    entry = self._get(key)
+                    if entry is None:
+                        entry = await self._compute(key, ttl, compute)
+            finally:
+                self._waiters[key] -= 1
+                if not self._waiters[key]:
+                    del self._waiters[key]
+                    del self._locks[key]
+
+        headers = {**entry.headers, "ETag": entry.etag, "Cache-Control": "no-cache"}
+        if request.headers.get("if-none-match") == entry.etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def _get(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _compute(self, key: str, ttl: int, compute) -> CacheEntry:
+        version = self.version
+        scratch = Response()
+        data = await compute(scratch)
+
+        body = json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        entry = CacheEntry(
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            expires_at=time.monotonic() + ttl,
+            headers={k: v for k, v in scratch.headers.items() if k.lower().startswith("x-")}
+        )
+
+        # Si hubo una escritura mientras se calculaba, no guardar datos ya viejos
+        if version == self.version:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+
+# Caché compartida por los endpoints del dashboard
+dashboard_cache = ResponseCache(watched_tables={"test_results", "test_cases", "prompts"})
+
+
+def _touches_watched(objects) -> bool:
+    return any(getattr(obj, "__tablename__", None) in dashboard_cache.watched_tables for obj in objects)
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_dirty_on_flush(session, flush_context):
+    if _touches_watched(list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info["dashboard_cache_dirty"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_dirty_on_bulk(orm_execute_state):
+    # INSERT/UPDATE/DELETE masivos (ej: carga de casos) no pasan por el flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is not None and mapper.local_table.name in dashboard_cache.watched_tables:
+            orm_execute_state.session.info["dashboard_cache_dirty"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop("dashboard_cache_dirty", False):
+        dashboard_cache.invalidate()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session):
+    session.info.pop("dashboard_cache_dirty", None)
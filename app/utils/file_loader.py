@@ -1,11 +1,200 @@
+import csv
+import json
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 import pandas as pd
-from typing import List, Dict
-import io
+from openpyxl import load_workbook
 
-def load_excel_cases(file) -> List[Dict]:
+# Columnas obligatorias del archivo de casos
+REQUIRED_COLUMNS = ['module_name', 'case_name', 'input_data', 'expected_result']
+
+# Valores de la columna `active` que marcan un caso como activo
+ACTIVE_VALUES = ['VERDADERO', 'TRUE', '1', 'YES', 'SI', 'SÍ', 'ACTIVO']
+
+# `"url": "..."` dentro de input_data (JSON con comillas simples o dobles)
+URL_PATTERN = re.compile(r"""["']url["']\s*:\s*["']([^"']*)["']""")
+
+# Filas por bloque al normalizar
+FRAME_CHUNK_SIZE = 5000
+
+# Libros con varias hojas desde este tamaño se parsean en paralelo (una hoja por proceso);
+# por debajo, arrancar los procesos cuesta más que leer las hojas en secuencia
+EXCEL_PARALLEL_MIN_BYTES = 512 * 1024
+
+# El pool arma cada hoja completa en memoria (~25 MB por MB de .xlsx en el proceso
+# y otro tanto al recibirla); por encima de este tamaño se lee en streaming
+EXCEL_PARALLEL_MAX_BYTES = 8 * 1024 * 1024
+
+# Formatos de carga admitidos por extensión
+UPLOAD_FORMATS = {
+    '.xlsx': 'excel', '.xls': 'excel',
+    '.csv': 'csv', '.txt': 'csv',
+    '.jsonl': 'jsonl', '.ndjson': 'jsonl',
+    '.parquet': 'parquet',
+}
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Agrupa un iterable en listas de hasta `size` elementos."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validate_columns(columns: List[str]) -> None:
+    """
+    Valida que estén las columnas requeridas (ya normalizadas a minúsculas).
+
+    Raises:
+        ValueError: Si falta alguna columna
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in columns]
+    if missing_columns:
+        available_cols = ', '.join(str(col) for col in columns)
+        raise ValueError(
+            f"❌ Faltan columnas requeridas: {', '.join(missing_columns)}. "
+            f"Columnas encontradas: {available_cols}"
+        )
+
+
+def _text(value: Any) -> str:
+    return str(value).strip() if value is not None else ''
+
+
+def _clean(column: pd.Series) -> pd.Series:
+    """Texto sin espacios; nulos como cadena vacía."""
+    return column.fillna('').astype(str).str.strip()
+
+
+def normalize_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normaliza un bloque de filas con operaciones por columna (sin iterrows):
+    descarta filas vacías e inactivas, arma el nombre y extrae la URL.
+
+    Returns:
+        DataFrame con las columnas de `TestCase`: name, description, steps,
+        expected_result, url
+    """
+    # Validar que la fila no esté vacía
+    df = df.dropna(subset=['case_name', 'input_data'])
+
+    # Aceptar: VERDADERO, TRUE, 1, YES, SI, SÍ, ACTIVO (vacío = activo)
+    if 'active' in df.columns:
+        active = df['active']
+        df = df[active.isna() | active.astype(str).str.strip().str.upper().isin(ACTIVE_VALUES)]
+
+    module = _clean(df['module_name'])
+    case_name = _clean(df['case_name'])
+    steps = _clean(df['input_data'])  # input_data se guarda como steps
+
+    # Extraer URL si está en el input_data (formato JSON)
+    url = steps.str.extract(URL_PATTERN, expand=False)
+
+    return pd.DataFrame({
+        'name': (module + ' - ' + case_name).where(module != '', case_name),
+        'description': _clean(df['description']) if 'description' in df.columns else '',
+        'steps': steps,
+        'expected_result': _clean(df['expected_result']),
+        'url': url.astype(object).where(url.notna(), None)
+    }, index=df.index)
+
+
+def iter_rows_from_frames(frames: Iterable[pd.DataFrame]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Normaliza cada bloque y genera (fila, caso). `fila` es el número de fila
+    de datos en el archivo (1 = primera fila después del encabezado).
     """
-    Carga casos de prueba desde un archivo Excel.
-    
+    for frame in frames:
+        if frame.empty:
+            continue
+        normalized = normalize_frame(frame)
+        yield from zip((normalized.index + 1).tolist(), normalized.to_dict('records'))
+
+
+def iter_cases_from_frames(frames: Iterable[pd.DataFrame]) -> Iterator[Dict[str, Any]]:
+    """Normaliza cada bloque y genera sus casos como diccionarios."""
+    for _, case in iter_rows_from_frames(frames):
+        yield case
+
+
+def _open_workbook(file):
+    try:
+        return load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise ValueError(f"❌ Error al procesar el archivo Excel: {str(e)}")
+
+
+def excel_case_sheets(file) -> List[str]:
+    """
+    Hojas del libro cuyos encabezados tienen las columnas requeridas (ej: una
+    hoja por módulo). Solo lee la primera fila de cada hoja.
+
+    Raises:
+        ValueError: Si ninguna hoja tiene las columnas (detalle de la primera)
+    """
+    workbook = _open_workbook(file)
+    try:
+        sheets, first_columns = [], None
+        for worksheet in workbook.worksheets:
+            header = next(worksheet.iter_rows(max_row=1, values_only=True), None) or ()
+            columns = [_text(col).lower() for col in header]
+            if first_columns is None:
+                first_columns = columns
+            if all(col in columns for col in REQUIRED_COLUMNS):
+                sheets.append(worksheet.title)
+    finally:
+        workbook.close()
+
+    if not sheets:
+        validate_columns(first_columns or [])
+    return sheets
+
+
+def iter_excel_frames(file, chunk_size: int = FRAME_CHUNK_SIZE, sheet: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Recorre una hoja (por defecto la primera) en bloques de `chunk_size` filas
+    sin cargar el libro completo (openpyxl en modo `read_only`). La primera
+    fila son los encabezados.
+
+    Args:
+        file: Archivo binario con posibilidad de seek (ej: UploadFile.file)
+        sheet: Nombre de la hoja
+    """
+    workbook = _open_workbook(file)
+
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            raise ValueError("❌ El archivo Excel está vacío")
+
+        # Normalizar nombres de columnas (quitar espacios y convertir a minúsculas)
+        columns = [_text(col).lower() for col in header]
+        validate_columns(columns)
+
+        offset = 0
+        for block in chunked(rows, chunk_size):
+            frame = pd.DataFrame.from_records(block, columns=columns)
+            frame.index += offset  # Índice global: numeración de filas en el archivo
+            offset += len(block)
+            yield frame
+    finally:
+        workbook.close()
+
+
+def iter_excel_cases(file) -> Iterator[Dict[str, Any]]:
+    """
+    Genera los casos activos de un archivo Excel a medida que se leen, de
+    todas las hojas que tengan las columnas requeridas.
+
     Estructura esperada del Excel:
     - module_name: Nombre del módulo (ej: "Login")
     - case_name: Nombre del caso (ej: "Login con Google Auth")
@@ -13,96 +202,215 @@ def load_excel_cases(file) -> List[Dict]:
     - input_data: Datos de entrada en formato JSON o texto
     - expected_result: Resultado esperado
     - active: Si el caso está activo (VERDADERO/FALSO)
-    
+
+    Raises:
+        ValueError: Si faltan columnas o el archivo no se puede leer
+    """
+    for sheet in excel_case_sheets(file):
+        yield from iter_cases_from_frames(iter_excel_frames(file, sheet=sheet))
+
+
+def _columns(frame: pd.DataFrame) -> pd.DataFrame:
+    frame.columns = [_text(col).lower() for col in frame.columns]
+    return frame
+
+
+def _validated(frames: Iterator[pd.DataFrame], label: str) -> Iterator[pd.DataFrame]:
+    """
+    Normaliza encabezados, valida columnas en el primer bloque y unifica errores.
+
+    En JSONL/Parquet un bloque posterior puede no traer alguna columna
+    requerida (ej: ninguna línea del bloque tiene `module_name`): se agrega
+    vacía, así esas filas se tratan como celdas vacías en lugar de cortar
+    la importación a mitad de camino.
+    """
+    try:
+        first = True
+        for frame in frames:
+            frame = _columns(frame)
+            if first:
+                validate_columns(list(frame.columns))
+                first = False
+            for column in REQUIRED_COLUMNS:
+                if column not in frame.columns:
+                    frame[column] = None
+            yield frame
+    except ValueError as e:
+        if str(e).startswith("❌"):
+            raise
+        raise ValueError(f"❌ Error al procesar el archivo {label}: {str(e)}")
+    except Exception as e:
+        raise ValueError(f"❌ Error al procesar el archivo {label}: {str(e)}")
+
+
+def _sniff_delimiter(file) -> str:
+    sample = file.read(64 * 1024)
+    file.seek(0)
+    if isinstance(sample, bytes):
+        sample = sample.decode('utf-8', errors='ignore')
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=',;\t|').delimiter
+    except csv.Error:
+        return ','
+
+
+def iter_csv_frames(file, chunk_size: int = FRAME_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """CSV por bloques (separador detectado: `,` `;` tab o `|`). Solo las celdas vacías son nulas."""
+    frames = pd.read_csv(
+        file,
+        sep=_sniff_delimiter(file),
+        dtype=str,
+        keep_default_na=False,
+        na_values=[''],
+        encoding='utf-8-sig',  # Tolera el BOM de Excel
+        chunksize=chunk_size
+    )
+    return _validated(iter(frames), "CSV")
+
+
+def _json_value(value: Any) -> Any:
+    return json.dumps(value, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+
+
+def _nested_as_json(frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Objetos y listas anidados (ej: `"input_data": {"url": ...}`) como texto
+    JSON: `str()` daría el repr de Python, que no se puede volver a parsear.
+    """
+    for frame in frames:
+        for column in frame.columns[frame.dtypes == object]:
+            frame[column] = frame[column].map(_json_value)
+        yield frame
+
+
+def iter_jsonl_frames(file, chunk_size: int = FRAME_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """JSON Lines (un objeto por línea) por bloques."""
+    frames = pd.read_json(file, lines=True, dtype=False, chunksize=chunk_size, encoding='utf-8')
+    return _validated(_nested_as_json(frames), "JSONL")
+
+
+def iter_parquet_frames(file, chunk_size: int = FRAME_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Parquet por lotes de filas (requiere pyarrow)."""
+    try:
+        import pyarrow.parquet as pq  # Opcional: solo para archivos Parquet
+    except ImportError:
+        raise ValueError("❌ Para cargar archivos Parquet se requiere instalar pyarrow")
+
+    def batches():
+        offset = 0
+        for batch in pq.ParquetFile(file).iter_batches(batch_size=chunk_size):
+            frame = batch.to_pandas()
+            frame.index += offset
+            offset += len(frame)
+            yield frame
+
+    return _validated(batches(), "Parquet")
+
+
+def detect_format(file, filename: Optional[str] = None) -> str:
+    """
+    Formato del archivo por extensión o, si no es conocida, por su contenido
+    (firma ZIP de .xlsx, `PAR1` de Parquet, `{` inicial de JSONL; si no, CSV).
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension in UPLOAD_FORMATS:
+        return UPLOAD_FORMATS[extension]
+
+    head = file.read(8)
+    file.seek(0)
+    if head.startswith(b'PK\x03\x04'):
+        return 'excel'
+    if head.startswith(b'PAR1'):
+        return 'parquet'
+    if head.lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'{'):
+        return 'jsonl'
+    return 'csv'
+
+
+FRAME_READERS = {
+    'csv': iter_csv_frames,
+    'jsonl': iter_jsonl_frames,
+    'parquet': iter_parquet_frames,
+}
+
+
+def parse_excel_sheet(path: str, sheet: str) -> Tuple[str, List[Tuple[int, Dict[str, Any]]]]:
+    """Lee y normaliza una hoja completa. Se ejecuta en un proceso del pool."""
+    with open(path, 'rb') as file:
+        return sheet, list(iter_rows_from_frames(iter_excel_frames(file, sheet=sheet)))
+
+
+def iter_upload_sheets(
+    path: str,
+    filename: Optional[str] = None,
+    processes: int = 0
+) -> Iterator[Tuple[Optional[str], Iterable[Tuple[int, Dict[str, Any]]]]]:
+    """
+    Genera (hoja, filas) para un archivo en disco, con `filas` como pares
+    (fila, caso). En Excel hay una entrada por cada hoja con las columnas
+    requeridas; en los demás formatos una sola, con hoja None.
+
+    Un libro con varias hojas de entre `EXCEL_PARALLEL_MIN_BYTES` y
+    `EXCEL_PARALLEL_MAX_BYTES` se parsea en un pool de procesos (una hoja por
+    proceso, hasta `processes`; 0 = un proceso por CPU): el total se acerca
+    al tiempo de la hoja más grande, a costa de tener cada hoja completa en
+    memoria. Si no, las hojas se leen en secuencia y en streaming. En ambos
+    casos las hojas se entregan en el orden del libro. Las filas de cada
+    entrada deben consumirse antes de pedir la siguiente.
+
+    Raises:
+        ValueError: Si el formato no se puede leer o faltan columnas
+    """
+    with open(path, 'rb') as file:
+        file_format = detect_format(file, filename)
+        if file_format != 'excel':
+            yield None, iter_rows_from_frames(FRAME_READERS[file_format](file))
+            return
+
+        sheets = excel_case_sheets(file)
+        workers = min(len(sheets), processes or os.cpu_count() or 1)
+        size = os.path.getsize(path)
+        if workers < 2 or not EXCEL_PARALLEL_MIN_BYTES <= size <= EXCEL_PARALLEL_MAX_BYTES:
+            for sheet in sheets:
+                yield sheet, iter_rows_from_frames(iter_excel_frames(file, sheet=sheet))
+            return
+
+    # spawn: el servidor tiene hilos (event loop, workers) y fork no es seguro
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        futures = [pool.submit(parse_excel_sheet, path, sheet) for sheet in sheets]
+        for future in futures:  # Orden del libro: filas e informe por hoja estables entre corridas
+            yield future.result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_upload_cases(file, filename: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Genera los casos de un archivo Excel, CSV, JSONL o Parquet en streaming.
+    Todos los formatos pasan por las mismas validaciones y normalización.
+
+    Raises:
+        ValueError: Si el formato no se puede leer o faltan columnas
+    """
+    file_format = detect_format(file, filename)
+    if file_format == 'excel':
+        return iter_excel_cases(file)
+    return iter_cases_from_frames(FRAME_READERS[file_format](file))
+
+
+def load_excel_cases(file) -> List[Dict]:
+    """
+    Carga todos los casos de prueba de un archivo Excel en una lista.
+    Para archivos grandes usar `iter_excel_cases`.
+
     Args:
-        file: Archivo de tipo UploadFile de FastAPI
-        
+        file: Archivo binario (ej: UploadFile.file)
+
     Returns:
         Lista de diccionarios con los casos de prueba
     """
-    try:
-        # Leer el contenido del archivo en memoria
-        contents = file.read()
-        
-        # Crear un objeto BytesIO para pandas
-        excel_buffer = io.BytesIO(contents)
-        
-        # Leer el archivo Excel desde el buffer
-        df = pd.read_excel(excel_buffer, engine='openpyxl')
-        
-        # Resetear el puntero del archivo por si se necesita usar después
-        file.seek(0)
-        
-        # Normalizar nombres de columnas (quitar espacios y convertir a minúsculas)
-        df.columns = df.columns.str.strip().str.lower()
-        
-        # Validar columnas requeridas
-        required_columns = ['module_name', 'case_name', 'input_data', 'expected_result']
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        
-        if missing_columns:
-            available_cols = ', '.join(df.columns.tolist())
-            raise ValueError(
-                f"❌ Faltan columnas requeridas: {', '.join(missing_columns)}. "
-                f"Columnas encontradas: {available_cols}"
-            )
-        
-        # Convertir DataFrame a lista de diccionarios
-        cases = []
-        for index, row in df.iterrows():
-            # Validar que la fila no esté vacía
-            if pd.isna(row.get('case_name')) or pd.isna(row.get('input_data')):
-                continue  # Saltar filas vacías
-            
-            # Verificar si el caso está activo
-            is_active = True  # Por defecto activo
-            if 'active' in df.columns and pd.notna(row.get('active')):
-                active_value = str(row['active']).upper().strip()
-                # Aceptar: VERDADERO, TRUE, 1, YES, SI, SÍ
-                is_active = active_value in ['VERDADERO', 'TRUE', '1', 'YES', 'SI', 'SÍ', 'ACTIVO']
-            
-            # Solo agregar casos activos
-            if is_active:
-                # Combinar module_name y case_name para el nombre del caso
-                module = str(row['module_name']).strip() if pd.notna(row.get('module_name')) else ''
-                case_name = str(row['case_name']).strip()
-                full_name = f"{module} - {case_name}" if module else case_name
-                
-                # Obtener descripción
-                description = str(row.get('description', '')).strip() if pd.notna(row.get('description')) else ''
-                
-                # Obtener input_data (puede ser JSON o texto)
-                input_data = str(row['input_data']).strip()
-                
-                # Obtener expected_result
-                expected = str(row['expected_result']).strip() if pd.notna(row.get('expected_result')) else ''
-                
-                # Extraer URL si está en el input_data (formato JSON)
-                url = None
-                if '"url"' in input_data or "'url'" in input_data:
-                    try:
-                        import json
-                        # Intentar parsear como JSON
-                        input_json = json.loads(input_data.replace("'", '"'))
-                        url = input_json.get('url')
-                    except:
-                        pass  # Si no es JSON válido, continuar sin URL
-                
-                case = {
-                    'name': full_name,
-                    'description': description,
-                    'steps': input_data,  # input_data se guarda como steps
-                    'expected_result': expected,
-                    'url': url
-                }
-                cases.append(case)
-        
-        if not cases:
-            raise ValueError("❌ No se encontraron casos de prueba activos en el archivo Excel")
-        
-        return cases
-        
-    except ValueError:
-        raise
-    except Exception as e:
-        raise ValueError(f"❌ Error al procesar el archivo Excel: {str(e)}")
+    cases = list(iter_excel_cases(file))
+    if not cases:
+        raise ValueError("❌ No se encontraron casos de prueba activos en el archivo Excel")
+    return cases
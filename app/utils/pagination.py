@@ -0,0 +1,109 @@
+from datetime import datetime
+from fastapi import Response
+from sqlalchemy import tuple_
+from typing import Any, Callable, List, Optional, Tuple
+
+# Header donde se devuelve el cursor de la siguiente página
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def apply_keyset(query, column, cursor: Optional[int], limit: int, descending: bool = False):
+    """
+    Aplica paginación por keyset (cursor) sobre una columna única y ordenable.
+
+    En lugar de OFFSET (que obliga a la BD a recorrer todas las filas previas),
+    filtra por el último valor visto, así el costo de cada página es constante.
+
+    Args:
+        query: Query de SQLAlchemy
+        column: Columna usada como cursor (normalmente el id)
+        cursor: Último valor recibido en la página anterior (None = primera página)
+        limit: Tamaño de página
+        descending: Orden descendente (historiales) o ascendente (listados)
+
+    Returns:
+        Query filtrada, ordenada y limitada (pide una fila extra para saber si hay más)
+    """
+    if cursor is not None:
+        query = query.filter(column < cursor if descending else column > cursor)
+
+    order = column.desc() if descending else column.asc()
+    return query.order_by(order).limit(limit + 1)
+
+
+def apply_sort_keyset(query, column, tiebreaker, cursor: Optional[Tuple[Any, int]], limit: int, descending: bool = False):
+    """
+    Keyset sobre una columna no única (ej: una métrica) desempatando por id.
+
+    Compara la tupla (valor, id) contra la última fila vista; con un índice
+    sobre (columna, id) cada página cuesta lo mismo sin importar su posición.
+    La columna no debe tener NULL en las filas paginadas.
+    """
+    key = tuple_(column, tiebreaker)
+    if cursor is not None:
+        last = tuple_(*cursor)
+        query = query.where(key < last if descending else key > last)
+
+    if descending:
+        return query.order_by(column.desc(), tiebreaker.desc()).limit(limit + 1)
+    return query.order_by(column.asc(), tiebreaker.asc()).limit(limit + 1)
+
+
+def encode_cursor(value: Any, last_id: int) -> str:
+    """Cursor compuesto `valor|id` para `apply_sort_keyset`."""
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return f"{value}|{last_id}"
+
+
+def decode_cursor(cursor: Optional[str], parse: Callable[[str], Any]) -> Optional[Tuple[Any, int]]:
+    """
+    Inverso de `encode_cursor`.
+
+    Raises:
+        ValueError: Si el cursor no tiene el formato esperado
+    """
+    if not cursor:
+        return None
+    value, separator, last_id = cursor.rpartition("|")
+    if not separator:
+        raise ValueError("Cursor no válido")
+    return parse(value), int(last_id)
+
+
+def paginate_rows(rows: List[Any], limit: int, response: Response, key: str = "id") -> List[Any]:
+    """
+    Recorta la fila extra pedida por `apply_keyset` y publica el siguiente cursor
+    en el header `X-Next-Cursor` (ausente cuando no hay más páginas).
+    """
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if has_more and rows:
+        last = rows[-1]
+        value = last[key] if isinstance(last, dict) else getattr(last, key)
+        response.headers[NEXT_CURSOR_HEADER] = str(value)
+
+    return rows
+
+
+def parse_fields(fields: Optional[str], allowed: List[str], always: List[str] = ("id",)) -> List[str]:
+    """
+    Convierte el parámetro `fields=a,b,c` en una lista de columnas válidas.
+
+    Raises:
+        ValueError: Si se pide un campo que no existe
+    """
+    if not fields:
+        return list(allowed)
+
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    invalid = [f for f in requested if f not in allowed]
+    if invalid:
+        raise ValueError(
+            f"Campos no válidos: {', '.join(invalid)}. "
+            f"Campos disponibles: {', '.join(allowed)}"
+        )
+
+    selected = list(always) + [f for f in requested if f not in always]
+    return selected
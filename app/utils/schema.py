@@ -0,0 +1,46 @@
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from app.config import Base
+
+
+def sync_schema(engine: Engine) -> list:
+    """
+    Completa el esquema de tablas ya existentes con los cambios aditivos del modelo.
+
+    `create_all` solo crea tablas nuevas; esta función agrega las columnas e
+    índices que falten y quita NOT NULL de columnas que el modelo ahora
+    declara opcionales (ej: columnas legacy movidas a `artifacts`).
+    Nunca elimina ni renombra nada.
+
+    Returns:
+        Lista de cambios aplicados (para log)
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    applied = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+
+            db_columns = {col["name"]: col for col in inspector.get_columns(table.name)}
+
+            for column in table.columns:
+                if column.name not in db_columns:
+                    col_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}'))
+                    applied.append(f"{table.name}.{column.name} agregada")
+
+                elif (column.nullable and not db_columns[column.name]["nullable"]
+                      and not column.primary_key and engine.dialect.name == "postgresql"):
+                    conn.execute(text(f'ALTER TABLE {table.name} ALTER COLUMN {column.name} DROP NOT NULL'))
+                    applied.append(f"{table.name}.{column.name} ahora admite NULL")
+
+            db_indexes = {idx["name"] for idx in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in db_indexes:
+                    index.create(bind=conn, checkfirst=True)
+                    applied.append(f"índice {index.name} creado")
+
+    return applied
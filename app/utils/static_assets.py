@@ -0,0 +1,125 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from fastapi import Request, Response
+
+try:
+    import brotli  # Opcional: si no está instalado solo se ofrece gzip
+except ImportError:
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "static")
+
+# Los nombres con hash cambian con el contenido: se pueden cachear "para siempre"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+_ASSET_REF_RE = re.compile(r"\{\{\s*asset:([\w./-]+)\s*\}\}")
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+@dataclass
+class Asset:
+    path: str
+    media_type: str
+    etag: str
+    hashed_name: str
+    variants: Dict[str, bytes] = field(default_factory=dict)  # encoding -> cuerpo
+
+
+class StaticAssets:
+    """
+    Archivos estáticos del dashboard servidos desde memoria.
+
+    Al cargar cada archivo se calcula su hash de contenido, se publica también
+    como `nombre.<hash>.ext` (cache inmutable) y se pre-comprime con gzip
+    (y brotli si está disponible), así cada petición solo elige la variante.
+    Los HTML pueden referenciar otros assets con `{{ asset:ruta }}`.
+    """
+    def __init__(self, root: str = STATIC_DIR):
+        self.root = root
+        self._assets: Dict[str, Asset] = {}
+        self._by_hashed: Dict[str, Asset] = {}
+
+    def load(self) -> "StaticAssets":
+        """Carga (o recarga) todos los archivos. Los HTML van al final para resolver referencias."""
+        self._assets.clear()
+        self._by_hashed.clear()
+
+        paths = []
+        for folder, _, files in os.walk(self.root):
+            for name in files:
+                paths.append(os.path.relpath(os.path.join(folder, name), self.root).replace(os.sep, "/"))
+
+        for path in sorted(paths, key=lambda p: (p.endswith(".html"), p)):
+            with open(os.path.join(self.root, path), "rb") as f:
+                content = f.read()
+            if path.endswith(".html"):
+                content = _ASSET_REF_RE.sub(lambda m: self.url(m.group(1)), content.decode("utf-8")).encode("utf-8")
+            self._register(path, content)
+
+        return self
+
+    def _register(self, path: str, content: bytes) -> None:
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type == "application/javascript":
+            media_type += "; charset=utf-8"
+
+        digest = hashlib.sha256(content).hexdigest()[:12]
+        stem, ext = os.path.splitext(path)
+        asset = Asset(
+            path=path,
+            media_type=media_type,
+            etag=f'"{digest}"',
+            hashed_name=f"{stem}.{digest}{ext}",
+            variants={"identity": content}
+        )
+
+        if media_type.startswith(_COMPRESSIBLE) and len(content) > 512:
+            asset.variants["gzip"] = gzip.compress(content, compresslevel=9)
+            if brotli is not None:
+                asset.variants["br"] = brotli.compress(content, quality=11)
+
+        self._assets[path] = asset
+        self._by_hashed[asset.hashed_name] = asset
+
+    def url(self, path: str) -> str:
+        """URL con hash de contenido de un asset (ej: /static/dashboard/dashboard.3f2a9c1b7d4e.js)."""
+        if path not in self._assets:
+            raise KeyError(f"Asset no encontrado: {path}")
+        return f"/static/{self._assets[path].hashed_name}"
+
+    def find(self, name: str) -> Optional[tuple]:
+        """Devuelve (asset, inmutable) para un nombre con o sin hash."""
+        if name in self._by_hashed:
+            return self._by_hashed[name], True
+        if name in self._assets:
+            return self._assets[name], False
+        return None
+
+    def respond(self, request: Request, asset: Asset, immutable: bool = False) -> Response:
+        """Respuesta con la mejor codificación aceptada, ETag y cabeceras de caché."""
+        accepted = request.headers.get("accept-encoding", "")
+        encoding = next(
+            (enc for enc in ("br", "gzip") if enc in asset.variants and enc in accepted),
+            "identity"
+        )
+
+        headers = {
+            "ETag": asset.etag,
+            "Cache-Control": IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE,
+            "Vary": "Accept-Encoding",
+            # Evita que GZipMiddleware vuelva a comprimir
+            "Content-Encoding": encoding,
+        }
+        if request.headers.get("if-none-match") == asset.etag:
+            return Response(status_code=304, headers=headers)
+        return Response(content=asset.variants[encoding], media_type=asset.media_type, headers=headers)
+
+
+# Assets del dashboard, cargados una sola vez al importar
+static_assets = StaticAssets().load()
@@ -0,0 +1,85 @@
+"""
+Benchmark de normalización de casos en la carga masiva.
+
+Compara el recorrido anterior fila por fila (`df.iterrows()`) contra
+`normalize_frame` (operaciones por columna) sobre 10k y 100k filas sintéticas.
+
+Uso:
+    python -m benchmarks.bench_file_loader [filas ...]
+"""
+import json
+import sys
+import time
+import pandas as pd
+from app.utils.file_loader import normalize_frame
+
+ACTIVE = ['VERDADERO', 'FALSO', 'true', None, 1, 'no']
+
+
+def make_frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({
+        'module_name': [f"Módulo {i % 25}" if i % 7 else None for i in range(rows)],
+        'case_name': [f"Caso {i}" if i % 50 else None for i in range(rows)],
+        'description': [f"Descripción del caso {i}" for i in range(rows)],
+        'input_data': [
+            f'{{"url": "https://app.test/{i}", "user": "qa"}}' if i % 3 == 0 else f"Paso 1; paso 2 ({i})"
+            for i in range(rows)
+        ],
+        'expected_result': ["Se muestra el panel"] * rows,
+        'active': [ACTIVE[i % len(ACTIVE)] for i in range(rows)],
+    })
+
+
+def legacy_iterrows(df: pd.DataFrame) -> list:
+    """Normalización anterior de `load_excel_cases` (fila por fila)."""
+    cases = []
+    for index, row in df.iterrows():
+        if pd.isna(row.get('case_name')) or pd.isna(row.get('input_data')):
+            continue
+        is_active = True
+        if 'active' in df.columns and pd.notna(row.get('active')):
+            active_value = str(row['active']).upper().strip()
+            is_active = active_value in ['VERDADERO', 'TRUE', '1', 'YES', 'SI', 'SÍ', 'ACTIVO']
+        if is_active:
+            module = str(row['module_name']).strip() if pd.notna(row.get('module_name')) else ''
+            case_name = str(row['case_name']).strip()
+            full_name = f"{module} - {case_name}" if module else case_name
+            description = str(row.get('description', '')).strip() if pd.notna(row.get('description')) else ''
+            input_data = str(row['input_data']).strip()
+            expected = str(row['expected_result']).strip() if pd.notna(row.get('expected_result')) else ''
+            url = None
+            if '"url"' in input_data or "'url'" in input_data:
+                try:
+                    url = json.loads(input_data.replace("'", '"')).get('url')
+                except Exception:
+                    pass
+            cases.append({'name': full_name, 'description': description, 'steps': input_data,
+                          'expected_result': expected, 'url': url})
+    return cases
+
+
+def vectorized(df: pd.DataFrame) -> list:
+    return normalize_frame(df).to_dict('records')
+
+
+def measure(func, df: pd.DataFrame, repeat: int = 3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(sizes):
+    print(f"{'filas':>8} {'iterrows (s)':>13} {'vectorizado (s)':>16} {'speedup':>8}")
+    for rows in sizes:
+        df = make_frame(rows)
+        legacy_time, legacy = measure(legacy_iterrows, df, repeat=1 if rows > 50_000 else 3)
+        new_time, new = measure(vectorized, df)
+        assert legacy == new, "Los resultados no coinciden"
+        print(f"{rows:>8} {legacy_time:>13.3f} {new_time:>16.3f} {legacy_time / new_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
@@ -0,0 +1,65 @@
+"""
+Benchmark de lectura de libros Excel con varias hojas (una por módulo).
+
+Genera un libro con hojas de distinto tamaño más una hoja sin casos, y
+mide `iter_upload_sheets` en secuencia (processes=1) y en paralelo (un
+proceso por hoja), junto con el tiempo de la hoja más grande sola.
+Verifica que ambos modos produzcan los mismos casos. La mejora depende
+de las CPUs disponibles.
+
+Uso:
+    python -m benchmarks.bench_multisheet [filas_hoja_1 filas_hoja_2 ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from openpyxl import Workbook
+from app.utils.file_loader import iter_upload_sheets, parse_excel_sheet
+
+MODULES = ["Login", "Registro", "Búsqueda", "Carrito", "Pagos", "Perfil"]
+HEADER = ["module_name", "case_name", "description", "input_data", "expected_result", "active"]
+
+
+def make_workbook(path: str, sizes) -> None:
+    workbook = Workbook(write_only=True)
+    for module, rows in zip(MODULES, sizes):
+        sheet = workbook.create_sheet(module)
+        sheet.append(HEADER)
+        for i in range(rows):
+            input_data = f'{{"url": "https://app.test/{module}/{i}"}}' if i % 3 == 0 else f"Paso 1; paso 2 ({i})"
+            sheet.append([module, f"Caso {i}", f"Descripción {i}", input_data, "OK", "VERDADERO" if i % 5 else "FALSO"])
+    notes = workbook.create_sheet("Notas")  # Sin columnas requeridas: se ignora
+    notes.append(["Comentarios"])
+    workbook.save(path)
+
+
+def read_all(path: str, processes: int):
+    start = time.perf_counter()
+    cases = {sheet: list(rows) for sheet, rows in iter_upload_sheets(path, "casos.xlsx", processes)}
+    return time.perf_counter() - start, cases
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "casos.xlsx")
+        make_workbook(path, sizes)
+        print(f"hojas: {dict(zip(MODULES, sizes))}  tamaño: {os.path.getsize(path) / 1024:.0f} KB  CPUs: {os.cpu_count()}")
+
+        start = time.perf_counter()
+        parse_excel_sheet(path, MODULES[sizes.index(max(sizes))])
+        largest = time.perf_counter() - start
+
+        sequential, expected = read_all(path, processes=1)
+        parallel, cases = read_all(path, processes=len(sizes))
+        assert cases == expected, "Los casos no coinciden entre modos"
+
+        print(f"{'modo':>22} {'tiempo (s)':>11}")
+        print(f"{'hoja más grande sola':>22} {largest:>11.3f}")
+        print(f"{'secuencial':>22} {sequential:>11.3f}")
+        print(f"{'paralelo':>22} {parallel:>11.3f}   ({sequential / parallel:.1f}x)")
+        print(f"casos por hoja: { {sheet: len(rows) for sheet, rows in cases.items()} }")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [20_000, 20_000, 20_000, 10_000])
@@ -0,0 +1,131 @@
+"""
+Benchmark de extracción de datos de casos en PromptBuilder.
+
+Compara la extracción anterior (un método por campo, cada uno armando el
+texto y llamando a `re.search` con el patrón en línea) contra la tabla de
+extractores precompilados con memoización, construyendo los prompts de
+una suite completa. La segunda pasada sobre la misma suite (ej: volver a
+ejecutarla) reutiliza lo ya extraído.
+
+Uso:
+    python -m benchmarks.bench_prompt_builder [casos ...]
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import time
+from types import SimpleNamespace
+
+# Crear el engine no abre conexiones: basta con una URL de PostgreSQL
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg://bench@127.0.0.1:1/bench")
+
+from app.services.prompt_builder import PromptBuilder, extract_fields  # noqa: E402
+
+TEMPLATES = [
+    ("Login correcto {i}", "Ingresar con email: user{i}@test.com y password: Clave{i}#, login exitoso"),
+    ("Login Google {i}", "Iniciar sesión con Google usando correo: qa{i}@gmail.com"),
+    ("Registro {i}", "Registrar nombre: Ana María, apellido: Pérez, usuario: ana{i}, email: ana{i}@mail.com, contraseña: Abc{i}!"),
+    ("Búsqueda {i}", "Buscar: zapatillas modelo {i}; validar resultados"),
+    ("Navegación {i}", "Visitar secciones: Home, Productos {i}, Contacto. Validar títulos"),
+    ("Formulario {i}", "Llenar el formulario de contacto {i} y hacer submit"),
+]
+
+
+def make_suite(size: int) -> list:
+    cases = []
+    for i in range(size):
+        name, steps = TEMPLATES[i % len(TEMPLATES)]
+        cases.append(SimpleNamespace(
+            id=i, name=name.format(i=i), description=f"Caso generado {i}",
+            steps=steps.format(i=i), expected_result="OK", url="https://app.test/login" if i % 4 == 0 else None
+        ))
+    return cases
+
+
+class LegacyPromptBuilder(PromptBuilder):
+    """Extracción anterior: un `re.search` con patrón en línea por campo y por llamada."""
+
+    def _extract_fields(self, test_case):
+        return {
+            "email": self._extract_email(test_case),
+            "username": self._extract_username(test_case),
+            "password": self._extract_password(test_case),
+            "fullname": self._extract_fullname(test_case),
+            "lastname": self._extract_lastname(test_case),
+            "search_term": self._extract_search_term(test_case),
+            "sections": self._extract_sections(test_case),
+        }
+
+    def _extract_email(self, test_case):
+        text = f"{test_case.steps} {test_case.description}"
+        email_match = re.search(r'\b[\w.-]+@[\w.-]+\.\w+\b', text)
+        if email_match:
+            return email_match.group(0)
+        email_pattern = re.search(r'(?:e?mail|correo)[:\s]+([^\s,;]+@[^\s,;]+)', text, re.IGNORECASE)
+        return email_pattern.group(1) if email_pattern else None
+
+    def _extract_username(self, test_case):
+        text = f"{test_case.steps} {test_case.description}"
+        match = re.search(r'(?:usuario|username|user)[:\s]+([^\s,;]+)', text, re.IGNORECASE)
+        return match.group(1) if match else None
+
+    def _extract_password(self, test_case):
+        text = f"{test_case.steps} {test_case.description}"
+        match = re.search(r'(?:contraseña|password|clave)[:\s]+([^\s,;]+)', text, re.IGNORECASE)
+        return match.group(1) if match else None
+
+    def _extract_fullname(self, test_case):
+        text = f"{test_case.steps} {test_case.description}"
+        match = re.search(r'(?:nombre|fullname|name)[:\s]+([A-Za-záéíóúÁÉÍÓÚñÑ\s]+?)(?:,|;|\.|$)', text, re.IGNORECASE)
+        return match.group(1).strip() if match else None
+
+    def _extract_lastname(self, test_case):
+        text = f"{test_case.steps} {test_case.description}"
+        match = re.search(r'(?:apellido|lastname|surname)[:\s]+([A-Za-záéíóúÁÉÍÓÚñÑ\s]+?)(?:,|;|\.|$)', text, re.IGNORECASE)
+        return match.group(1).strip() if match else None
+
+    def _extract_search_term(self, test_case):
+        text = f"{test_case.steps} {test_case.description}"
+        match = re.search(r'(?:buscar|search)[:\s]+([^,;.]+)', text, re.IGNORECASE)
+        return match.group(1).strip() if match else None
+
+    def _extract_sections(self, test_case):
+        text = f"{test_case.steps} {test_case.description}"
+        match = re.search(r'(?:secciones|módulos|sections)[:\s]+([^.]+)', text, re.IGNORECASE)
+        return match.group(1).strip() if match else None
+
+
+def extract_suite(builder: PromptBuilder, suite: list) -> list:
+    return [builder._extract_test_data(case, builder._detect_test_type(case)) for case in suite]
+
+
+def build_suite(builder: PromptBuilder, suite: list) -> list:
+    with contextlib.redirect_stdout(io.StringIO()):  # build_prompt imprime por caso
+        return [builder.build_prompt(case) for case in suite]
+
+
+def measure(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main(sizes):
+    legacy, builder = LegacyPromptBuilder(), PromptBuilder()
+    print(f"{'casos':>7} {'etapa':>18} {'anterior (s)':>13} {'tabla (s)':>10} {'memo (s)':>9} {'speedup':>8}")
+    for size in sizes:
+        suite = make_suite(size)
+        for label, func in (("extracción", extract_suite), ("build_prompt", build_suite)):
+            extract_fields.cache_clear()
+            legacy_time, expected = measure(func, legacy, suite)
+            cold_time, result = measure(func, builder, suite)
+            warm_time, _ = measure(func, builder, suite)
+            assert result == expected, "Los datos extraídos no coinciden"
+            print(f"{size:>7} {label:>18} {legacy_time:>13.3f} {cold_time:>10.3f} {warm_time:>9.3f} "
+                  f"{legacy_time / warm_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000])
@@ -0,0 +1,81 @@
+"""
+Benchmark de arranque en frío de la API.
+
+Importa `app.main` en procesos nuevos (como un cold start en Render) y
+reporta el tiempo de import y la memoria residente (RSS) del proceso.
+Falla (código de salida 1) si se supera el presupuesto o si al importar se
+cargó alguna dependencia pesada que debería importarse recién al usarse.
+
+Importar `app.main` no se conecta a la BD (eso ocurre en el lifespan), así
+que no hace falta una BD disponible.
+
+Uso:
+    python -m benchmarks.bench_startup [--runs 5] [--max-seconds 1.5] [--max-rss-mb 120]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Solo se usan en cargas, exportaciones o llamadas a Manus / executor
+LAZY_MODULES = ["pandas", "numpy", "openpyxl", "pyarrow", "requests"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - start
+with open("/proc/self/status") as f:
+    rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS"))
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": rss_kb / 1024,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (LAZY_MODULES,)
+
+
+def probe() -> dict:
+    env = dict(os.environ)
+    # Cualquier URL de PostgreSQL sirve: crear el engine no abre conexiones
+    env.setdefault("DATABASE_URL", "postgresql+psycopg://bench@127.0.0.1:1/bench")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-seconds", type=float, default=1.5, help="Presupuesto de import (mediana)")
+    parser.add_argument("--max-rss-mb", type=float, default=120, help="Presupuesto de RSS tras el import")
+    args = parser.parse_args()
+
+    results = [probe() for _ in range(args.runs)]
+    seconds = statistics.median(r["seconds"] for r in results)
+    rss = statistics.median(r["rss_mb"] for r in results)
+    loaded = sorted({name for r in results for name in r["loaded"]})
+
+    print(f"{'corridas':>10} {'import (s)':>11} {'mín (s)':>8} {'RSS (MB)':>9}")
+    print(f"{args.runs:>10} {seconds:>11.3f} {min(r['seconds'] for r in results):>8.3f} {rss:>9.1f}")
+
+    failures = []
+    if seconds > args.max_seconds:
+        failures.append(f"import {seconds:.3f}s > {args.max_seconds}s")
+    if rss > args.max_rss_mb:
+        failures.append(f"RSS {rss:.1f}MB > {args.max_rss_mb}MB")
+    if loaded:
+        failures.append(f"dependencias pesadas cargadas al importar: {', '.join(loaded)}")
+
+    if failures:
+        print("❌ Regresión de arranque: " + "; ".join(failures))
+        sys.exit(1)
+    print("✅ Dentro del presupuesto de arranque")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark de lectura de archivos de casos por formato.
+
+Genera el mismo conjunto de filas en Excel, CSV, JSONL y (si está pyarrow)
+Parquet, y mide el tiempo de `iter_upload_cases` de principio a fin
+(parseo + validación + normalización). Verifica que todos los formatos
+produzcan los mismos casos.
+
+Uso:
+    python -m benchmarks.bench_upload_formats [filas ...]
+"""
+import importlib.util
+import io
+import sys
+import time
+from app.utils.file_loader import iter_upload_cases
+from benchmarks.bench_file_loader import make_frame
+
+
+def encode(df, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    if fmt == 'xlsx':
+        df.to_excel(buffer, index=False)
+    elif fmt == 'csv':
+        df.to_csv(buffer, index=False)
+    elif fmt == 'jsonl':
+        df.to_json(buffer, orient='records', lines=True, force_ascii=False)
+    else:
+        df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def measure(data: bytes, fmt: str):
+    start = time.perf_counter()
+    cases = list(iter_upload_cases(io.BytesIO(data), f"casos.{fmt}"))
+    return time.perf_counter() - start, cases
+
+
+def main(sizes):
+    formats = ['xlsx', 'csv', 'jsonl'] + (['parquet'] if importlib.util.find_spec('pyarrow') else [])
+    print(f"{'filas':>8} {'formato':>8} {'tamaño (KB)':>12} {'tiempo (s)':>11} {'filas/s':>10} {'vs xlsx':>8}")
+    for rows in sizes:
+        # Todo como texto: Parquet no admite columnas de tipos mezclados
+        frame = make_frame(rows)
+        df = frame.astype(str).where(frame.notna(), None)
+        baseline, reference = None, None
+        for fmt in formats:
+            data = encode(df, fmt)
+            elapsed, cases = measure(data, fmt)
+            if reference is None:
+                baseline, reference = elapsed, cases
+            assert cases == reference, f"{fmt}: los casos no coinciden con xlsx"
+            print(f"{rows:>8} {fmt:>8} {len(data) / 1024:>12.0f} {elapsed:>11.3f} "
+                  f"{rows / elapsed:>10.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
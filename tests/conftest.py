@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Crear el engine no abre conexiones: sin BD de pruebas basta una URL de PostgreSQL.
+# Las pruebas que necesitan una BD real usan TEST_DATABASE_URL (se omiten si no está).
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL", "postgresql+psycopg://test@127.0.0.1:1/test")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,116 @@
+import io
+import json
+import pytest
+from openpyxl import Workbook
+from app.utils import file_loader
+from app.utils.file_loader import detect_format, iter_upload_cases, iter_upload_sheets
+
+HEADER = ["module_name", "case_name", "description", "input_data", "expected_result", "active"]
+ROWS = [
+    ["Login", "Correcto", "desc", '{"url": "https://app.test/login", "email": "a@b.com"}', "Ingresa", "VERDADERO"],
+    ["Login", "Inactivo", "", "pasos", "Nada", "FALSO"],
+    ["", "Sin módulo", None, "buscar: zapatillas", "Resultados", None],
+    ["Login", None, "", "pasos", "Sin nombre", "TRUE"],
+]
+EXPECTED = [
+    {"name": "Login - Correcto", "description": "desc", "steps": ROWS[0][3], "expected_result": "Ingresa", "url": "https://app.test/login"},
+    {"name": "Sin módulo", "description": "", "steps": "buscar: zapatillas", "expected_result": "Resultados", "url": None},
+]
+
+
+def csv_bytes(delimiter: str) -> bytes:
+    def cell(value):
+        value = "" if value is None else value
+        return '"' + value.replace('"', '""') + '"' if any(c in value for c in '",;') else value
+    lines = [delimiter.join(HEADER)] + [delimiter.join(cell(value) for value in row) for row in ROWS]
+    return ("\ufeff" + "\n".join(lines) + "\n").encode("utf-8")
+
+
+def jsonl_bytes(rows=ROWS) -> bytes:
+    return "".join(json.dumps(dict(zip(HEADER, row)), ensure_ascii=False) + "\n" for row in rows).encode("utf-8")
+
+
+def xlsx_file(path, sheets: dict) -> str:
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for title, rows in sheets.items():
+        worksheet = workbook.create_sheet(title)
+        for row in rows:
+            worksheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.mark.parametrize("delimiter", [",", ";", "\t", "|"])
+def test_csv_delimiters(delimiter):
+    assert list(iter_upload_cases(io.BytesIO(csv_bytes(delimiter)), "casos.csv")) == EXPECTED
+
+
+def test_jsonl():
+    assert list(iter_upload_cases(io.BytesIO(jsonl_bytes()), "casos.jsonl")) == EXPECTED
+
+
+def test_jsonl_nested_values_stay_json():
+    line = {
+        "module_name": "Login", "case_name": "Objeto", "expected_result": "ok",
+        "input_data": {"url": "https://app.test", "email": "ñandú@test.com", "pasos": ["a", "b"], "recordar": True},
+    }
+    case, = iter_upload_cases(io.BytesIO((json.dumps(line) + "\n").encode()), "casos.jsonl")
+    assert json.loads(case["steps"]) == line["input_data"]
+    assert "ñandú" in case["steps"]
+    assert case["url"] == "https://app.test"
+
+
+def test_jsonl_later_chunk_without_required_column():
+    rows = [dict(zip(HEADER, row)) for row in (ROWS[0], ROWS[2])]
+    rows += [{"case_name": "Sin módulo 2", "input_data": "x", "expected_result": "y"}] * 2
+    data = "".join(json.dumps(row) + "\n" for row in rows).encode()
+
+    frames = file_loader.iter_jsonl_frames(io.BytesIO(data), chunk_size=2)
+    cases = list(file_loader.iter_cases_from_frames(frames))
+    assert [case["name"] for case in cases] == ["Login - Correcto", "Sin módulo", "Sin módulo 2", "Sin módulo 2"]
+
+
+@pytest.mark.parametrize("filename, data", [
+    ("casos.csv", b"module_name,case_name\nLogin,Caso\n"),
+    ("casos.jsonl", b'{"module_name": "Login", "case_name": "Caso"}\n'),
+])
+def test_missing_columns(filename, data):
+    with pytest.raises(ValueError, match="Faltan columnas requeridas: input_data, expected_result"):
+        list(iter_upload_cases(io.BytesIO(data), filename))
+
+
+@pytest.mark.parametrize("data, expected", [
+    (b"PK\x03\x04rest", "excel"),
+    (b"PAR1rest", "parquet"),
+    (b'\xef\xbb\xbf {"a": 1}', "jsonl"),
+    (b"module_name;case_name", "csv"),
+])
+def test_detect_format_by_content(data, expected):
+    file = io.BytesIO(data)
+    assert detect_format(file, "subida.bin") == expected
+    assert file.tell() == 0
+
+
+def test_excel(tmp_path):
+    path = xlsx_file(tmp_path / "casos.xlsx", {"Casos": [HEADER, *ROWS]})
+    with open(path, "rb") as file:
+        assert list(iter_upload_cases(file, "casos.xlsx")) == EXPECTED
+
+
+def test_excel_sheets_in_workbook_order(tmp_path):
+    path = xlsx_file(tmp_path / "casos.xlsx", {
+        "Registro": [HEADER, ["Registro", "Alta", "", "nombre: Ana", "ok", None]],
+        "Notas": [["comentario"], ["hoja sin casos"]],
+        "Login": [HEADER, *ROWS],
+    })
+    sheets = [(sheet, [row for row, _ in rows]) for sheet, rows in iter_upload_sheets(path, "casos.xlsx")]
+    assert sheets == [("Registro", [1]), ("Login", [1, 3])]
+
+
+def test_upload_sheets_single_entry_for_other_formats(tmp_path):
+    path = tmp_path / "casos.jsonl"
+    path.write_bytes(jsonl_bytes())
+    (sheet, rows), = list((sheet, list(rows)) for sheet, rows in iter_upload_sheets(str(path), "casos.jsonl"))
+    assert sheet is None
+    assert rows == list(zip([1, 3], EXPECTED))
@@ -0,0 +1,46 @@
+from datetime import datetime
+import pytest
+from fastapi.testclient import TestClient
+from app.utils.pagination import encode_cursor, decode_cursor
+
+
+@pytest.mark.parametrize("value, parse", [
+    (42, int),
+    (87.5, float),
+    (datetime(2026, 3, 5, 14, 30, 15, 120000), datetime.fromisoformat),
+])
+def test_cursor_round_trip(value, parse):
+    assert decode_cursor(encode_cursor(value, 17), parse) == (value, 17)
+
+
+def test_cursor_value_may_contain_separator():
+    assert decode_cursor(encode_cursor("a|b", 3), str) == ("a|b", 3)
+
+
+@pytest.mark.parametrize("cursor", [None, ""])
+def test_decode_empty_cursor(cursor):
+    assert decode_cursor(cursor, int) is None
+
+
+@pytest.mark.parametrize("cursor, parse", [
+    ("17", int),
+    ("abc|17", float),
+    ("12|x", int),
+    ("ayer|3", datetime.fromisoformat),
+])
+def test_decode_invalid_cursor(cursor, parse):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, parse)
+
+
+@pytest.mark.parametrize("params", [
+    {"cursor": "sin-separador"},
+    {"sort": "success_rate", "cursor": "abc|3"},
+    {"sort": "last_failure", "cursor": "2026-13-45|3"},
+])
+def test_test_stats_invalid_cursor_is_400(params):
+    from app.main import app
+
+    # Sin lifespan: el cursor se valida antes de consultar la BD
+    response = TestClient(app).get("/api/dashboard/test-stats", params=params)
+    assert response.status_code == 400
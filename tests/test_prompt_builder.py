@@ -0,0 +1,61 @@
+from types import SimpleNamespace
+import pytest
+from app.services.prompt_builder import PromptBuilder, extract_fields
+
+
+def test_extract_all_fields():
+    fields = extract_fields(
+        "Registrar nombre: Ana María, apellido: Pérez, usuario: ana1, email: ana1@mail.com, "
+        "contraseña: Abc1!, buscar: zapatillas; secciones: Home, Contacto. Fin"
+    )
+    assert dict(fields) == {
+        "email": "ana1@mail.com",
+        "username": "ana1",
+        "password": "Abc1!",
+        "fullname": "Ana María",
+        "lastname": "Pérez",
+        "search_term": "zapatillas",
+        "sections": "Home, Contacto",
+    }
+
+
+def test_missing_fields_are_none():
+    assert set(extract_fields("Hacer click en el botón").values()) == {None}
+
+
+def test_email_pattern_priority():
+    # Sin dominio con punto no hay email "completo": se usa el de la etiqueta
+    assert extract_fields("correo: qa@intranet")["email"] == "qa@intranet"
+    # El email completo tiene prioridad aunque aparezca después de la etiqueta
+    assert extract_fields("correo: qa@intranet, copia a jefe@empresa.com")["email"] == "jefe@empresa.com"
+
+
+def test_labels_are_case_insensitive():
+    fields = extract_fields("USUARIO: Admin; PASSWORD: s3cret")
+    assert (fields["username"], fields["password"]) == ("Admin", "s3cret")
+
+
+def test_memoized_and_read_only():
+    text = "Login con usuario: memo_test y password: x1"
+    extract_fields.cache_clear()
+    first = extract_fields(text)
+    assert extract_fields(text) is first
+    assert extract_fields.cache_info().hits == 1
+    with pytest.raises(TypeError):
+        first["username"] = "otro"
+
+
+def test_matches_previous_extraction():
+    from benchmarks.bench_prompt_builder import LegacyPromptBuilder, make_suite
+
+    legacy, builder = LegacyPromptBuilder(), PromptBuilder()
+    for case in make_suite(60):
+        assert builder._extract_fields(case) == legacy._extract_fields(case)
+
+
+def test_non_object_json_input_is_text():
+    case = SimpleNamespace(
+        id=1, name="Buscar", description="", steps="123", expected_result="ok", url=None
+    )
+    data = PromptBuilder()._extract_test_data(case, "search")
+    assert data["url"] == "https://www.celevro.com"
@@ -0,0 +1,30 @@
+import pytest
+from app.models import result_model
+from app.models.result_model import parse_duration
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("12s", 12.0),
+    ("1.5s", 1.5),
+    ("1,5 s", 1.5),
+    ("2m 3s", 123.0),
+    ("2M", 120.0),
+    ("250ms", 0.25),
+    ("1h", 3600.0),
+    ("3", 3.0),
+])
+def test_parse_duration(value, expected):
+    assert parse_duration(value) == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("value", [None, "", "abc", "N/A"])
+def test_parse_duration_unrecognized(value):
+    assert parse_duration(value) is None
+
+
+def test_execution_time_sets_duration_seconds():
+    result = result_model.TestResult(test_case_id=1, status="passed", execution_time="1m 30s")
+    assert result.duration_seconds == 90.0
+
+    result.execution_time = None
+    assert result.duration_seconds is None
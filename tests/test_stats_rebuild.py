@@ -0,0 +1,111 @@
+"""
+Las tablas de estadísticas se mantienen en línea al insertar resultados y
+se reconstruyen desde `test_results` al iniciar. Ambos caminos deben dar
+lo mismo. Requiere PostgreSQL: TEST_DATABASE_URL apunta a una BD
+descartable (se borran y recrean todas las tablas).
+"""
+import os
+import random
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import delete, select, update
+
+pytestmark = pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="requiere TEST_DATABASE_URL (PostgreSQL)")
+
+# Columnas que dependen del momento de la escritura, no de los datos
+VOLATILE_COLUMNS = {"updated_at"}
+
+
+@pytest.fixture(scope="module")
+def stats():
+    from app.config import Base, engine
+    from app.models.case_stats_model import TestCaseStats, rebuild_case_stats
+    from app.models.duration_model import TestCaseDurationStats, rebuild_duration_stats
+    from app.models.flakiness_model import TestCaseFlakiness, rebuild_flakiness
+    from app.models.rollup_model import ResultDailyRollup, rebuild_daily_rollups
+    from app.services.partition_service import PartitionService
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    PartitionService(engine).prepare()
+    yield engine, {
+        ResultDailyRollup: rebuild_daily_rollups,
+        TestCaseFlakiness: rebuild_flakiness,
+        TestCaseDurationStats: rebuild_duration_stats,
+        TestCaseStats: rebuild_case_stats,
+    }
+    engine.dispose()
+
+
+def insert_history(engine, cases: int = 6, days: int = 4, per_day: int = 5):
+    """Resultados en orden cronológico, un commit (y flush) por día."""
+    from app.config import SessionLocal
+    from app.models.case_model import TestCase
+    from app.models.result_model import TestResult
+
+    randomizer = random.Random(7)
+    start = datetime.now().replace(microsecond=0) - timedelta(days=days)
+    with SessionLocal() as db:
+        test_cases = [TestCase(name=f"caso {i}", steps="pasos", expected_result="ok") for i in range(cases)]
+        db.add_all(test_cases)
+        db.commit()
+
+        for day in range(days):
+            moment = start + timedelta(days=day)
+            for run in range(per_day):
+                for test_case in test_cases:
+                    moment += timedelta(seconds=1)
+                    status = randomizer.choices(["passed", "failed", "error"], weights=[6, 3, 1])[0]
+                    execution_time = randomizer.choice([f"{randomizer.uniform(1, 30):.2f}s", "1m 5s", "250ms", None, "N/A"])
+                    db.add(TestResult(test_case_id=test_case.id, status=status, execution_time=execution_time, created_at=moment))
+            db.commit()
+
+
+def snapshot(engine, model) -> dict:
+    columns = [column for column in model.__table__.columns if column.name not in VOLATILE_COLUMNS]
+    keys = [column.name for column in model.__table__.primary_key]
+    with engine.connect() as conn:
+        rows = conn.execute(select(*columns)).mappings().all()
+    return {
+        tuple(row[key] for key in keys): {
+            name: round(value, 6) if isinstance(value, float) else value
+            for name, value in row.items()
+        }
+        for row in rows
+    }
+
+
+def rebuild(engine, model, rebuild_table, **kwargs) -> dict:
+    with engine.begin() as conn:
+        conn.execute(delete(model))
+    rebuild_table(engine, **kwargs)
+    return snapshot(engine, model)
+
+
+def test_rebuild_matches_incremental(stats):
+    engine, tables = stats
+    insert_history(engine)
+
+    for model, rebuild_table in tables.items():
+        incremental = snapshot(engine, model)
+        assert incremental, f"{model.__tablename__} sin filas"
+        assert rebuild(engine, model, rebuild_table) == incremental, model.__tablename__
+
+
+def test_backfilled_durations_rebuild_case_stats(stats):
+    from app.models.case_stats_model import TestCaseStats, rebuild_case_stats
+    from app.models.result_model import TestResult, backfill_durations
+
+    engine, _ = stats
+    expected = snapshot(engine, TestCaseStats)
+    parsed = snapshot(engine, TestResult)
+
+    # Filas legacy: execution_time sin duration_seconds
+    with engine.begin() as conn:
+        conn.execute(update(TestResult).values(duration_seconds=None))
+
+    assert backfill_durations(engine, batch_size=7) == sum(1 for row in parsed.values() if row["duration_seconds"] is not None)
+    assert snapshot(engine, TestResult) == parsed
+    assert rebuild_case_stats(engine) == 0  # Ya tiene filas: sin force no se toca
+    rebuild_case_stats(engine, force=True)
+    assert snapshot(engine, TestCaseStats) == expected